@@ -421,6 +421,13 @@ ANVIL_WORKSPACE_ADAPTERS = [
 ANVIL_ACCOUNT_ADAPTER = "gregor_django.gregor_anvil.adapters.AccountAdapter"
 ANVIL_MANAGED_GROUP_ADAPTER = "gregor_django.gregor_anvil.adapters.ManagedGroupAdapter"
 ANVIL_AUDIT_CACHE = "anvil_audit"
+# Maximum number of audit results to resolve on AnVIL at the same time.
+GREGOR_AUDIT_RESOLVE_MAX_WORKERS = env.int("GREGOR_AUDIT_RESOLVE_MAX_WORKERS", default=4)
+# Re-audit workspaces with changed sharing or memberships in a background thread of the process that changed them.
+# If False, they are only re-audited by the process_pending_reaudits management command.
+GREGOR_REAUDIT_IN_PROCESS_WORKER = env.bool("GREGOR_REAUDIT_IN_PROCESS_WORKER", default=True)
+# Allow development commands (e.g., benchmark_gregor_audits) to create synthetic data even if DEBUG is False.
+GREGOR_ALLOW_SYNTHETIC_DATA = False
 
 DRUPAL_API_CLIENT_ID = env("DRUPAL_API_CLIENT_ID", default="")
 DRUPAL_API_CLIENT_SECRET = env("DRUPAL_API_CLIENT_SECRET", default="")
@@ -36,6 +36,12 @@ ANVIL_API_SERVICE_ACCOUNT_FILE = "foo"
 # get the last templates entry and set debug option
 TEMPLATES[-1]["OPTIONS"]["debug"] = True  # noqa
 ANVIL_DCC_ADMINS_GROUP_NAME = "TEST_GREGOR_DCC_ADMINS"
+# Resolve audit results in the main thread, so that they can see data created inside the test transaction.
+GREGOR_AUDIT_RESOLVE_MAX_WORKERS = 1
+# Re-audit changed workspaces only when tests process the queue, since a worker thread would not see test data.
+GREGOR_REAUDIT_IN_PROCESS_WORKER = False
+# Tests run with DEBUG = False, so explicitly allow commands that create synthetic data.
+GREGOR_ALLOW_SYNTHETIC_DATA = True
 
 # Suppress DEBUG logging in tests without changing base.py file.
 LOGGING["root"]["level"] = "INFO"  # noqa: F405
@@ -1,5 +1,6 @@
 import datetime
 import json
+import threading
 from unittest.mock import Mock, patch
 from urllib.parse import parse_qs, urlparse
 
@@ -16,7 +17,7 @@ from django.test.utils import override_settings
 from django.urls import reverse
 
 from .provider import CustomProvider
-from .views import CustomAdapter
+from .views import DRUPAL_REQUEST_TIMEOUT, CustomAdapter, LatencyHistogram, drupal_get, jwks_cache
 
 User = get_user_model()
 
@@ -116,6 +117,9 @@ class CustomProviderLoginTest(TestCase):
             secret="test_client_secret",
         )
         self.social_app.sites.add(1)  # Add to default site
+        # The JWKS cache is process-wide, so start each test without cached keys.
+        jwks_cache.clear()
+        self.addCleanup(jwks_cache.clear)
 
         # Mock token data
         self.mock_token_data = {
@@ -174,6 +178,106 @@ class CustomProviderLoginTest(TestCase):
         pub_key = adapter.get_public_key(headers={"HTTP_HOST": "foo"})
         self.assertEqual(pub_key, None)
 
+    @responses.activate
+    def test_public_key_is_cached(self):
+        """The JWKS endpoint is only called once for repeated lookups."""
+        jwks = responses.add(responses.GET, CustomAdapter.public_key_url, json=KEY_SERVER_RESP_JSON, status=200)
+        adapter = CustomAdapter(RequestFactory().get("/fake-url/"))
+        first_key = adapter.get_public_key(headers={}, kid=TESTING_JWT_KEYSET["kid"])
+        second_key = adapter.get_public_key(headers={}, kid=TESTING_JWT_KEYSET["kid"])
+        self.assertIsNotNone(first_key)
+        self.assertIs(first_key, second_key)
+        self.assertEqual(jwks.call_count, 1)
+
+    @responses.activate
+    def test_public_key_refreshed_for_unknown_kid(self):
+        """The JWKS endpoint is called again once when a token is signed with a new kid."""
+        old_keys = {"keys": [dict(KEY_SERVER_RESP_JSON["keys"][0], kid="old-kid")]}
+        new_keys = {"keys": [dict(KEY_SERVER_RESP_JSON["keys"][0], kid=TESTING_JWT_KEYSET["kid"])]}
+        responses.add(responses.GET, CustomAdapter.public_key_url, json=old_keys, status=200)
+        responses.add(responses.GET, CustomAdapter.public_key_url, json=new_keys, status=200)
+        adapter = CustomAdapter(RequestFactory().get("/fake-url/"))
+        self.assertIsNotNone(adapter.get_public_key(headers={}, kid="old-kid"))
+        jwks_cache._fetched_at -= jwks_cache.min_refresh_interval
+        self.assertIsNotNone(adapter.get_public_key(headers={}, kid=TESTING_JWT_KEYSET["kid"]))
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_public_key_not_refreshed_too_often(self):
+        """Unknown kids do not trigger another call while the keys were fetched recently."""
+        jwks = responses.add(responses.GET, CustomAdapter.public_key_url, json=KEY_SERVER_RESP_JSON, status=200)
+        adapter = CustomAdapter(RequestFactory().get("/fake-url/"))
+        self.assertIsNotNone(adapter.get_public_key(headers={}, kid=TESTING_JWT_KEYSET["kid"]))
+        self.assertIsNone(adapter.get_public_key(headers={}, kid="unknown-kid"))
+        self.assertIsNone(adapter.get_public_key(headers={}, kid="other-unknown-kid"))
+        self.assertEqual(jwks.call_count, 1)
+        # Once the minimum interval has passed, an unknown kid triggers one more call.
+        jwks_cache._fetched_at -= jwks_cache.min_refresh_interval
+        self.assertIsNone(adapter.get_public_key(headers={}, kid="unknown-kid"))
+        self.assertEqual(jwks.call_count, 2)
+
+    def test_concurrent_refresh_fetches_once(self):
+        """Threads that need a refresh at the same time share a single fetch."""
+        started = threading.Event()
+        release = threading.Event()
+        fetch_count = 0
+
+        def fetch_jwks():
+            nonlocal fetch_count
+            fetch_count += 1
+            started.set()
+            release.wait(5)
+            return KEY_SERVER_RESP_JSON["keys"]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(jwks_cache.get(TESTING_JWT_KEYSET["kid"], fetch_jwks)))
+            for _ in range(3)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(fetch_count, 1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(x is results[0] for x in results))
+
+    @responses.activate
+    def test_public_key_refreshed_after_ttl(self):
+        """Cached keys are re-fetched once they expire."""
+        jwks = responses.add(responses.GET, CustomAdapter.public_key_url, json=KEY_SERVER_RESP_JSON, status=200)
+        adapter = CustomAdapter(RequestFactory().get("/fake-url/"))
+        adapter.get_public_key(headers={})
+        jwks_cache._fetched_at -= jwks_cache.ttl
+        adapter.get_public_key(headers={})
+        self.assertEqual(jwks.call_count, 2)
+
+    @responses.activate
+    def test_drupal_get_timeout_and_latency(self):
+        """Calls to drupal are bounded by a timeout and their latency is logged."""
+        responses.add(responses.GET, CustomAdapter.profile_url, json=USER_INFO_RESP_JSON, status=200)
+        with self.assertLogs("gregor_django.drupal_oauth_provider.views", level="DEBUG") as logs:
+            response = drupal_get("userinfo", CustomAdapter.profile_url, headers={})
+        self.assertEqual(response.json(), USER_INFO_RESP_JSON)
+        self.assertEqual(responses.calls[0].request.req_kwargs["timeout"], DRUPAL_REQUEST_TIMEOUT)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].levelname, "DEBUG")
+        self.assertIn("[userinfo] request took", logs.output[0])
+
+    def test_latency_histogram_logged_every_n_calls(self):
+        """The latency histogram is only logged at INFO once every `log_every` calls."""
+        histogram = LatencyHistogram("test", log_every=3)
+        with self.assertLogs("gregor_django.drupal_oauth_provider.views", level="INFO") as logs:
+            for seconds in (0.01, 0.2, 20, 0.01, 0.01, 0.01):
+                histogram.observe(seconds)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("[test] latency histogram after 3 requests: <=0.05s: 1, <=0.1s: 0, <=0.25s: 1", logs.output[0])
+        self.assertIn("<=infs: 1", logs.output[0])
+        self.assertIn("[test] latency histogram after 6 requests: <=0.05s: 4", logs.output[1])
+
     @responses.activate
     def test_complete_oauth_login_flow(self):
         """Test the complete OAuth login flow with mocked responses"""
@@ -289,7 +393,7 @@ class CustomProviderLoginTest(TestCase):
         self.assertEqual(User.objects.count(), 0)
 
     @patch("requests.post")
-    @patch("requests.get")
+    @patch("gregor_django.drupal_oauth_provider.views.drupal_http_session.get")
     def test_user_info_failure(self, mock_get, mock_post):
         """Test handling of user info API failure"""
 
@@ -1,5 +1,9 @@
+import bisect
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import jwt
 import requests
@@ -11,9 +15,145 @@ from allauth.socialaccount.providers.oauth2.views import (
     OAuth2CallbackView,
     OAuth2LoginView,
 )
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts in seconds for calls to drupal on the login path.
+DRUPAL_REQUEST_TIMEOUT = (3.05, 10)
+
+
+def get_drupal_http_session():
+    """Return a keep-alive requests.Session for calls to drupal, with connection pooling and bounded retry."""
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+drupal_http_session = get_drupal_http_session()
+
+
+class LatencyHistogram:
+    """Bucketed counts of request latencies, so that login-path cost can be tracked.
+
+    Each call is logged at DEBUG. The histogram is logged at INFO once every `log_every` calls."""
+
+    # Upper bounds of the buckets, in seconds. Slower calls are counted in a final overflow bucket.
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, log_every=100):
+        self.name = name
+        self.log_every = log_every
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.n_calls = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self.n_calls += 1
+            n_calls = self.n_calls
+            counts = list(self.counts)
+        logger.debug(f"[{self.name}] request took {seconds:.3f}s")
+        if n_calls % self.log_every == 0:
+            buckets = ", ".join(
+                "<={}s: {}".format(bound, count) for bound, count in zip(self.BUCKETS + ("inf",), counts)
+            )
+            logger.info(f"[{self.name}] latency histogram after {n_calls} requests: {buckets}")
+
+
+latency_histograms = {
+    "jwks": LatencyHistogram("jwks"),
+    "userinfo": LatencyHistogram("userinfo"),
+}
+
+
+def drupal_get(name, url, headers):
+    """GET `url` through the shared drupal session, recording the call latency in the `name` histogram."""
+    start = time.perf_counter()
+    try:
+        return drupal_http_session.get(url, headers=headers, timeout=DRUPAL_REQUEST_TIMEOUT)
+    finally:
+        latency_histograms[name].observe(time.perf_counter() - start)
+
+
+class JWKSCache:
+    """Process-wide cache of the public keys served by the drupal JWKS endpoint.
+
+    Keys are stored as parsed RSA key objects, keyed by their `kid`, and are re-fetched once they are older than
+    `ttl` seconds. A lookup for a `kid` that is not in the cache triggers a refresh, so that keys rotated on the
+    drupal side are picked up without waiting for the cache to expire. The keys are not re-fetched more than once
+    every `min_refresh_interval` seconds, so tokens with unknown kids cannot make every login call the endpoint.
+
+    Lookups do not take a lock. Only one thread fetches the keys at a time; other threads that need a refresh wait
+    for it and use its result instead of fetching the keys again.
+    """
+
+    def __init__(self, ttl=3600, min_refresh_interval=30):
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._refresh_lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._keys = {}
+        self._fetched_at = None
+
+    def _refresh(self, fetch_jwks):
+        keys = {}
+        for jwk in fetch_jwks():
+            try:
+                public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(jwk))
+            except Exception as e:
+                logger.error(f"[JWKSCache] failed to convert jwk to public key {e}")
+            else:
+                keys.setdefault(jwk.get("kid"), public_key)
+        # Replace the keys before the fetch time, so a lookup never sees a new fetch time with the old keys.
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    @staticmethod
+    def _lookup(keys, kid):
+        if kid in keys:
+            return keys[kid]
+        # Fall back to the first key if the token has no kid or the JWKS does not identify its keys.
+        if keys and (kid is None or list(keys) == [None]):
+            return next(iter(keys.values()))
+        return None
+
+    def get(self, kid, fetch_jwks):
+        """Return the public key for `kid`, calling `fetch_jwks` to refresh the cache if needed.
+
+        Returns None if no matching key is available after refreshing, or if the keys were refreshed too recently
+        to be fetched again.
+        """
+        fetched_at = self._fetched_at
+        keys = self._keys
+        if fetched_at is not None:
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                public_key = self._lookup(keys, kid)
+                if public_key is not None or age < self.min_refresh_interval:
+                    return public_key
+        with self._refresh_lock:
+            # Another thread may have refreshed the keys while this one was waiting.
+            if self._fetched_at == fetched_at:
+                self._refresh(fetch_jwks)
+            return self._lookup(self._keys, kid)
+
+
+jwks_cache = JWKSCache()
+
 
 class CustomAdapter(OAuth2Adapter):
     provider_id = "drupal_oauth_provider"
@@ -35,8 +175,8 @@ class CustomAdapter(OAuth2Adapter):
     # requires additional debug permissions for users
     debug_url = "{}/oauth/debug?_format=json".format(api_url)
 
-    def _get_public_key_jwk(self, headers):
-        response = requests.get(self.public_key_url, headers=headers)
+    def _get_public_key_jwks(self, headers):
+        response = drupal_get("jwks", self.public_key_url, headers)
         response.raise_for_status()
 
         try:
@@ -44,17 +184,13 @@ class CustomAdapter(OAuth2Adapter):
         except json.JSONDecodeError as e:
             raise OAuth2Error("Error retrieving drupal public key.") from e
         else:
-            keys = data.get("keys")
-            return keys[0]
+            return data.get("keys") or []
 
-    def get_public_key(self, headers):
-        public_key_jwk = self._get_public_key_jwk(headers)
-        try:
-            public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(public_key_jwk))
-        except Exception as e:
-            logger.error(f"[get_public_key] failed to convert jwk to public key {e}")
-        else:
-            return public_key
+    def get_public_key(self, headers, kid=None):
+        public_key = jwks_cache.get(kid, lambda: self._get_public_key_jwks(headers))
+        if public_key is None:
+            logger.error(f"[get_public_key] no public key found for kid {kid}")
+        return public_key
 
     def get_client_id(self):
         app = get_adapter().get_app(request=None, provider=self.provider_id)
@@ -62,11 +198,12 @@ class CustomAdapter(OAuth2Adapter):
 
     def get_scopes_from_token(self, id_token, headers):
         allowed_audience = self.get_client_id()
-        public_key = self.get_public_key(headers)
         scopes = None
+        unverified_header = None
 
         try:
             unverified_header = jwt.get_unverified_header(id_token.token)
+            public_key = self.get_public_key(headers, kid=unverified_header.get("kid"))
             token_payload = jwt.decode(
                 id_token.token,
                 public_key,
@@ -88,10 +225,13 @@ class CustomAdapter(OAuth2Adapter):
     def complete_login(self, request, app, token, **kwargs):
         headers = {"Authorization": "Bearer {0}".format(token.token)}
 
-        scopes_granted = self.get_scopes_from_token(token, headers)
+        # The userinfo call does not depend on the id_token, so fetch it while the token is verified.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            profile_future = executor.submit(drupal_get, "userinfo", self.profile_url, headers)
+            scopes_granted = self.get_scopes_from_token(token, headers)
+            resp = profile_future.result()
         managed_scope_status = self.get_provider().get_provider_managed_scope_status(scopes_granted)
 
-        resp = requests.get(self.profile_url, headers=headers)
         resp.raise_for_status()
         extra_data = resp.json()
         logger.debug(
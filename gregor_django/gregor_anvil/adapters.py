@@ -27,6 +27,78 @@ workspace_admin_sharing_permission = WorkspaceSharingPermission(
 )
 
 
+# Tables of contributing workspaces shown on combined and release workspace detail pages. Each entry is the context
+# name of the table, the contributing workspaces field, the type of those workspaces, the table class, and the
+# related fields shown in the table.
+CONTRIBUTING_WORKSPACE_TABLES = (
+    (
+        "contributing_upload_workspace_table",
+        "contributing_upload_workspaces",
+        "upload",
+        tables.UploadWorkspaceTable,
+        (
+            "uploadworkspace__upload_cycle",
+            "uploadworkspace__research_center",
+            "uploadworkspace__consent_group",
+        ),
+    ),
+    (
+        "contributing_dcc_processed_data_workspace_table",
+        "contributing_dcc_processed_data_workspaces",
+        "dcc_processed_data",
+        tables.DCCProcessedDataWorkspaceTable,
+        (
+            "dccprocesseddataworkspace__upload_cycle",
+            "dccprocesseddataworkspace__consent_group",
+        ),
+    ),
+    (
+        "contributing_partner_upload_workspace_table",
+        "contributing_partner_upload_workspaces",
+        "partner_upload",
+        tables.PartnerUploadWorkspaceTable,
+        (
+            "partneruploadworkspace__partner_group",
+            "partneruploadworkspace__consent_group",
+        ),
+    ),
+    (
+        "contributing_rc_processed_data_workspace_table",
+        "contributing_rc_processed_data_workspaces",
+        "rc_processed_data",
+        tables.RCProcessedDataWorkspaceTable,
+        (
+            "rcprocesseddataworkspace__research_center",
+            "rcprocesseddataworkspace__consent_group",
+            "rcprocesseddataworkspace__upload_cycle",
+        ),
+    ),
+)
+
+
+def get_contributing_workspace_tables(workspace_data):
+    """Return the tables of workspaces contributing to a combined or release workspace, keyed by context name.
+
+    All contributing workspaces are loaded in a single query, along with the related data shown in the tables and
+    their consortium access, so the number of queries does not depend on the number of contributing workspaces."""
+    consortium_groups = tables.WorkspaceConsortiumAccessTable.get_consortium_groups()
+    contributing = Q()
+    related_fields = ["billing_project"]
+    for _, field, _, _, fields in CONTRIBUTING_WORKSPACE_TABLES:
+        contributing |= Q(pk__in=getattr(workspace_data, field).values_list("workspace__pk", flat=True))
+        related_fields.extend(fields)
+    workspaces = Workspace.objects.filter(contributing).select_related(*related_fields)
+    if consortium_groups:
+        workspaces = tables.WorkspaceConsortiumAccessTable.annotate_consortium_access(workspaces, consortium_groups)
+    workspaces_by_type = {}
+    for workspace in workspaces:
+        workspaces_by_type.setdefault(workspace.workspace_type, []).append(workspace)
+    return {
+        name: table_class(workspaces_by_type.get(workspace_type, []), consortium_groups=consortium_groups)
+        for name, _, workspace_type, table_class, _ in CONTRIBUTING_WORKSPACE_TABLES
+    }
+
+
 class AccountAdapter(BaseAccountAdapter):
     """Custom account adapter for PRIMED."""
 
@@ -197,35 +269,8 @@ class CombinedConsortiumDataWorkspaceAdapter(WorkspaceSharingAdapterMixin, BaseW
     def get_extra_detail_context_data(self, workspace, request):
         """Get extra context data for the release workspace detail view."""
         context = super().get_extra_detail_context_data(workspace, request)
-        # Add the list of upload workspaces associated with this release workspace.
-        context["contributing_upload_workspace_table"] = tables.UploadWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.combinedconsortiumdataworkspace.contributing_upload_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
-        context["contributing_dcc_processed_data_workspace_table"] = tables.DCCProcessedDataWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.combinedconsortiumdataworkspace.contributing_dcc_processed_data_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
-        context["contributing_partner_upload_workspace_table"] = tables.PartnerUploadWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.combinedconsortiumdataworkspace.contributing_partner_upload_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
-        context["contributing_rc_processed_data_workspace_table"] = tables.RCProcessedDataWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.combinedconsortiumdataworkspace.contributing_rc_processed_data_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
+        # Add the tables of workspaces contributing to this workspace.
+        context.update(get_contributing_workspace_tables(workspace.combinedconsortiumdataworkspace))
         return context
 
 
@@ -246,33 +291,8 @@ class ReleaseWorkspaceAdapter(WorkspaceSharingAdapterMixin, BaseWorkspaceAdapter
     def get_extra_detail_context_data(self, workspace, request):
         """Get extra context data for the release workspace detail view."""
         context = super().get_extra_detail_context_data(workspace, request)
-        # Add the list of upload workspaces associated with this release workspace.
-        context["contributing_upload_workspace_table"] = tables.UploadWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.releaseworkspace.contributing_upload_workspaces.values_list("workspace__pk", flat=True)
-            ),
-        )
-        context["contributing_dcc_processed_data_workspace_table"] = tables.DCCProcessedDataWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.releaseworkspace.contributing_dcc_processed_data_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
-        context["contributing_partner_upload_workspace_table"] = tables.PartnerUploadWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.releaseworkspace.contributing_partner_upload_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
-        context["contributing_rc_processed_data_workspace_table"] = tables.RCProcessedDataWorkspaceTable(
-            Workspace.objects.filter(
-                pk__in=workspace.releaseworkspace.contributing_rc_processed_data_workspaces.values_list(
-                    "workspace__pk", flat=True
-                )
-            ),
-        )
+        # Add the tables of workspaces contributing to this workspace.
+        context.update(get_contributing_workspace_tables(workspace.releaseworkspace))
         return context
 
 
@@ -221,3 +221,41 @@ class RCProcessedDataWorkspaceAdmin(SimpleHistoryAdmin):
         "workspace",
         "version",
     )
+
+
+@admin.register(models.StoredAuditResult)
+class StoredAuditResultAdmin(admin.ModelAdmin):
+    """Admin class for the StoredAuditResult model."""
+
+    list_display = (
+        "audit_class",
+        "workspace",
+        "managed_group",
+        "result_type",
+        "status",
+        "created",
+    )
+    list_filter = (
+        "audit_class",
+        "status",
+    )
+    search_fields = (
+        "workspace__name",
+        "managed_group__name",
+    )
+
+
+@admin.register(models.QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    """Admin class for the QueuedEmail model."""
+
+    list_display = (
+        "subject",
+        "to",
+        "status",
+        "attempts",
+        "created",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject",)
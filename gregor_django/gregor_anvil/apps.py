@@ -6,3 +6,6 @@ class GregorAnvilConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "gregor_django.gregor_anvil"
+
+    def ready(self):
+        import gregor_django.gregor_anvil.signals  # noqa F401
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod, abstractproperty
 
+from .upload_cycle_lookup import UploadCycleLookup
+
 
 class GREGoRAuditResult(ABC):
     """Abstract base class to hold an audit result for a single check.
@@ -42,6 +44,7 @@ class GREGoRAudit(ABC):
         needs_action: A list of GREGoRAuditResult subclasses instances that some sort of need action.
         errors: A list of GREGoRAuditResult subclasses instances where an error has been detected.
         completed: A boolean indicator of whether the audit has been run.
+        upload_cycle_lookup: An UploadCycleLookup instance shared by all checks in this audit run.
     """
 
     # TODO: Add add_verified_result, add_needs_action_result, add_error_result methods. They should
@@ -58,6 +61,8 @@ class GREGoRAudit(ABC):
         self.needs_action = []
         self.errors = []
         self.completed = False
+        # Upload cycle status and completed combined workspaces, computed once for the whole run.
+        self.upload_cycle_lookup = UploadCycleLookup()
 
     @abstractmethod
     def _run_audit(self):
@@ -125,6 +130,15 @@ class GREGoRAudit(ABC):
         self._check_completed()
         return self.results_table_class([x.get_table_dictionary() for x in self.errors])
 
+    def get_result_counts(self):
+        """Return the number of results of each type.
+
+        Returns:
+            dict: The number of `verified`, `needs_action`, and `errors` results.
+        """
+        self._check_completed()
+        return {"verified": len(self.verified), "needs_action": len(self.needs_action), "errors": len(self.errors)}
+
     def ok(self):
         """Check audit results to see if action is needed.
 
@@ -0,0 +1,108 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from anvil_consortium_manager.anvil_api import AnVILAPIError
+from anvil_consortium_manager.exceptions import AnVILGroupNotFound
+from django.db import connections, transaction
+
+from .. import reaudit_queue
+from .base import GREGoRAuditResult
+
+logger = logging.getLogger(__name__)
+
+# AnVIL API status codes for which a failed call is retried.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class ResolvedAuditResult:
+    """The outcome of resolving a single audit result."""
+
+    audit_result: GREGoRAuditResult
+    error: Exception = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def get_resolvable_results(audit):
+    """Return the "needs action" results of a completed audit that can be resolved automatically."""
+    audit._check_completed()
+    return [x for x in audit.needs_action if x.action]
+
+
+def _is_retryable(error):
+    return isinstance(error, AnVILAPIError) and getattr(error, "status_code", None) in RETRY_STATUS_CODES
+
+
+def _resolve(audit_result, max_retries, retry_delay):
+    """Handle one audit result, retrying transient AnVIL API errors."""
+    attempt = 0
+    while True:
+        try:
+            # The database changes are rolled back if the AnVIL call fails.
+            with transaction.atomic():
+                audit_result.handle()
+        except (AnVILAPIError, AnVILGroupNotFound) as e:
+            if attempt < max_retries and _is_retryable(e):
+                attempt += 1
+                logger.info("Retrying %s after AnVIL API error: %s", audit_result, e)
+                time.sleep(retry_delay * 2 ** (attempt - 1))
+                continue
+            return ResolvedAuditResult(audit_result=audit_result, error=e)
+        return ResolvedAuditResult(audit_result=audit_result)
+
+
+def _resolve_collecting_changes(audit_result, max_retries, retry_delay):
+    """Handle one audit result, returning the ResolvedAuditResult and the changes to re-audit."""
+    with reaudit_queue.collect_changes() as changes:
+        resolved_result = _resolve(audit_result, max_retries, retry_delay)
+    return resolved_result, changes
+
+
+def _resolve_in_thread(audit_result, max_retries, retry_delay):
+    try:
+        return _resolve_collecting_changes(audit_result, max_retries, retry_delay)
+    finally:
+        # Database connections are per-thread; close this worker's connections so they are not leaked.
+        connections.close_all()
+
+
+def resolve_audit_results(audit_results, max_workers=4, max_retries=2, retry_delay=1):
+    """Resolve many audit results, running their AnVIL API calls concurrently.
+
+    Each result is handled in its own transaction, so a failed AnVIL call only rolls back the database
+    changes for that result. Calls that fail with a transient AnVIL API error are retried with exponential
+    backoff. The workspaces changed by resolving the results are queued for re-auditing once, after all results
+    have been handled, instead of once per result.
+
+    Args:
+        audit_results: A list of GREGoRAuditResult instances to handle.
+        max_workers: Maximum number of results to resolve at the same time. If 1, results are resolved one
+            at a time in the calling thread.
+        max_retries: Maximum number of times to retry a transient AnVIL API error for each result.
+        retry_delay: Number of seconds to wait before the first retry.
+
+    Returns:
+        list: A ResolvedAuditResult for each audit result, in the same order as `audit_results`.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1.")
+    if max_workers == 1:
+        outcomes = [_resolve_collecting_changes(x, max_retries, retry_delay) for x in audit_results]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_resolve_in_thread, x, max_retries, retry_delay) for x in audit_results]
+            outcomes = [future.result() for future in futures]
+    workspace_pks = set()
+    for _, changes in outcomes:
+        for get_workspace_pks in changes:
+            workspace_pks.update(get_workspace_pks())
+    if workspace_pks:
+        # The caller may be inside a transaction (e.g., a request with ATOMIC_REQUESTS) whose snapshot predates the
+        # changes committed by the worker threads, so queue the re-audit to run after that transaction commits.
+        transaction.on_commit(lambda: reaudit_queue.queue_reaudit(workspace_pks), robust=True)
+    return [resolved_result for resolved_result, _ in outcomes]
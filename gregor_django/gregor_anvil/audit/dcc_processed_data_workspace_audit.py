@@ -3,7 +3,7 @@ from anvil_consortium_manager.models import GroupGroupMembership, ManagedGroup,
 from django.conf import settings
 from django.db.models import Q, QuerySet
 
-from ..models import CombinedConsortiumDataWorkspace, DCCProcessedDataWorkspace
+from ..models import DCCProcessedDataWorkspace
 from ..tables import BooleanIconColumn
 from . import workspace_auth_domain_audit_results, workspace_sharing_audit_results
 from .base import GREGoRAudit
@@ -60,16 +60,6 @@ class DCCProcessedDataWorkspaceAuthDomainAudit(GREGoRAudit):
             current_membership = None
         return current_membership
 
-    def _get_combined_workspace(self, upload_cycle):
-        """Returns the combined workspace, but only if it is ready for sharing."""
-        try:
-            combined_workspace = CombinedConsortiumDataWorkspace.objects.get(
-                upload_cycle=upload_cycle, date_completed__isnull=False
-            )
-        except CombinedConsortiumDataWorkspace.DoesNotExist:
-            combined_workspace = None
-        return combined_workspace
-
     def audit_workspace(self, workspace_data):
         """Audit the auth domain membership of a single CombinedWorkspace."""
         group_names = [
@@ -130,7 +120,7 @@ class DCCProcessedDataWorkspaceAuthDomainAudit(GREGoRAudit):
         - Member after combined workspace is complete.
         """
         current_membership = self._get_current_membership(workspace_data, managed_group)
-        combined_workspace = self._get_combined_workspace(workspace_data.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(workspace_data.upload_cycle)
         audit_result_args = {
             "workspace": workspace_data.workspace,
             "managed_group": managed_group,
@@ -193,7 +183,7 @@ class DCCProcessedDataWorkspaceAuthDomainAudit(GREGoRAudit):
         - Not direct member after combined workspace is complete.
         """
         current_membership = self._get_current_membership(workspace_data, managed_group)
-        combined_workspace = self._get_combined_workspace(workspace_data.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(workspace_data.upload_cycle)
         audit_result_args = {
             "workspace": workspace_data.workspace,
             "managed_group": managed_group,
@@ -334,16 +324,6 @@ class DCCProcessedDataWorkspaceSharingAudit(GREGoRAudit):
             current_sharing = None
         return current_sharing
 
-    def _get_combined_workspace(self, upload_cycle):
-        """Returns the combined workspace, but only if it is ready for sharing."""
-        try:
-            combined_workspace = CombinedConsortiumDataWorkspace.objects.get(
-                upload_cycle=upload_cycle, date_completed__isnull=False
-            )
-        except CombinedConsortiumDataWorkspace.DoesNotExist:
-            combined_workspace = None
-        return combined_workspace
-
     def audit_workspace(self, workspace_data):
         """Audit access for a specific DCCProcessedDataWorkspace."""
         # Get a list of managed groups that should be included in this audit.
@@ -390,7 +370,7 @@ class DCCProcessedDataWorkspaceSharingAudit(GREGoRAudit):
         - No direct access to after combined workspace is ready (read access via auth domain).
         """
         current_sharing = self._get_current_sharing(workspace_data, managed_group)
-        combined_workspace = self._get_combined_workspace(workspace_data.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(workspace_data.upload_cycle)
         audit_results_arg = {
             "workspace": workspace_data.workspace,
             "managed_group": managed_group,
@@ -0,0 +1,85 @@
+import csv
+import json
+
+from ..models import StoredAuditResult
+from .result_store import StoredAudit
+
+# Content type of each export format.
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+}
+
+# Number of stored results to load from the database at a time.
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """A file-like object that returns what is written to it instead of storing it, for use with csv writers."""
+
+    def write(self, value):
+        return value
+
+
+def get_audit_name(audit):
+    """Return the name of the audit class, unwrapping stored audits."""
+    if isinstance(audit, StoredAudit):
+        audit = audit.audit
+    return type(audit).__name__
+
+
+def get_export_columns(audit):
+    """Return the names of the exported columns: the audit name, the status of each result, and the results table
+    columns."""
+    return ["audit", "status", *audit.results_table_class.base_columns]
+
+
+def iter_results(audit):
+    """Yield a (status, table dictionary) tuple for each result of an audit.
+
+    Stored audits are read from the database in chunks, so the results do not need to be loaded first. Other audits
+    must have been run."""
+    if isinstance(audit, StoredAudit):
+        stored_results = audit.get_stored_results().select_related("workspace", "managed_group").order_by("pk")
+        for stored_result in stored_results.iterator(chunk_size=CHUNK_SIZE):
+            yield stored_result.status, stored_result.get_table_dictionary()
+        return
+    audit._check_completed()
+    results_by_status = (
+        (StoredAuditResult.StatusTypes.VERIFIED, audit.verified),
+        (StoredAuditResult.StatusTypes.NEEDS_ACTION, audit.needs_action),
+        (StoredAuditResult.StatusTypes.ERROR, audit.errors),
+    )
+    for status, results in results_by_status:
+        for result in results:
+            yield status.value, result.get_table_dictionary()
+
+
+def export_csv(audit):
+    """Yield the results of an audit as lines of CSV, starting with a header line.
+
+    Model instances are written as their string representation, and keys that are not results table columns are
+    left out."""
+    audit_name = get_audit_name(audit)
+    writer = csv.DictWriter(_Echo(), fieldnames=get_export_columns(audit), extrasaction="ignore")
+    yield writer.writeheader()
+    for status, row in iter_results(audit):
+        yield writer.writerow({**row, "audit": audit_name, "status": status})
+
+
+def export_jsonl(audit):
+    """Yield the results of an audit as JSON Lines, with one object per result.
+
+    Model instances are written as their string representation."""
+    audit_name = get_audit_name(audit)
+    for status, row in iter_results(audit):
+        yield json.dumps({"audit": audit_name, "status": status, **row}, default=str) + "\n"
+
+
+def export_results(audit, export_format):
+    """Return an iterator over the results of an audit in the given export format."""
+    if export_format == "csv":
+        return export_csv(audit)
+    if export_format == "jsonl":
+        return export_jsonl(audit)
+    raise ValueError("export_format must be one of: {}".format(", ".join(EXPORT_FORMATS)))
@@ -0,0 +1,255 @@
+import uuid
+
+from anvil_consortium_manager.models import Workspace
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django_tables2.data import TableData
+from django_tables2.utils import OrderBy
+
+from ..models import (
+    CombinedConsortiumDataWorkspace,
+    DCCProcessedDataWorkspace,
+    StoredAuditResult,
+    UploadWorkspace,
+)
+from .base import GREGoRAudit
+from .combined_workspace_audit import (
+    CombinedConsortiumDataWorkspaceAuthDomainAudit,
+    CombinedConsortiumDataWorkspaceSharingAudit,
+)
+from .dcc_processed_data_workspace_audit import (
+    DCCProcessedDataWorkspaceAuthDomainAudit,
+    DCCProcessedDataWorkspaceSharingAudit,
+)
+from .upload_workspace_audit import UploadWorkspaceAuthDomainAudit, UploadWorkspaceSharingAudit
+
+# (audit class, workspace data model audited by that class) for each audit whose results are stored.
+STORED_AUDITS = [
+    (UploadWorkspaceSharingAudit, UploadWorkspace),
+    (UploadWorkspaceAuthDomainAudit, UploadWorkspace),
+    (CombinedConsortiumDataWorkspaceSharingAudit, CombinedConsortiumDataWorkspace),
+    (CombinedConsortiumDataWorkspaceAuthDomainAudit, CombinedConsortiumDataWorkspace),
+    (DCCProcessedDataWorkspaceSharingAudit, DCCProcessedDataWorkspace),
+    (DCCProcessedDataWorkspaceAuthDomainAudit, DCCProcessedDataWorkspace),
+]
+
+# Keys of GREGoRAuditResult table dictionaries that are stored in their own StoredAuditResult fields.
+_TABLE_FIELDS = ("workspace", "managed_group", "note", "action")
+
+# Fields to order stored results by for each results table column stored in its own field. Other columns are ordered
+# by their key in `details`.
+_ORDER_FIELDS = {
+    "workspace": "workspace__name",
+    "managed_group": "managed_group__name",
+    "note": "note",
+    "action": "action",
+}
+
+
+def _make_stored_result(audit_class_name, run_id, result, status):
+    row = result.get_table_dictionary()
+    return StoredAuditResult(
+        audit_class=audit_class_name,
+        run_id=run_id,
+        workspace=row["workspace"],
+        managed_group=row["managed_group"],
+        result_type=type(result).__name__,
+        status=status,
+        note=row["note"] or "",
+        action=row["action"] or "",
+        details={key: value for key, value in row.items() if key not in _TABLE_FIELDS},
+    )
+
+
+def _lock_workspaces(workspaces):
+    """Lock the given Workspace rows until the end of the current transaction.
+
+    The rows act as guards, so that stored results for the same workspace are never replaced by two transactions at
+    once. Rows are locked in primary key order to avoid deadlocks."""
+    list(Workspace.objects.filter(pk__in=workspaces).order_by("pk").select_for_update().values_list("pk", flat=True))
+
+
+def save_audit_results(audit):
+    """Store the results of a completed audit, replacing any stored results for the audited workspaces.
+
+    Args:
+        audit: A completed GREGoRAudit instance with a `queryset` of workspace data objects.
+
+    Returns:
+        UUID: The run id assigned to the stored results.
+    """
+    audit._check_completed()
+    audit_class_name = type(audit).__name__
+    run_id = uuid.uuid4()
+    results_by_status = (
+        (StoredAuditResult.StatusTypes.VERIFIED, audit.verified),
+        (StoredAuditResult.StatusTypes.NEEDS_ACTION, audit.needs_action),
+        (StoredAuditResult.StatusTypes.ERROR, audit.errors),
+    )
+    stored_results = [
+        _make_stored_result(audit_class_name, run_id, result, status)
+        for status, results in results_by_status
+        for result in results
+    ]
+    with transaction.atomic():
+        _lock_workspaces(audit.queryset.values("workspace"))
+        StoredAuditResult.objects.filter(
+            audit_class=audit_class_name,
+            workspace__in=audit.queryset.values("workspace"),
+        ).delete()
+        StoredAuditResult.objects.bulk_create(stored_results)
+    return run_id
+
+
+def reaudit_workspaces(workspace_pks):
+    """Re-run stored audits for only the given workspaces and replace their stored results.
+
+    Audits that have never been stored are skipped, so this is a no-op until results have been saved by a
+    full audit run.
+
+    Args:
+        workspace_pks: An iterable of anvil_consortium_manager Workspace primary keys.
+    """
+    workspace_pks = set(workspace_pks)
+    if not workspace_pks:
+        return
+    stored_audit_classes = set(StoredAuditResult.objects.values_list("audit_class", flat=True).distinct())
+    for audit_class, model in STORED_AUDITS:
+        if audit_class.__name__ not in stored_audit_classes:
+            continue
+        audit = audit_class(queryset=model.objects.filter(workspace__in=workspace_pks))
+        audit.run_audit()
+        save_audit_results(audit)
+        # Remove results for workspaces that are no longer audited by this class.
+        with transaction.atomic():
+            _lock_workspaces(workspace_pks)
+            StoredAuditResult.objects.filter(audit_class=audit_class.__name__, workspace__in=workspace_pks).exclude(
+                workspace__in=audit.queryset.values("workspace")
+            ).delete()
+
+
+class StoredAuditResultTableData(TableData):
+    """Data for an audit results table from a queryset of StoredAuditResults.
+
+    The table is ordered in the database, and only the rows on the displayed page are loaded, as the table
+    dictionaries of the stored results."""
+
+    def __len__(self):
+        if not hasattr(self, "_length"):
+            self._length = self.data.count()
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [x.get_table_dictionary() for x in self.data[key]]
+        return self.data[key].get_table_dictionary()
+
+    def __iter__(self):
+        return (x.get_table_dictionary() for x in self.data)
+
+    def order_by(self, aliases):
+        fields = []
+        for alias in aliases:
+            alias = OrderBy(alias)
+            field = _ORDER_FIELDS.get(alias.bare, "details__" + alias.bare)
+            fields.append("-" + field if alias.is_descending else field)
+        self.data = self.data.order_by(*fields, "pk")
+
+
+class StoredAudit(GREGoRAudit):
+    """The stored results of an audit, loaded from the database instead of being recomputed.
+
+    The `verified`, `needs_action`, and `errors` lists hold StoredAuditResult instances for the workspaces in
+    the wrapped audit's queryset. Results for different workspaces may come from different runs, since
+    workspaces are re-audited individually when their sharing or membership changes.
+
+    Typical usage:
+        stored_audit = StoredAudit(UploadWorkspaceSharingAudit())
+        stored_audit.run_audit()
+        if stored_audit.date_run is None:
+            # No results have been stored for these workspaces.
+            ...
+
+    To show the results without loading all of them, call `load_summary` instead of `run_audit` and use the
+    results tables, which are paginated and ordered in the database.
+
+    Attributes:
+        audit: The (unrun) GREGoRAudit instance whose stored results should be loaded.
+        queryset: The queryset of workspace data objects from the wrapped audit.
+        date_run: The time of the most recent stored result, or None if no results are stored.
+    """
+
+    def __init__(self, audit):
+        super().__init__()
+        self.audit = audit
+        self.queryset = audit.queryset
+        self.date_run = None
+        self._result_counts = None
+
+    @property
+    def results_table_class(self):
+        return self.audit.results_table_class
+
+    def get_stored_results(self):
+        """Return a queryset of all stored results for the audited workspaces."""
+        return StoredAuditResult.objects.filter(
+            audit_class=type(self.audit).__name__,
+            workspace__in=self.queryset.values("workspace"),
+        )
+
+    def load_summary(self):
+        """Set `date_run` and the number of stored results of each type, without loading the results themselves."""
+        summary = self.get_stored_results().aggregate(
+            date_run=Max("created"),
+            verified=Count("pk", filter=Q(status=StoredAuditResult.StatusTypes.VERIFIED)),
+            needs_action=Count("pk", filter=Q(status=StoredAuditResult.StatusTypes.NEEDS_ACTION)),
+            errors=Count("pk", filter=Q(status=StoredAuditResult.StatusTypes.ERROR)),
+        )
+        self.date_run = summary.pop("date_run")
+        self._result_counts = summary
+
+    def get_result_counts(self):
+        if self._result_counts is None:
+            return super().get_result_counts()
+        return self._result_counts
+
+    def get_results(self, status):
+        """Return a queryset of the stored results with the given status."""
+        return (
+            self.get_stored_results()
+            .filter(status=status)
+            .select_related("workspace__billing_project", "managed_group")
+            .order_by("workspace__name", "managed_group__name", "pk")
+        )
+
+    def get_results_table(self, status):
+        """Return a table of the stored results with the given status.
+
+        Rows are only loaded from the database when the table is rendered, so the table can be paginated and
+        ordered without loading all results. The audit does not need to be run first."""
+        return self.results_table_class(StoredAuditResultTableData(self.get_results(status)))
+
+    def get_verified_table(self):
+        return self.get_results_table(StoredAuditResult.StatusTypes.VERIFIED)
+
+    def get_needs_action_table(self):
+        return self.get_results_table(StoredAuditResult.StatusTypes.NEEDS_ACTION)
+
+    def get_errors_table(self):
+        return self.get_results_table(StoredAuditResult.StatusTypes.ERROR)
+
+    def _run_audit(self):
+        stored_results = (
+            self.get_stored_results()
+            .select_related("workspace__billing_project", "managed_group")
+            .order_by("workspace__name", "managed_group__name")
+        )
+        for stored_result in stored_results:
+            if stored_result.status == StoredAuditResult.StatusTypes.VERIFIED:
+                self.verified.append(stored_result)
+            elif stored_result.status == StoredAuditResult.StatusTypes.NEEDS_ACTION:
+                self.needs_action.append(stored_result)
+            else:
+                self.errors.append(stored_result)
+            if self.date_run is None or stored_result.created > self.date_run:
+                self.date_run = stored_result.created
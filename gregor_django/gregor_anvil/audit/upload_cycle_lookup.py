@@ -0,0 +1,45 @@
+from django.utils import timezone
+
+from ..models import CombinedConsortiumDataWorkspace
+
+
+class UploadCycleLookup:
+    """A run-scoped lookup of upload cycle status and completed combined workspaces for GREGoR audits.
+
+    All status checks use the same value of "today", taken when the lookup is created, so an audit run that
+    crosses midnight treats every upload cycle consistently. Completed CombinedConsortiumDataWorkspaces are
+    loaded with a single query the first time they are needed and cached for the rest of the run.
+
+    Typical usage:
+        lookup = UploadCycleLookup()
+        if lookup.is_past(upload_cycle) and lookup.get_combined_workspace(upload_cycle):
+            ...
+    """
+
+    def __init__(self, today=None):
+        if today is None:
+            today = timezone.localdate()
+        self.today = today
+        self._combined_workspaces = None
+
+    def _load_combined_workspaces(self):
+        qs = CombinedConsortiumDataWorkspace.objects.filter(date_completed__isnull=False)
+        self._combined_workspaces = {x.upload_cycle_id: x for x in qs}
+
+    def get_combined_workspace(self, upload_cycle):
+        """Returns the combined workspace for an upload cycle, but only if it is ready for sharing."""
+        if self._combined_workspaces is None:
+            self._load_combined_workspaces()
+        return self._combined_workspaces.get(upload_cycle.pk)
+
+    def is_current(self, upload_cycle):
+        """Return a boolean indicating whether an upload cycle is the current one."""
+        return upload_cycle.start_date <= self.today and upload_cycle.end_date >= self.today
+
+    def is_past(self, upload_cycle):
+        """Return a boolean indicating whether an upload cycle is a past cycle."""
+        return upload_cycle.end_date < self.today
+
+    def is_future(self, upload_cycle):
+        """Return a boolean indicating whether an upload cycle is a future cycle."""
+        return upload_cycle.start_date > self.today
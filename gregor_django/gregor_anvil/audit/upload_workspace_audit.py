@@ -1,9 +1,16 @@
+from collections import defaultdict
+
 import django_tables2 as tables
-from anvil_consortium_manager.models import GroupGroupMembership, ManagedGroup, WorkspaceGroupSharing
+from anvil_consortium_manager.models import (
+    GroupGroupMembership,
+    ManagedGroup,
+    WorkspaceAuthorizationDomain,
+    WorkspaceGroupSharing,
+)
 from django.conf import settings
 from django.db.models import Q, QuerySet
 
-from ..models import CombinedConsortiumDataWorkspace, UploadWorkspace
+from ..models import UploadWorkspace
 from ..tables import BooleanIconColumn
 from . import workspace_auth_domain_audit_results, workspace_sharing_audit_results
 from .base import GREGoRAudit
@@ -69,12 +76,60 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
         if not (isinstance(queryset, QuerySet) and queryset.model is UploadWorkspace):
             raise ValueError("queryset must be a queryset of UploadWorkspace objects.")
         self.queryset = queryset
+        # In-memory indexes of the data needed for the audit. These are populated by `_preload` when the full
+        # audit is run; otherwise, lookups for single workspaces and groups fall back to database queries.
+        self._preloaded = False
+        self._auth_domain_index = {}
+        self._membership_index = {}
+        self._member_groups_index = {}
+        self._named_groups = []
 
     def _run_audit(self):
-        for workspace in self.queryset:
+        self._preload()
+        queryset = self.queryset.select_related(
+            "workspace",
+            "upload_cycle",
+            "research_center__uploader_group",
+            "research_center__member_group",
+            "research_center__non_member_group",
+        )
+        for workspace in queryset:
             self.audit_upload_workspace(workspace)
 
+    def _preload(self):
+        """Load all auth domains, auth domain memberships, and named groups for the queryset in bulk.
+
+        Memberships are stored in a dictionary keyed by (parent_group_id, child_group_id)."""
+        self._auth_domain_index = {}
+        auth_domains = WorkspaceAuthorizationDomain.objects.filter(
+            workspace__in=self.queryset.values("workspace")
+        ).order_by("group_id")
+        for auth_domain in auth_domains:
+            # Match `authorization_domains.first()` if a workspace has more than one auth domain.
+            self._auth_domain_index.setdefault(auth_domain.workspace_id, auth_domain.group_id)
+        self._membership_index = {}
+        self._member_groups_index = defaultdict(list)
+        memberships = GroupGroupMembership.objects.filter(
+            parent_group__in=set(self._auth_domain_index.values())
+        ).select_related("child_group")
+        for membership in memberships:
+            self._membership_index[(membership.parent_group_id, membership.child_group_id)] = membership
+            self._member_groups_index[membership.parent_group_id].append(membership.child_group)
+        self._named_groups = list(ManagedGroup.objects.filter(name__in=self._get_group_names_to_include()))
+        self._preloaded = True
+
+    def _get_group_names_to_include(self):
+        return [
+            "GREGOR_ALL",
+            "GREGOR_DCC_MEMBERS",
+            "GREGOR_DCC_WRITERS",
+            settings.ANVIL_DCC_ADMINS_GROUP_NAME,
+        ]
+
     def _get_current_membership(self, upload_workspace, managed_group):
+        if self._preloaded:
+            auth_domain_id = self._auth_domain_index.get(upload_workspace.workspace_id)
+            return self._membership_index.get((auth_domain_id, managed_group.pk))
         try:
             current_membership = GroupGroupMembership.objects.get(
                 parent_group=upload_workspace.workspace.authorization_domains.first(), child_group=managed_group
@@ -83,43 +138,42 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
             current_membership = None
         return current_membership
 
-    def _get_combined_workspace(self, upload_cycle):
-        """Returns the combined workspace, but only if it is ready for sharing."""
-        try:
-            combined_workspace = CombinedConsortiumDataWorkspace.objects.get(
-                upload_cycle=upload_cycle, date_completed__isnull=False
-            )
-        except CombinedConsortiumDataWorkspace.DoesNotExist:
-            combined_workspace = None
-        return combined_workspace
+    def _get_groups_to_audit(self, upload_workspace):
+        """Return the managed groups that should be included in the audit of a specific UploadWorkspace."""
+        research_center = upload_workspace.research_center
+        if not self._preloaded:
+            return ManagedGroup.objects.filter(
+                # RC uploader group.
+                Q(research_center_of_uploaders=research_center)
+                |
+                # RC member group.
+                Q(research_center_of_members=research_center)
+                |
+                # RC non-member group.
+                Q(research_center_of_non_members=research_center)
+                |
+                # Other sepcific groups to include.
+                Q(name__in=self._get_group_names_to_include())
+                |
+                # Any other groups that are members.
+                Q(parent_memberships__parent_group=upload_workspace.workspace.authorization_domains.first())
+            ).distinct()
+        groups = {group.pk: group for group in self._named_groups}
+        for group in [
+            research_center.uploader_group,
+            research_center.member_group,
+            research_center.non_member_group,
+        ]:
+            if group:
+                groups[group.pk] = group
+        auth_domain_id = self._auth_domain_index.get(upload_workspace.workspace_id)
+        for group in self._member_groups_index.get(auth_domain_id, []):
+            groups[group.pk] = group
+        return [groups[pk] for pk in sorted(groups)]
 
     def audit_upload_workspace(self, upload_workspace):
         """Audit the auth domain membership of a single UploadWorkspace."""
-        research_center = upload_workspace.research_center
-        group_names = [
-            "GREGOR_ALL",
-            "GREGOR_DCC_MEMBERS",
-            "GREGOR_DCC_WRITERS",
-            settings.ANVIL_DCC_ADMINS_GROUP_NAME,
-        ]
-        groups_to_audit = ManagedGroup.objects.filter(
-            # RC uploader group.
-            Q(research_center_of_uploaders=research_center)
-            |
-            # RC member group.
-            Q(research_center_of_members=research_center)
-            |
-            # RC non-member group.
-            Q(research_center_of_non_members=research_center)
-            |
-            # Other sepcific groups to include.
-            Q(name__in=group_names)
-            |
-            # Any other groups that are members.
-            Q(parent_memberships__parent_group=upload_workspace.workspace.authorization_domains.first())
-        ).distinct()
-
-        for group in groups_to_audit:
+        for group in self._get_groups_to_audit(upload_workspace):
             self.audit_workspace_and_group(upload_workspace, group)
 
     def audit_workspace_and_group(self, upload_workspace, managed_group):
@@ -153,7 +207,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
         }
 
         # Otherwise, proceed with other checks.
-        if upload_workspace.upload_cycle.is_future:
+        if self.upload_cycle_lookup.is_future(upload_workspace.upload_cycle):
             note = self.RC_FUTURE_CYCLE
             if membership and membership.role == GroupGroupMembership.RoleChoices.ADMIN:
                 self.errors.append(workspace_auth_domain_audit_results.Remove(note=note, **result_kwargs))
@@ -161,7 +215,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
                 self.needs_action.append(workspace_auth_domain_audit_results.Remove(note=note, **result_kwargs))
             else:
                 self.verified.append(workspace_auth_domain_audit_results.VerifiedNotMember(note=note, **result_kwargs))
-        elif upload_workspace.upload_cycle.is_current:
+        elif self.upload_cycle_lookup.is_current(upload_workspace.upload_cycle):
             note = self.RC_UPLOADERS_BEFORE_QC
             if membership and membership.role == GroupGroupMembership.RoleChoices.ADMIN:
                 self.errors.append(workspace_auth_domain_audit_results.ChangeToMember(note=note, **result_kwargs))
@@ -169,7 +223,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
                 self.verified.append(workspace_auth_domain_audit_results.VerifiedMember(note=note, **result_kwargs))
             else:
                 self.needs_action.append(workspace_auth_domain_audit_results.AddMember(note=note, **result_kwargs))
-        elif upload_workspace.upload_cycle.is_past and not upload_workspace.date_qc_completed:
+        elif self.upload_cycle_lookup.is_past(upload_workspace.upload_cycle) and not upload_workspace.date_qc_completed:
             note = self.RC_UPLOADERS_BEFORE_QC
             if membership and membership.role == GroupGroupMembership.RoleChoices.ADMIN:
                 self.errors.append(workspace_auth_domain_audit_results.ChangeToMember(note=note, **result_kwargs))
@@ -188,14 +242,14 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
 
     def _audit_workspace_and_group_for_rc_members(self, upload_workspace, managed_group):
         membership = self._get_current_membership(upload_workspace, managed_group)
-        combined_workspace = self._get_combined_workspace(upload_workspace.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(upload_workspace.upload_cycle)
         result_kwargs = {
             "workspace": upload_workspace.workspace,
             "managed_group": managed_group,
             "current_membership_instance": membership,
         }
 
-        if upload_workspace.upload_cycle.is_future:
+        if self.upload_cycle_lookup.is_future(upload_workspace.upload_cycle):
             note = self.RC_FUTURE_CYCLE
             if membership and membership.role == GroupGroupMembership.RoleChoices.ADMIN:
                 self.errors.append(workspace_auth_domain_audit_results.Remove(note=note, **result_kwargs))
@@ -228,7 +282,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
             "current_membership_instance": membership,
         }
 
-        if upload_workspace.upload_cycle.is_future:
+        if self.upload_cycle_lookup.is_future(upload_workspace.upload_cycle):
             note = self.RC_FUTURE_CYCLE
             if membership and membership.role == GroupGroupMembership.RoleChoices.ADMIN:
                 self.errors.append(workspace_auth_domain_audit_results.Remove(note=note, **result_kwargs))
@@ -276,7 +330,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
             )
 
     def _audit_workspace_and_group_for_dcc(self, upload_workspace, managed_group):
-        combined_workspace = self._get_combined_workspace(upload_workspace.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(upload_workspace.upload_cycle)
         membership = self._get_current_membership(upload_workspace, managed_group)
         if combined_workspace:
             note = self.DCC_AFTER_COMBINED
@@ -305,7 +359,7 @@ class UploadWorkspaceAuthDomainAudit(GREGoRAudit):
                 self.needs_action.append(workspace_auth_domain_audit_results.Remove(**result_kwargs))
 
     def _audit_workspace_and_group_for_gregor_all(self, upload_workspace, managed_group):
-        combined_workspace = self._get_combined_workspace(upload_workspace.upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(upload_workspace.upload_cycle)
         membership = self._get_current_membership(upload_workspace, managed_group)
         if combined_workspace:
             note = self.GREGOR_ALL_AFTER_COMBINED
@@ -411,12 +465,49 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
         if not (isinstance(queryset, QuerySet) and queryset.model is UploadWorkspace):
             raise ValueError("queryset must be a queryset of UploadWorkspace objects.")
         self.queryset = queryset
+        # In-memory indexes of the data needed for the audit. These are populated by `_preload` when the full
+        # audit is run; otherwise, lookups for single workspaces and groups fall back to database queries.
+        self._preloaded = False
+        self._sharing_index = {}
+        self._shared_groups_index = {}
+        self._auth_domain_index = {}
+        self._named_groups = []
 
     def _run_audit(self):
-        for workspace in self.queryset:
+        self._preload()
+        queryset = self.queryset.select_related("workspace", "upload_cycle", "research_center__uploader_group")
+        for workspace in queryset:
             self.audit_upload_workspace(workspace)
 
+    def _preload(self):
+        """Load all sharing, auth domain, and group data for the queryset in bulk.
+
+        This runs a fixed number of queries regardless of the number of workspaces in the queryset."""
+        workspaces = self.queryset.values("workspace")
+        self._sharing_index = {}
+        self._shared_groups_index = defaultdict(list)
+        for sharing in WorkspaceGroupSharing.objects.filter(workspace__in=workspaces).select_related("group"):
+            self._sharing_index[(sharing.workspace_id, sharing.group_id)] = sharing
+            self._shared_groups_index[sharing.workspace_id].append(sharing.group)
+        self._auth_domain_index = defaultdict(list)
+        for auth_domain in WorkspaceAuthorizationDomain.objects.filter(workspace__in=workspaces).select_related(
+            "group"
+        ):
+            self._auth_domain_index[auth_domain.workspace_id].append(auth_domain.group)
+        self._named_groups = list(ManagedGroup.objects.filter(name__in=self._get_group_names_to_include()))
+        self._preloaded = True
+
+    def _get_group_names_to_include(self):
+        return [
+            "GREGOR_DCC_WRITERS",  # DCC writers
+            settings.ANVIL_DCC_ADMINS_GROUP_NAME,  # DCC admins
+            "anvil-admins",  # AnVIL admins
+            "anvil_devs",  # AnVIL devs
+        ]
+
     def _get_current_sharing(self, upload_workspace, managed_group):
+        if self._preloaded:
+            return self._sharing_index.get((upload_workspace.workspace_id, managed_group.pk))
         try:
             current_sharing = WorkspaceGroupSharing.objects.get(
                 workspace=upload_workspace.workspace, group=managed_group
@@ -425,42 +516,44 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
             current_sharing = None
         return current_sharing
 
-    def _get_combined_workspace(self, upload_cycle):
-        """Returns the combined workspace, but only if it is ready for sharing."""
-        try:
-            combined_workspace = CombinedConsortiumDataWorkspace.objects.get(
-                upload_cycle=upload_cycle, date_completed__isnull=False
-            )
-        except CombinedConsortiumDataWorkspace.DoesNotExist:
-            combined_workspace = None
-        return combined_workspace
+    def _get_auth_domains(self, upload_workspace):
+        if self._preloaded:
+            return self._auth_domain_index.get(upload_workspace.workspace_id, [])
+        return upload_workspace.workspace.authorization_domains.all()
+
+    def _get_groups_to_audit(self, upload_workspace):
+        """Return the managed groups that should be included in the audit of a specific UploadWorkspace.
+
+        This includes the uploader group for the RC, the DCC groups, the AnVIL groups, the auth domain,
+        and any groups that the workspace is shared with."""
+        if not self._preloaded:
+            research_center = upload_workspace.research_center
+            return ManagedGroup.objects.filter(
+                # RC uploader group.
+                Q(research_center_of_uploaders=research_center)
+                |
+                # Specific groups by name.
+                Q(name__in=self._get_group_names_to_include())
+                |
+                # Auth domain.
+                Q(workspaceauthorizationdomain__workspace=upload_workspace.workspace)
+                |
+                # Groups that the workspace is shared with.
+                Q(workspacegroupsharing__workspace=upload_workspace.workspace)
+            ).distinct()
+        groups = {group.pk: group for group in self._named_groups}
+        uploader_group = upload_workspace.research_center.uploader_group
+        if uploader_group:
+            groups[uploader_group.pk] = uploader_group
+        for group in self._get_auth_domains(upload_workspace):
+            groups[group.pk] = group
+        for group in self._shared_groups_index.get(upload_workspace.workspace_id, []):
+            groups[group.pk] = group
+        return [groups[pk] for pk in sorted(groups)]
 
     def audit_upload_workspace(self, upload_workspace):
         """Audit access for a specific UploadWorkspace."""
-        # Get a list of managed groups that should be included in this audit.
-        # This includes the members group for the RC, the DCC groups, GREGOR_ALL, and the auth domain.
-        research_center = upload_workspace.research_center
-        group_names_to_include = [
-            "GREGOR_DCC_WRITERS",  # DCC writers
-            settings.ANVIL_DCC_ADMINS_GROUP_NAME,  # DCC admins
-            "anvil-admins",  # AnVIL admins
-            "anvil_devs",  # AnVIL devs
-        ]
-        groups_to_audit = ManagedGroup.objects.filter(
-            # RC uploader group.
-            Q(research_center_of_uploaders=research_center)
-            |
-            # Specific groups from above.
-            Q(name__in=group_names_to_include)
-            |
-            # Auth domain.
-            Q(workspaceauthorizationdomain__workspace=upload_workspace.workspace)
-            |
-            # Groups that the workspace is shared with.
-            Q(workspacegroupsharing__workspace=upload_workspace.workspace)
-        ).distinct()
-
-        for group in groups_to_audit:
+        for group in self._get_groups_to_audit(upload_workspace):
             self.audit_workspace_and_group(upload_workspace, group)
 
     def audit_workspace_and_group(self, upload_workspace, managed_group):
@@ -470,7 +563,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
             self._audit_workspace_and_rc_uploader_group(upload_workspace, managed_group)
         elif managed_group.name == "GREGOR_DCC_WRITERS":
             self._audit_workspace_and_dcc_writer_group(upload_workspace, managed_group)
-        elif managed_group in upload_workspace.workspace.authorization_domains.all():
+        elif managed_group in self._get_auth_domains(upload_workspace):
             self._audit_workspace_and_auth_domain(upload_workspace, managed_group)
         elif managed_group.name == settings.ANVIL_DCC_ADMINS_GROUP_NAME:
             self._audit_workspace_and_dcc_admin_group(upload_workspace, managed_group)
@@ -497,7 +590,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
         """
         upload_cycle = upload_workspace.upload_cycle
         current_sharing = self._get_current_sharing(upload_workspace, managed_group)
-        combined_workspace = self._get_combined_workspace(upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(upload_cycle)
 
         audit_result_args = {
             "workspace": upload_workspace.workspace,
@@ -505,7 +598,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
             "current_sharing_instance": current_sharing,
         }
 
-        if upload_cycle.is_future:
+        if self.upload_cycle_lookup.is_future(upload_cycle):
             note = self.RC_UPLOADERS_FUTURE_CYCLE
             if not current_sharing:
                 self.verified.append(workspace_sharing_audit_results.VerifiedNotShared(note=note, **audit_result_args))
@@ -513,7 +606,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                 self.errors.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
             else:
                 self.needs_action.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
-        elif upload_cycle.is_current and not upload_cycle.date_ready_for_compute:
+        elif self.upload_cycle_lookup.is_current(upload_cycle) and not upload_cycle.date_ready_for_compute:
             note = self.RC_UPLOADERS_CURRENT_CYCLE_BEFORE_COMPUTE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.ShareAsWriter(note=note, **audit_result_args))
@@ -525,7 +618,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                 self.verified.append(workspace_sharing_audit_results.VerifiedShared(note=note, **audit_result_args))
             else:
                 self.needs_action.append(workspace_sharing_audit_results.ShareAsWriter(note=note, **audit_result_args))
-        elif upload_cycle.is_current and upload_cycle.date_ready_for_compute:
+        elif self.upload_cycle_lookup.is_current(upload_cycle) and upload_cycle.date_ready_for_compute:
             note = self.RC_UPLOADERS_CURRENT_CYCLE_AFTER_COMPUTE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.ShareWithCompute(note=note, **audit_result_args))
@@ -539,7 +632,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                 self.needs_action.append(
                     workspace_sharing_audit_results.ShareWithCompute(note=note, **audit_result_args)
                 )
-        elif upload_cycle.is_past and not upload_workspace.date_qc_completed:
+        elif self.upload_cycle_lookup.is_past(upload_cycle) and not upload_workspace.date_qc_completed:
             note = self.RC_UPLOADERS_PAST_CYCLE_BEFORE_QC_COMPLETE
             if not current_sharing:
                 self.verified.append(workspace_sharing_audit_results.VerifiedNotShared(note=note, **audit_result_args))
@@ -547,7 +640,11 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                 self.errors.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
             else:
                 self.needs_action.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
-        elif upload_cycle.is_past and upload_workspace.date_qc_completed and not combined_workspace:
+        elif (
+            self.upload_cycle_lookup.is_past(upload_cycle)
+            and upload_workspace.date_qc_completed
+            and not combined_workspace
+        ):
             note = self.RC_UPLOADERS_PAST_CYCLE_AFTER_QC_COMPLETE
             if not current_sharing:
                 self.verified.append(workspace_sharing_audit_results.VerifiedNotShared(note=note, **audit_result_args))
@@ -555,7 +652,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                 self.errors.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
             else:
                 self.needs_action.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
-        elif upload_cycle.is_past and combined_workspace:
+        elif self.upload_cycle_lookup.is_past(upload_cycle) and combined_workspace:
             note = self.RC_UPLOADERS_PAST_CYCLE_COMBINED_WORKSPACE_READY
             if not current_sharing:
                 self.verified.append(workspace_sharing_audit_results.VerifiedNotShared(note=note, **audit_result_args))
@@ -576,7 +673,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
         """
         upload_cycle = upload_workspace.upload_cycle
         current_sharing = self._get_current_sharing(upload_workspace, managed_group)
-        combined_workspace = self._get_combined_workspace(upload_cycle)
+        combined_workspace = self.upload_cycle_lookup.get_combined_workspace(upload_cycle)
 
         audit_result_args = {
             "workspace": upload_workspace.workspace,
@@ -584,7 +681,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
             "current_sharing_instance": current_sharing,
         }
 
-        if upload_cycle.is_future:
+        if self.upload_cycle_lookup.is_future(upload_cycle):
             note = self.DCC_WRITERS_FUTURE_CYCLE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.ShareWithCompute(note=note, **audit_result_args))
@@ -606,7 +703,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                         **audit_result_args,
                     )
                 )
-        elif upload_cycle.is_current:
+        elif self.upload_cycle_lookup.is_current(upload_cycle):
             note = self.DCC_WRITERS_CURRENT_CYCLE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.ShareWithCompute(note=note, **audit_result_args))
@@ -628,7 +725,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                         **audit_result_args,
                     )
                 )
-        elif upload_cycle.is_past and not upload_workspace.date_qc_completed:
+        elif self.upload_cycle_lookup.is_past(upload_cycle) and not upload_workspace.date_qc_completed:
             note = self.DCC_WRITERS_PAST_CYCLE_BEFORE_QC_COMPLETE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.ShareWithCompute(note=note, **audit_result_args))
@@ -650,7 +747,11 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                         **audit_result_args,
                     )
                 )
-        elif upload_cycle.is_past and upload_workspace.date_qc_completed and not combined_workspace:
+        elif (
+            self.upload_cycle_lookup.is_past(upload_cycle)
+            and upload_workspace.date_qc_completed
+            and not combined_workspace
+        ):
             note = self.DCC_WRITERS_PAST_CYCLE_AFTER_QC_COMPLETE
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
@@ -668,7 +769,7 @@ class UploadWorkspaceSharingAudit(GREGoRAudit):
                         **audit_result_args,
                     )
                 )
-        elif upload_cycle.is_past and combined_workspace:
+        elif self.upload_cycle_lookup.is_past(upload_cycle) and combined_workspace:
             note = self.DCC_WRITERS_PAST_CYCLE_COMBINED_WORKSPACE_READY
             if current_sharing and current_sharing.access == WorkspaceGroupSharing.OWNER:
                 self.errors.append(workspace_sharing_audit_results.StopSharing(note=note, **audit_result_args))
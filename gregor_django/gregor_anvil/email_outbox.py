@@ -0,0 +1,140 @@
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+# Number of failed delivery attempts after which a queued email is marked as failed and no longer retried.
+MAX_ATTEMPTS = 5
+# Time after which an email claimed by a sender that did not record the outcome (e.g., because it crashed) is
+# claimed again.
+CLAIM_TIMEOUT = timedelta(minutes=30)
+
+
+def queue_email(subject, message, recipient_list, html_message=""):
+    """Add an email to the outbox, to be delivered later by `send_queued_emails`.
+
+    Empty entries in `recipient_list` are ignored, and nothing is queued if no recipients are left.
+
+    Returns:
+        QueuedEmail: The queued email, or None if there were no recipients.
+    """
+    to = [x for x in recipient_list if x]
+    if not to:
+        return None
+    return QueuedEmail.objects.create(subject=subject, message=message, html_message=html_message or "", to=to)
+
+
+def _build_message(emails, connection):
+    """Return one message for a list of queued emails with the same recipients.
+
+    A single email is sent as it was queued. Several emails are coalesced into a digest, with each report attached.
+    """
+    if len(emails) == 1:
+        email = emails[0]
+        message = EmailMultiAlternatives(email.subject, email.message, None, email.to, connection=connection)
+        if email.html_message:
+            message.attach_alternative(email.html_message, "text/html")
+        return message
+    subject = "GREGoR reports - {} reports".format(len(emails))
+    body = "The following reports are attached:\n" + "".join("* {}\n".format(x.subject) for x in emails)
+    message = EmailMultiAlternatives(subject, body, None, emails[0].to, connection=connection)
+    message.attach_alternative(render_to_string("gregor_anvil/email_digest.html", {"emails": emails}), "text/html")
+    for i, email in enumerate(emails, start=1):
+        if email.html_message:
+            message.attach("report-{}.html".format(i), email.html_message, "text/html")
+        else:
+            message.attach("report-{}.txt".format(i), email.message, "text/plain")
+    return message
+
+
+def _claim_emails(claim_timeout):
+    """Mark pending emails, and emails whose claim has expired, as being sent and return them.
+
+    The emails are claimed in a short transaction, so no locks are held while they are delivered. Concurrent
+    senders skip emails that are being claimed or have already been claimed."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            QueuedEmail.objects.filter(
+                Q(status=QueuedEmail.StatusTypes.PENDING)
+                | Q(status=QueuedEmail.StatusTypes.SENDING, claimed_at__lt=now - claim_timeout)
+            )
+            .select_for_update(skip_locked=True)
+            .order_by("pk")
+        )
+        for email in emails:
+            email.status = QueuedEmail.StatusTypes.SENDING
+            email.claimed_at = now
+        QueuedEmail.objects.bulk_update(emails, ["status", "claimed_at"])
+    return emails
+
+
+def _record_failure(emails, error, max_attempts):
+    for email in emails:
+        email.attempts += 1
+        email.last_error = "{}: {}".format(type(error).__name__, error)
+        if email.attempts >= max_attempts:
+            email.status = QueuedEmail.StatusTypes.FAILED
+        else:
+            email.status = QueuedEmail.StatusTypes.PENDING
+    QueuedEmail.objects.bulk_update(emails, ["attempts", "last_error", "status"])
+
+
+def _record_success(emails):
+    sent_at = timezone.now()
+    for email in emails:
+        email.status = QueuedEmail.StatusTypes.SENT
+        email.attempts += 1
+        email.sent_at = sent_at
+    QueuedEmail.objects.bulk_update(emails, ["status", "attempts", "sent_at"])
+
+
+def send_queued_emails(max_attempts=MAX_ATTEMPTS, claim_timeout=CLAIM_TIMEOUT):
+    """Deliver all pending emails in the outbox over a single mail server connection.
+
+    Pending emails are first claimed for this sender, then delivered outside of any transaction, and the outcome
+    of each message is recorded as soon as it is known. Pending emails with the same recipients are coalesced into
+    one digest message. Emails that cannot be delivered are left pending and retried by the next call, until they
+    have failed `max_attempts` times. Emails whose sender stopped before recording the outcome are claimed again
+    after `claim_timeout`.
+
+    Returns:
+        tuple: The number of messages sent and the number of messages that could not be sent.
+    """
+    n_sent = 0
+    n_failed = 0
+    claimed = _claim_emails(claim_timeout)
+    if not claimed:
+        return n_sent, n_failed
+    emails_by_recipients = {}
+    for email in claimed:
+        emails_by_recipients.setdefault(tuple(email.to), []).append(email)
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.exception("Could not connect to the mail server to send queued emails.")
+        _record_failure(claimed, e, max_attempts)
+        return n_sent, len(emails_by_recipients)
+    try:
+        for emails in emails_by_recipients.values():
+            try:
+                _build_message(emails, connection).send()
+            except Exception as e:
+                logger.exception("Could not send queued emails to %s.", emails[0].to)
+                _record_failure(emails, e, max_attempts)
+                n_failed += 1
+            else:
+                _record_success(emails)
+                n_sent += 1
+    finally:
+        connection.close()
+    return n_sent, n_failed
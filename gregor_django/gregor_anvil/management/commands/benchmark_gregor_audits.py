@@ -0,0 +1,180 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from gregor_django.users import audit as users_audit
+
+from ...audit import combined_workspace_audit, dcc_processed_data_workspace_audit, upload_workspace_audit
+
+# (name, audit class) for each audit that is benchmarked. The users audits are run against a mocked Drupal site.
+AUDITS = [
+    ("UploadWorkspaceSharingAudit", upload_workspace_audit.UploadWorkspaceSharingAudit),
+    ("UploadWorkspaceAuthDomainAudit", upload_workspace_audit.UploadWorkspaceAuthDomainAudit),
+    (
+        "CombinedConsortiumDataWorkspaceSharingAudit",
+        combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit,
+    ),
+    (
+        "CombinedConsortiumDataWorkspaceAuthDomainAudit",
+        combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit,
+    ),
+    ("DCCProcessedDataWorkspaceSharingAudit", dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit),
+    (
+        "DCCProcessedDataWorkspaceAuthDomainAudit",
+        dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit,
+    ),
+    ("UserAudit", users_audit.UserAudit),
+    ("SiteAudit", users_audit.SiteAudit),
+    ("PartnerGroupAudit", users_audit.PartnerGroupAudit),
+]
+
+
+class Command(BaseCommand):
+    help = """Benchmark the GREGoR audits on a synthetic consortium, recording wall time, database queries, peak
+    memory, and results per second for each audit as JSON. This command is only for development: it requires
+    DEBUG (or GREGOR_ALLOW_SYNTHETIC_DATA) and the test requirements."""
+
+    def add_arguments(self, parser):
+        data_group = parser.add_argument_group(title="Synthetic consortium")
+        data_group.add_argument("--upload-cycles", type=int, default=4, help="Number of upload cycles.")
+        data_group.add_argument("--research-centers", type=int, default=5, help="Number of research centers.")
+        data_group.add_argument("--consent-groups", type=int, default=2, help="Number of consent groups.")
+        data_group.add_argument("--partner-groups", type=int, default=5, help="Number of Drupal partner groups.")
+        data_group.add_argument("--users", type=int, default=100, help="Number of Drupal users.")
+        data_group.add_argument(
+            "--noise",
+            type=float,
+            default=0.1,
+            help="""Probability that each expected sharing or membership record is missing, and that an
+            unexpected record is added.""",
+        )
+        data_group.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic consortium.")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of times to run each audit. The median wall time is reported.",
+        )
+        parser.add_argument("--output", help="File to which to write the JSON results. Defaults to stdout.")
+        parser.add_argument(
+            "--compare",
+            help="JSON results from a previous run (e.g., on another commit) to compare against.",
+        )
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Keep the synthetic consortium in the database instead of rolling it back.",
+        )
+
+    def benchmark_audit(self, audit_class, repeat):
+        """Run an audit `repeat` times and return a dictionary of metrics."""
+        wall_times = []
+        for _ in range(repeat):
+            audit = audit_class()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                audit.run_audit()
+                wall_times.append(time.perf_counter() - start)
+        n_results = len(audit.verified) + len(audit.needs_action) + len(audit.errors)
+        # Measure memory in a separate run, since tracing allocations slows down the audit.
+        tracemalloc.start()
+        try:
+            audit_class().run_audit()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        wall_time = statistics.median(wall_times)
+        return {
+            "wall_time": wall_time,
+            "queries": len(queries),
+            "peak_memory": peak_memory,
+            "results": n_results,
+            "results_per_second": n_results / wall_time if wall_time else None,
+            "verified": len(audit.verified),
+            "needs_action": len(audit.needs_action),
+            "errors": len(audit.errors),
+        }
+
+    def _write_comparison(self, results, baseline):
+        for name, metrics in results["audits"].items():
+            baseline_metrics = baseline["audits"].get(name)
+            if baseline_metrics is None:
+                self.stderr.write("{}: not in baseline".format(name))
+                continue
+            line = "{}: queries {} -> {}, wall time {:.3f}s -> {:.3f}s".format(
+                name,
+                baseline_metrics["queries"],
+                metrics["queries"],
+                baseline_metrics["wall_time"],
+                metrics["wall_time"],
+            )
+            if metrics["queries"] > baseline_metrics["queries"]:
+                self.stderr.write(self.style.ERROR(line))
+            else:
+                self.stderr.write(line)
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or settings.GREGOR_ALLOW_SYNTHETIC_DATA):
+            raise CommandError("This command creates synthetic data and can only be run with DEBUG enabled.")
+        try:
+            import responses
+
+            from ...tests.synthetic_consortium import SyntheticConsortium
+        except ImportError as e:
+            raise CommandError("This command requires the test requirements to be installed: {}".format(e))
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if not 0 <= options["noise"] <= 1:
+            raise CommandError("--noise must be between 0 and 1.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        parameters = {
+            key: options[key.replace("-", "_")]
+            for key in (
+                "upload-cycles",
+                "research-centers",
+                "consent-groups",
+                "partner-groups",
+                "users",
+                "noise",
+                "seed",
+            )
+        }
+        consortium = SyntheticConsortium(
+            upload_cycles=options["upload_cycles"],
+            research_centers=options["research_centers"],
+            consent_groups=options["consent_groups"],
+            partner_groups=options["partner_groups"],
+            users=options["users"],
+            noise=options["noise"],
+            seed=options["seed"],
+        )
+        results = {"parameters": parameters, "database": connection.vendor, "audits": {}}
+        with transaction.atomic():
+            self.stderr.write("Building synthetic consortium...")
+            consortium.build()
+            with responses.RequestsMock(assert_all_requests_are_fired=False) as requests_mock:
+                consortium.mock_drupal(requests_mock)
+                for name, audit_class in AUDITS:
+                    self.stderr.write("Running {}...".format(name))
+                    results["audits"][name] = self.benchmark_audit(audit_class, options["repeat"])
+            if not options["keep_data"]:
+                transaction.set_rollback(True)
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        else:
+            self.stdout.write(output)
+        if baseline:
+            self._write_comparison(results, baseline)
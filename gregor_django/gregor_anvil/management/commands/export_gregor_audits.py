@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from ...audit import export, result_store
+from .run_gregor_audits import AUDITS
+
+
+class Command(BaseCommand):
+    help = """Write the stored results of GREGoR workspace audits to stdout, one row at a time. Audits that have no
+    stored results are run first."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=list(export.EXPORT_FORMATS),
+            default="jsonl",
+            help="Export format. CSV output has one header line for each exported audit.",
+        )
+        parser.add_argument(
+            "--audit",
+            action="append",
+            choices=[audit_class.__name__ for _, audit_class, _ in AUDITS],
+            help="Name of an audit to export. Can be repeated. If not set, all audits are exported.",
+        )
+
+    def handle(self, *args, **options):
+        audit_classes = [x for _, x, _ in AUDITS if not options["audit"] or x.__name__ in options["audit"]]
+        for audit_class in audit_classes:
+            audit_results = result_store.StoredAudit(audit_class())
+            audit_results.load_summary()
+            if audit_results.date_run is None:
+                audit = audit_class()
+                audit.run_audit()
+                result_store.save_audit_results(audit)
+            for line in export.export_results(audit_results, options["format"]):
+                self.stdout.write(line, ending="")
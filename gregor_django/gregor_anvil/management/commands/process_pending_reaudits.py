@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ... import reaudit_queue
+
+
+class Command(BaseCommand):
+    help = "Re-audit workspaces whose stored audit results are out of date because of sharing or membership changes."
+
+    def handle(self, *args, **options):
+        n_reaudited = reaudit_queue.process_pending_reaudits()
+        self.stdout.write("Re-audited {} workspaces.".format(n_reaudited))
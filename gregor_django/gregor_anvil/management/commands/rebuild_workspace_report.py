@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ... import workspace_report
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed counts shown on the workspace report page from scratch."
+
+    def handle(self, *args, **options):
+        summary = workspace_report.rebuild_summary()
+        self.stdout.write(
+            "Rebuilt workspace report: {} workspace types, {} verified linked accounts.".format(
+                len(summary.workspace_counts), summary.verified_linked_accounts
+            )
+        )
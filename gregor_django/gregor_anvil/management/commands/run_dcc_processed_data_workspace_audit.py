@@ -1,9 +1,9 @@
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
 from django.core.management.base import BaseCommand
 from django.template.loader import render_to_string
 from django.urls import reverse
 
+from ... import email_outbox
 from ...audit import dcc_processed_data_workspace_audit
 
 
@@ -51,8 +51,10 @@ class Command(BaseCommand):
         if not audit_ok:
             self.stdout.write(self.style.ERROR(f"Please visit {url} to resolve these issues."))
 
-            # Send email if requested and there are problems.
+            # Queue an email if requested and there are problems.
             email = options["email"]
+            if not email:
+                return
             subject = "{} - problems found".format(audit.__class__.__name__)
             html_body = render_to_string(
                 "gregor_anvil/email_audit_report.html",
@@ -62,12 +64,10 @@ class Command(BaseCommand):
                     "url": url,
                 },
             )
-            send_mail(
+            email_outbox.queue_email(
                 subject,
                 "Audit problems found. Please see attached report.",
-                None,
                 [email],
-                fail_silently=False,
                 html_message=html_body,
             )
 
@@ -0,0 +1,168 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from ... import email_outbox
+from ...audit import (
+    bulk_resolve,
+    combined_workspace_audit,
+    dcc_processed_data_workspace_audit,
+    result_store,
+    upload_workspace_audit,
+)
+from ...audit.upload_cycle_lookup import UploadCycleLookup
+
+# (title, audit class, url name for the audit view) for each audit run by this command.
+AUDITS = [
+    (
+        "UploadWorkspace sharing audit",
+        upload_workspace_audit.UploadWorkspaceSharingAudit,
+        "gregor_anvil:audit:upload_workspaces:sharing:all",
+    ),
+    (
+        "UploadWorkspace auth domain audit",
+        upload_workspace_audit.UploadWorkspaceAuthDomainAudit,
+        "gregor_anvil:audit:upload_workspaces:auth_domains:all",
+    ),
+    (
+        "CombinedConsortiumDataWorkspace sharing audit",
+        combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit,
+        "gregor_anvil:audit:combined_workspaces:sharing:all",
+    ),
+    (
+        "CombinedConsortiumDataWorkspace auth domain audit",
+        combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit,
+        "gregor_anvil:audit:combined_workspaces:auth_domains:all",
+    ),
+    (
+        "DCCProcessedDataWorkspace sharing audit",
+        dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit,
+        "gregor_anvil:audit:dcc_processed_data_workspaces:sharing:all",
+    ),
+    (
+        "DCCProcessedDataWorkspace auth domain audit",
+        dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit,
+        "gregor_anvil:audit:dcc_processed_data_workspaces:auth_domains:all",
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "Run all GREGoR workspace access audits concurrently, store the results, and send a combined report."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-workers",
+            type=int,
+            default=3,
+            help="""Maximum number of audits to run at the same time. Each worker uses its own database
+            connection. If 1, audits are run one at a time in the main thread.""",
+        )
+        parser.add_argument(
+            "--resolve",
+            action="store_true",
+            help="""Handle all audit results that need action on AnVIL, and then re-run the audits. AnVIL calls
+            are made concurrently, using up to --max-workers threads.""",
+        )
+        email_group = parser.add_argument_group(title="Email reports")
+        email_group.add_argument(
+            "--email",
+            help="""Email to which to send a combined report for audits that need action or have errors.""",
+        )
+
+    def _run_audit(self, audit_class, upload_cycle_lookup):
+        audit = audit_class()
+        audit.upload_cycle_lookup = upload_cycle_lookup
+        audit.run_audit()
+        return audit
+
+    def _run_audit_in_thread(self, audit_class, upload_cycle_lookup):
+        try:
+            return self._run_audit(audit_class, upload_cycle_lookup)
+        finally:
+            # Database connections are per-thread; close this worker's connections so they are not leaked.
+            connections.close_all()
+
+    def run_audits(self, max_workers):
+        """Run all audits and return a list of (title, audit, url) tuples in the order of AUDITS."""
+        # Use the same date for all audits in this run.
+        upload_cycle_lookup = UploadCycleLookup()
+        if max_workers == 1:
+            audits = [self._run_audit(audit_class, upload_cycle_lookup) for _, audit_class, _ in AUDITS]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._run_audit_in_thread, audit_class, upload_cycle_lookup)
+                    for _, audit_class, _ in AUDITS
+                ]
+                audits = [future.result() for future in futures]
+        # Store the results from the main thread so that the audit views can show them without re-running the audits.
+        for audit in audits:
+            result_store.save_audit_results(audit)
+        domain = "https://" + Site.objects.get_current().domain
+        return [(title, audit, domain + reverse(url_name)) for (title, _, url_name), audit in zip(AUDITS, audits)]
+
+    def resolve_audits(self, reports, max_workers):
+        """Handle the needs action results of each audit in `reports` and print a summary."""
+        for title, audit, _ in reports:
+            audit_results = bulk_resolve.get_resolvable_results(audit)
+            if not audit_results:
+                continue
+            self.stdout.write("Resolving {}...".format(title))
+            resolved_results = bulk_resolve.resolve_audit_results(audit_results, max_workers=max_workers)
+            failed = [x for x in resolved_results if not x.ok]
+            self.stdout.write("* Handled: {}".format(len(resolved_results) - len(failed)))
+            self.stdout.write("* Failed: {}".format(len(failed)))
+            for resolved_result in failed:
+                self.stdout.write(
+                    self.style.ERROR("  {}: {}".format(resolved_result.audit_result, resolved_result.error))
+                )
+
+    def _report_audit_results(self, title, audit, url):
+        if audit.ok():
+            self.stdout.write("{}... ".format(title) + self.style.SUCCESS("ok!"))
+        else:
+            self.stdout.write("{}... ".format(title) + self.style.ERROR("problems found."))
+
+        # Print results
+        self.stdout.write("* Verified: {}".format(len(audit.verified)))
+        self.stdout.write("* Needs action: {}".format(len(audit.needs_action)))
+        self.stdout.write("* Errors: {}".format(len(audit.errors)))
+
+        if not audit.ok():
+            self.stdout.write(self.style.ERROR(f"Please visit {url} to resolve these issues."))
+
+    def _send_email(self, reports, email):
+        reports_with_problems = [
+            {"title": title, "audit_results": audit, "url": url} for title, audit, url in reports if not audit.ok()
+        ]
+        if not reports_with_problems:
+            return
+        html_body = render_to_string(
+            "gregor_anvil/email_combined_audit_report.html",
+            context={"reports": reports_with_problems},
+        )
+        email_outbox.queue_email(
+            "GREGoR audits - problems found",
+            "Audit problems found. Please see attached report.",
+            [email],
+            html_message=html_body,
+        )
+
+    def handle(self, *args, **options):
+        if options["max_workers"] < 1:
+            raise CommandError("--max-workers must be at least 1.")
+        self.stdout.write("Running {} audits...".format(len(AUDITS)))
+        reports = self.run_audits(options["max_workers"])
+        if options["resolve"]:
+            self.resolve_audits(reports, options["max_workers"])
+            self.stdout.write("Re-running {} audits...".format(len(AUDITS)))
+            reports = self.run_audits(options["max_workers"])
+        for title, audit, url in reports:
+            self._report_audit_results(title, audit, url)
+        if options["email"]:
+            self._send_email(reports, options["email"])
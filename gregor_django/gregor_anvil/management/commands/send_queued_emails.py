@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ... import email_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails, coalescing emails to the same recipients into one digest."
+
+    def handle(self, *args, **options):
+        n_sent, n_failed = email_outbox.send_queued_emails()
+        self.stdout.write("Sent {} messages.".format(n_sent))
+        if n_failed:
+            self.stdout.write(self.style.ERROR("Could not send {} messages.".format(n_failed)))
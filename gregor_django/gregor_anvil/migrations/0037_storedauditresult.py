@@ -0,0 +1,36 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anvil_consortium_manager', '0020_historicalworkspace_app_access_and_more'),
+        ('gregor_anvil', '0036_consortiumcombinedworkspace_add_contributing_workspaces'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredAuditResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('audit_class', models.CharField(help_text='Name of the audit class that produced this result.', max_length=255)),
+                ('run_id', models.UUIDField(help_text='Identifier of the audit run that produced this result.')),
+                ('result_type', models.CharField(help_text='Name of the audit result class (e.g., VerifiedShared).', max_length=255)),
+                ('status', models.CharField(choices=[('verified', 'Verified'), ('needs_action', 'Needs action'), ('error', 'Error')], max_length=20)),
+                ('note', models.TextField(blank=True)),
+                ('action', models.CharField(blank=True, max_length=255)),
+                ('details', models.JSONField(blank=True, default=dict, help_text='Additional table columns for this result (e.g., current access or role).')),
+                ('managed_group', models.ForeignKey(help_text='Group that was audited.', on_delete=django.db.models.deletion.CASCADE, to='anvil_consortium_manager.managedgroup')),
+                ('workspace', models.ForeignKey(help_text='Workspace that was audited.', on_delete=django.db.models.deletion.CASCADE, to='anvil_consortium_manager.workspace')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['audit_class', 'workspace'], name='storedauditresult_audit_ws')],
+            },
+        ),
+    ]
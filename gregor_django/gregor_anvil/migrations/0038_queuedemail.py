@@ -0,0 +1,34 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gregor_anvil', '0037_storedauditresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('subject', models.CharField(max_length=255)),
+                ('message', models.TextField(help_text='Plain text body of the email.')),
+                ('html_message', models.TextField(blank=True, help_text='HTML body of the email.')),
+                ('to', models.JSONField(help_text='List of recipient email addresses.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times delivery has been attempted.')),
+                ('last_error', models.TextField(blank=True, help_text='Error from the most recent failed delivery attempt.')),
+                ('sent_at', models.DateTimeField(blank=True, help_text='Time at which the email was delivered.', null=True)),
+                ('claimed_at', models.DateTimeField(blank=True, help_text='Time at which a sender last claimed the email for delivery.', null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status'], name='queuedemail_status')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gregor_anvil', '0038_queuedemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkspaceReportSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('workspace_counts', models.JSONField(default=dict, help_text='Number of workspaces and number shared with the consortium for each workspace type.')),
+                ('verified_linked_accounts', models.PositiveIntegerField(default=0, help_text='Number of accounts with a verified email linked to a user.')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anvil_consortium_manager', '0020_historicalworkspace_app_access_and_more'),
+        ('gregor_anvil', '0039_workspacereportsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingReaudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('workspace', models.OneToOneField(help_text='Workspace to re-audit.', on_delete=django.db.models.deletion.CASCADE, to='anvil_consortium_manager.workspace')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
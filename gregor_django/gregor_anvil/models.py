@@ -15,6 +15,19 @@ def validate_not_future_date(value: date):
         raise ValidationError("Date cannot be in the future.")
 
 
+def filter_latest_versions(queryset, group_fields):
+    """Return the objects in a queryset with the highest version for each combination of `group_fields`.
+
+    This is a single greatest-per-group query: each object is compared to the maximum version of the objects in
+    the same queryset that share its values of `group_fields`."""
+    latest_version = (
+        queryset.filter(**{field: models.OuterRef(field) for field in group_fields})
+        .order_by("-version")
+        .values("version")[:1]
+    )
+    return queryset.filter(version=models.Subquery(latest_version))
+
+
 class ConsentGroup(TimeStampedModel, models.Model):
     """A model to track consent groups."""
 
@@ -367,59 +380,20 @@ class CombinedConsortiumDataWorkspace(TimeStampedModel, BaseWorkspaceData):
 
     def suggest_contributing_partner_upload_workspaces(self):
         """Suggest contributing PartnerUploadWorkspaces for this ReleaseWorkspace."""
-        # For partner workspaces, this is more difficult because we can't do a direct groupby-max.
-        # Instead, get the id of the latest completed workspace for each partner group and consent group.
-        # Then do a query to get those ids.
-        # Start with a slow for loop, and then we can make it better if needed.
-        # For combined workspaces iwth date_completed, select the most recent
-        most_recent_workspaces = []
-        for partner_group in PartnerGroup.objects.all():
-            for consent_group in ConsentGroup.objects.filter(partneruploadworkspace__partner_group=partner_group):
-                # We want to select the highest version of workspaces that were completed before the combined workspace.
-                # If the combined workspace is not completed, only check for non-null contributing date_completed.
-                possible_workspaces = PartnerUploadWorkspace.objects.filter(
-                    partner_group=partner_group,
-                    consent_group=consent_group,
-                    date_completed__isnull=False,
-                )
-                # If the combined workspace is completed, subset by that date as well.
-                if self.date_completed:
-                    possible_workspaces = possible_workspaces.filter(
-                        date_completed__lte=self.date_completed,
-                    )
-                latest_workspace = possible_workspaces.order_by("-version").first()
-                if latest_workspace:
-                    most_recent_workspaces.append(latest_workspace.id)
-        qs = PartnerUploadWorkspace.objects.filter(
-            id__in=most_recent_workspaces,
-        )
-        return qs
+        # Select the highest version of completed workspaces for each partner group and consent group.
+        # If the combined workspace is completed, only include workspaces completed before it.
+        possible_workspaces = PartnerUploadWorkspace.objects.filter(date_completed__isnull=False)
+        if self.date_completed:
+            possible_workspaces = possible_workspaces.filter(date_completed__lte=self.date_completed)
+        return filter_latest_versions(possible_workspaces, ["partner_group", "consent_group"])
 
     def suggest_contributing_rc_processed_data_workspaces(self):
         """Suggest contributing RCProcessedDataWorkspaces for this ReleaseWorkspace."""
         # For RCProcessedDataWorkspaces, follow the same procedure as partner workspaces.
-        most_recent_workspaces = []
-        for research_center in ResearchCenter.objects.all():
-            for consent_group in ConsentGroup.objects.filter(rcprocesseddataworkspace__research_center=research_center):
-                # We want to select the highest version of workspaces that were completed before the combined workspace.
-                # If the combined workspace is not completed, only check for non-null contributing date_completed.
-                possible_workspaces = RCProcessedDataWorkspace.objects.filter(
-                    research_center=research_center,
-                    consent_group=consent_group,
-                    date_completed__isnull=False,
-                )
-                # If the combined workspace is completed, subset by that date as well.
-                if self.date_completed:
-                    possible_workspaces = possible_workspaces.filter(
-                        date_completed__lte=self.date_completed,
-                    )
-                latest_workspace = possible_workspaces.order_by("-version").first()
-                if latest_workspace:
-                    most_recent_workspaces.append(latest_workspace.id)
-        qs = RCProcessedDataWorkspace.objects.filter(
-            id__in=most_recent_workspaces,
-        )
-        return qs
+        possible_workspaces = RCProcessedDataWorkspace.objects.filter(date_completed__isnull=False)
+        if self.date_completed:
+            possible_workspaces = possible_workspaces.filter(date_completed__lte=self.date_completed)
+        return filter_latest_versions(possible_workspaces, ["research_center", "consent_group"])
 
 
 class ReleaseWorkspace(TimeStampedModel, BaseWorkspaceData):
@@ -511,48 +485,21 @@ class ReleaseWorkspace(TimeStampedModel, BaseWorkspaceData):
 
     def suggest_contributing_partner_upload_workspaces(self):
         """Suggest contributing PartnerUploadWorkspaces for this ReleaseWorkspace."""
-        # For partner workspaces, this is more difficult because we can't do a direct groupby-max.
-        # Instead, get the id of the latest completed workspace for each partner group.
-        # Then do a query to get those ids.
-        # Start with a slow for loop, and then we can make it better if needed.
-        most_recent_workspaces = []
-        for partner_group in PartnerGroup.objects.all():
-            latest_workspace = (
-                PartnerUploadWorkspace.objects.filter(
-                    consent_group=self.consent_group,
-                    partner_group=partner_group,
-                    date_completed__isnull=False,
-                )
-                .order_by("-version")
-                .first()
-            )
-            if latest_workspace:
-                most_recent_workspaces.append(latest_workspace.id)
-        qs = PartnerUploadWorkspace.objects.filter(
-            id__in=most_recent_workspaces,
+        # Select the highest version of completed workspaces with this consent group for each partner group.
+        possible_workspaces = PartnerUploadWorkspace.objects.filter(
+            consent_group=self.consent_group,
+            date_completed__isnull=False,
         )
-        return qs
+        return filter_latest_versions(possible_workspaces, ["partner_group"])
 
     def suggest_contributing_rc_processed_data_workspaces(self):
         """Suggest contributing RCProcessedDataWorkspaces for this ReleaseWorkspace."""
         # For RCProcessedDataWorkspaces, follow the same procedure as partner workspaces.
-        most_recent_workspaces = []
-        for research_center in ResearchCenter.objects.all():
-            latest_workspace = (
-                RCProcessedDataWorkspace.objects.filter(
-                    consent_group=self.consent_group,
-                    research_center=research_center,
-                    date_completed__isnull=False,
-                )
-                .order_by("-version")
-                .first()
-            )
-            if latest_workspace:
-                most_recent_workspaces.append(latest_workspace.id)
-        qs = RCProcessedDataWorkspace.objects.filter(
-            id__in=most_recent_workspaces,
+        possible_workspaces = RCProcessedDataWorkspace.objects.filter(
+            consent_group=self.consent_group,
+            date_completed__isnull=False,
         )
-        return qs
+        return filter_latest_versions(possible_workspaces, ["research_center"])
 
 
 class DCCProcessingWorkspace(TimeStampedModel, BaseWorkspaceData):
@@ -648,3 +595,121 @@ class RCProcessedDataWorkspace(TimeStampedModel, BaseWorkspaceData):
         # Check that date_completed is not set if upload_cycle is not set.
         if self.date_completed and not self.upload_cycle:
             raise ValidationError("date_completed cannot be set if upload_cycle is not set.")
+
+
+class StoredAuditResult(TimeStampedModel, models.Model):
+    """A model to store a single result from a GREGoR workspace audit run."""
+
+    class StatusTypes(models.TextChoices):
+        VERIFIED = "verified", "Verified"
+        NEEDS_ACTION = "needs_action", "Needs action"
+        ERROR = "error", "Error"
+
+    audit_class = models.CharField(
+        max_length=255,
+        help_text="Name of the audit class that produced this result.",
+    )
+    run_id = models.UUIDField(help_text="Identifier of the audit run that produced this result.")
+    workspace = models.ForeignKey(
+        "anvil_consortium_manager.Workspace",
+        on_delete=models.CASCADE,
+        help_text="Workspace that was audited.",
+    )
+    managed_group = models.ForeignKey(
+        ManagedGroup,
+        on_delete=models.CASCADE,
+        help_text="Group that was audited.",
+    )
+    result_type = models.CharField(
+        max_length=255,
+        help_text="Name of the audit result class (e.g., VerifiedShared).",
+    )
+    status = models.CharField(max_length=20, choices=StatusTypes.choices)
+    note = models.TextField(blank=True)
+    action = models.CharField(max_length=255, blank=True)
+    details = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Additional table columns for this result (e.g., current access or role).",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["audit_class", "workspace"], name="storedauditresult_audit_ws"),
+        ]
+
+    def __str__(self):
+        return "{} {}: {} - {}".format(self.audit_class, self.result_type, self.workspace, self.managed_group)
+
+    def get_table_dictionary(self):
+        """Return a dictionary that can be used to populate the audit class's results table."""
+        row = {
+            "workspace": self.workspace,
+            "managed_group": self.managed_group,
+            "note": self.note,
+            "action": self.action or None,
+        }
+        row.update(self.details)
+        return row
+
+
+class PendingReaudit(TimeStampedModel, models.Model):
+    """A workspace whose stored audit results are out of date and waiting to be re-audited by `reaudit_queue`."""
+
+    workspace = models.OneToOneField(
+        "anvil_consortium_manager.Workspace",
+        on_delete=models.CASCADE,
+        help_text="Workspace to re-audit.",
+    )
+
+    def __str__(self):
+        return "Pending re-audit of {}".format(self.workspace)
+
+
+class QueuedEmail(TimeStampedModel, models.Model):
+    """An email waiting in the outbox to be delivered by `email_outbox.send_queued_emails`."""
+
+    class StatusTypes(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField(help_text="Plain text body of the email.")
+    html_message = models.TextField(blank=True, help_text="HTML body of the email.")
+    to = models.JSONField(help_text="List of recipient email addresses.")
+    status = models.CharField(max_length=20, choices=StatusTypes.choices, default=StatusTypes.PENDING)
+    attempts = models.PositiveIntegerField(default=0, help_text="Number of times delivery has been attempted.")
+    last_error = models.TextField(blank=True, help_text="Error from the most recent failed delivery attempt.")
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="Time at which the email was delivered.")
+    claimed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Time at which a sender last claimed the email for delivery."
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="queuedemail_status"),
+        ]
+
+    def __str__(self):
+        return "{} to {} ({})".format(self.subject, ", ".join(self.to), self.status)
+
+
+class WorkspaceReportSummary(TimeStampedModel, models.Model):
+    """Precomputed counts shown on the workspace report page.
+
+    There is only one instance of this model. It is kept up to date by signals and can be rebuilt from scratch
+    with the `rebuild_workspace_report` management command."""
+
+    workspace_counts = models.JSONField(
+        default=dict,
+        help_text="Number of workspaces and number shared with the consortium for each workspace type.",
+    )
+    verified_linked_accounts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of accounts with a verified email linked to a user.",
+    )
+
+    def __str__(self):
+        return "Workspace report summary ({})".format(self.modified)
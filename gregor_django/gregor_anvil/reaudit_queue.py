@@ -0,0 +1,121 @@
+"""Queue of workspaces whose stored audit results are out of date.
+
+Changes to sharing, memberships, upload cycles, and workspaces only record the affected workspaces as PendingReaudit
+rows once their transaction commits. The workspaces are re-audited in batches by an in-process worker thread, so the
+request or worker that made the change does not wait for the audits. Workspaces that are not processed in-process
+(e.g., because the web process restarted) are picked up by the `process_pending_reaudits` management command.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .audit import result_store
+from .models import PendingReaudit
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of workspaces to re-audit together.
+BATCH_SIZE = 100
+
+_local = threading.local()
+
+
+@contextmanager
+def collect_changes():
+    """Collect the changes made in this thread instead of queueing them for re-auditing.
+
+    Yields a list to which `signals` appends a function returning the pks of the changed workspaces for each change,
+    so that the caller can re-audit all of them at once after making many changes."""
+    collected = []
+    _local.collected = collected
+    try:
+        yield collected
+    finally:
+        _local.collected = None
+
+
+def get_collected_changes():
+    """Return the list of changes being collected in this thread, or None if changes are not being collected."""
+    return getattr(_local, "collected", None)
+
+
+def queue_reaudit(workspace_pks):
+    """Record that the given workspaces need to be re-audited, and wake up the in-process worker."""
+    workspace_pks = set(workspace_pks)
+    if not workspace_pks:
+        return
+    PendingReaudit.objects.bulk_create([PendingReaudit(workspace_id=pk) for pk in workspace_pks], ignore_conflicts=True)
+    if settings.GREGOR_REAUDIT_IN_PROCESS_WORKER:
+        _worker.wake()
+
+
+def _claim(batch_size):
+    """Remove up to `batch_size` workspaces from the queue and return their pks.
+
+    Rows claimed by a concurrent worker are skipped, so each queued workspace is re-audited by only one worker."""
+    with transaction.atomic():
+        pending = list(
+            PendingReaudit.objects.select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", "workspace_id")[:batch_size]
+        )
+        PendingReaudit.objects.filter(pk__in=[pk for pk, _ in pending]).delete()
+    return [workspace_pk for _, workspace_pk in pending]
+
+
+def process_pending_reaudits(batch_size=BATCH_SIZE):
+    """Re-audit queued workspaces in batches until the queue is empty.
+
+    Returns:
+        int: The number of workspaces that were re-audited.
+    """
+    n_reaudited = 0
+    while True:
+        workspace_pks = _claim(batch_size)
+        if not workspace_pks:
+            return n_reaudited
+        try:
+            result_store.reaudit_workspaces(workspace_pks)
+        except Exception:
+            # Put the workspaces back so that they are retried later.
+            queue_reaudit(workspace_pks)
+            raise
+        n_reaudited += len(workspace_pks)
+
+
+class _InProcessWorker:
+    """A daemon thread that processes the queue whenever it is woken up.
+
+    Wake-ups that arrive while the queue is being processed are coalesced into one more pass over the queue."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="reaudit-worker", daemon=True)
+                self._thread.start()
+        self._event.set()
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            self._event.clear()
+            try:
+                process_pending_reaudits()
+            except Exception:
+                # Remaining workspaces are left queued and will be picked up by the management command.
+                logger.exception("[reaudit_queue] in-process worker could not re-audit workspaces")
+            finally:
+                # Database connections are per-thread; close this worker's connections between passes.
+                connections.close_all()
+
+
+_worker = _InProcessWorker()
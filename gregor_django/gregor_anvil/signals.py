@@ -0,0 +1,114 @@
+from anvil_consortium_manager.models import (
+    Account,
+    GroupGroupMembership,
+    UserEmailEntry,
+    Workspace,
+    WorkspaceAuthorizationDomain,
+    WorkspaceGroupSharing,
+)
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import models, reaudit_queue, workspace_report
+
+
+def _schedule_reaudit(get_workspace_pks):
+    """Queue the workspaces returned by `get_workspace_pks` for re-auditing once the current transaction has been
+    committed.
+
+    The workspaces are looked up after the commit, so no queries are run for changes that are rolled back. The
+    audits themselves are run later, in batches, by `reaudit_queue`. Inside `reaudit_queue.collect_changes`, the
+    workspaces are collected instead, and the caller re-audits them."""
+    collected = reaudit_queue.get_collected_changes()
+    if collected is not None:
+        collected.append(get_workspace_pks)
+        return
+    transaction.on_commit(lambda: reaudit_queue.queue_reaudit(get_workspace_pks()), robust=True)
+
+
+def _get_upload_cycle_workspace_pks(upload_cycle_pk):
+    """Return the pks of all audited workspaces whose results depend on an upload cycle."""
+    workspace_pks = set()
+    for model in (models.UploadWorkspace, models.CombinedConsortiumDataWorkspace, models.DCCProcessedDataWorkspace):
+        workspace_pks.update(model.objects.filter(upload_cycle_id=upload_cycle_pk).values_list("workspace", flat=True))
+    return workspace_pks
+
+
+def _get_auth_domain_workspace_pks(group_pk):
+    """Return the pks of all workspaces that have a group as an auth domain."""
+    return set(WorkspaceAuthorizationDomain.objects.filter(group_id=group_pk).values_list("workspace", flat=True))
+
+
+@receiver(post_save, sender=WorkspaceGroupSharing)
+@receiver(post_delete, sender=WorkspaceGroupSharing)
+def reaudit_workspace_group_sharing(sender, instance, raw=False, **kwargs):
+    if not raw:
+        workspace_pk = instance.workspace_id
+        _schedule_reaudit(lambda: [workspace_pk])
+
+
+@receiver(post_save, sender=GroupGroupMembership)
+@receiver(post_delete, sender=GroupGroupMembership)
+def reaudit_group_group_membership(sender, instance, raw=False, **kwargs):
+    # Only memberships in auth domains are audited.
+    if not raw:
+        parent_group_pk = instance.parent_group_id
+        _schedule_reaudit(lambda: _get_auth_domain_workspace_pks(parent_group_pk))
+
+
+@receiver(post_save, sender=models.UploadCycle)
+def reaudit_upload_cycle(sender, instance, raw=False, **kwargs):
+    if not raw:
+        upload_cycle_pk = instance.pk
+        _schedule_reaudit(lambda: _get_upload_cycle_workspace_pks(upload_cycle_pk))
+
+
+@receiver(post_save, sender=models.UploadWorkspace)
+@receiver(post_delete, sender=models.UploadWorkspace)
+@receiver(post_save, sender=models.DCCProcessedDataWorkspace)
+@receiver(post_delete, sender=models.DCCProcessedDataWorkspace)
+def reaudit_workspace_data(sender, instance, raw=False, **kwargs):
+    if not raw:
+        workspace_pk = instance.workspace_id
+        _schedule_reaudit(lambda: [workspace_pk])
+
+
+@receiver(post_save, sender=models.CombinedConsortiumDataWorkspace)
+@receiver(post_delete, sender=models.CombinedConsortiumDataWorkspace)
+def reaudit_combined_workspace(sender, instance, raw=False, **kwargs):
+    # Sharing of the other workspaces in the upload cycle depends on whether the combined workspace is complete.
+    if not raw:
+        workspace_pk = instance.workspace_id
+        upload_cycle_pk = instance.upload_cycle_id
+        _schedule_reaudit(lambda: {workspace_pk} | _get_upload_cycle_workspace_pks(upload_cycle_pk))
+
+
+# The workspace report summary is refreshed after the change is committed, so that concurrent writers do not wait on
+# the summary row.
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def refresh_workspace_report_workspace(sender, instance, raw=False, **kwargs):
+    if not raw:
+        workspace_type = instance.workspace_type
+        transaction.on_commit(lambda: workspace_report.refresh_workspace_types([workspace_type]), robust=True)
+
+
+@receiver(post_save, sender=WorkspaceGroupSharing)
+@receiver(post_delete, sender=WorkspaceGroupSharing)
+def refresh_workspace_report_sharing(sender, instance, raw=False, **kwargs):
+    # If the workspace is deleted along with its sharing records, its type is refreshed by the workspace receiver.
+    if not raw:
+        workspace_pk = instance.workspace_id
+        transaction.on_commit(lambda: workspace_report.refresh_workspaces([workspace_pk]), robust=True)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=UserEmailEntry)
+@receiver(post_delete, sender=UserEmailEntry)
+def refresh_workspace_report_accounts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(workspace_report.refresh_verified_linked_accounts, robust=True)
@@ -3,7 +3,16 @@ from anvil_consortium_manager.adapters.workspace import workspace_adapter_regist
 from anvil_consortium_manager.exceptions import (
     WorkspaceAccessAuthorizationDomainUnknownError,
 )
-from anvil_consortium_manager.models import Account, ManagedGroup, Workspace
+from anvil_consortium_manager.models import (
+    Account,
+    GroupAccountMembership,
+    ManagedGroup,
+    Workspace,
+    WorkspaceAuthorizationDomain,
+    WorkspaceGroupSharing,
+)
+from django.db.models import Count, Exists, IntegerField, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 
 from . import models
@@ -60,7 +69,10 @@ class BooleanIconColumn(tables.BooleanColumn):
 
 
 class AccountTable(tables.Table):
-    """A custom table for `Accounts`."""
+    """A custom table for `Accounts`.
+
+    If the table data is an Account queryset, the linked users and their research centers are loaded along with
+    the accounts and the number of groups is annotated, so rendering the table does not run any queries per row."""
 
     email = tables.Column(linkify=True)
     user__name = tables.Column(linkify=lambda record: record.user.get_absolute_url())
@@ -69,7 +81,6 @@ class AccountTable(tables.Table):
         verbose_name="Number of groups",
         empty_values=(),
         orderable=False,
-        accessor="groupaccountmembership_set__count",
     )
 
     class Meta:
@@ -82,6 +93,36 @@ class AccountTable(tables.Table):
             "status",
         )
 
+    def __init__(self, data=None, *args, **kwargs):
+        if isinstance(data, QuerySet) and data.model is Account:
+            data = self.annotate_accounts(data, exclude=kwargs.get("exclude") or ())
+        super().__init__(data, *args, **kwargs)
+
+    def annotate_accounts(self, queryset, exclude=()):
+        """Load the data needed to render the columns that are not in `exclude` along with an Account queryset."""
+        queryset = queryset.select_related("user")
+        if "user__research_centers" not in exclude:
+            queryset = queryset.prefetch_related("user__research_centers")
+        if "number_groups" not in exclude:
+            # Count in a subquery rather than with a join, so that the queryset ordering is not affected.
+            n_groups = (
+                GroupAccountMembership.objects.filter(account=OuterRef("pk"))
+                .order_by()
+                .values("account")
+                .annotate(n=Count("pk"))
+                .values("n")
+            )
+            queryset = queryset.annotate(
+                number_groups=Coalesce(Subquery(n_groups, output_field=IntegerField()), Value(0))
+            )
+        return queryset
+
+    def render_number_groups(self, record):
+        if hasattr(record, "number_groups"):
+            return record.number_groups
+        # Records that were not annotated fall back to checking the database.
+        return record.groupaccountmembership_set.count()
+
 
 class ResearchCenterTable(tables.Table):
     """A table for ResearchCenters."""
@@ -145,7 +186,12 @@ class UploadCycleTable(tables.Table):
 
 
 class WorkspaceConsortiumAccessTable(tables.Table):
-    """Table including a column to indicate if a workspace is shared with PRIMED_ALL."""
+    """Table including a column to indicate if a workspace is shared with GREGOR_ALL.
+
+    The GREGOR_ALL group and the groups it belongs to are looked up once per table, unless they are passed in as
+    `consortium_groups` (e.g., by a view that shows several tables). If the table data is a Workspace queryset, it
+    is annotated with whether each workspace is shared with and has GREGOR_ALL in its auth domains, so rendering
+    the column does not run any additional queries per row."""
 
     consortium_access = tables.columns.Column(
         accessor="pk",
@@ -153,18 +199,57 @@ class WorkspaceConsortiumAccessTable(tables.Table):
         orderable=False,
     )
 
-    def render_consortium_access(self, record):
+    def __init__(self, data=None, *args, consortium_groups=None, **kwargs):
+        if consortium_groups is None:
+            consortium_groups = self.get_consortium_groups()
+        self.consortium_groups = consortium_groups
+        self.consortium_group = consortium_groups[0] if consortium_groups else None
+        if isinstance(data, QuerySet) and data.model is Workspace and self.consortium_group:
+            data = self.annotate_consortium_access(data, consortium_groups)
+        super().__init__(data, *args, **kwargs)
+
+    @staticmethod
+    def get_consortium_groups():
+        """Return a list of the GREGOR_ALL group followed by the groups it is part of, or [] if it does not exist."""
+        consortium_group = ManagedGroup.objects.filter(name="GREGOR_ALL").first()
+        if consortium_group is None:
+            return []
+        return [consortium_group] + list(consortium_group.get_all_parents())
+
+    @staticmethod
+    def annotate_consortium_access(queryset, consortium_groups):
+        """Annotate a Workspace queryset with the data needed to render the consortium_access column."""
+        # Workspaces shared with a group that GREGOR_ALL is part of are also shared with GREGOR_ALL.
+        consortium_group_pks = [x.pk for x in consortium_groups]
+        auth_domains = WorkspaceAuthorizationDomain.objects.filter(workspace=OuterRef("pk"))
+        return queryset.annotate(
+            consortium_shared=Exists(
+                WorkspaceGroupSharing.objects.filter(workspace=OuterRef("pk"), group__in=consortium_group_pks)
+            ),
+            consortium_not_in_auth_domain=Exists(
+                auth_domains.filter(group__is_managed_by_app=True).exclude(group__in=consortium_group_pks)
+            ),
+            consortium_auth_domain_unknown=Exists(auth_domains.filter(group__is_managed_by_app=False)),
+        )
+
+    def get_consortium_access(self, record):
+        """Return whether a workspace has consortium access, or None if it cannot be determined."""
+        if self.consortium_group is None:
+            return False
+        if hasattr(record, "consortium_shared"):
+            if record.consortium_auth_domain_unknown:
+                return None
+            return not record.consortium_not_in_auth_domain and record.consortium_shared
+        # Records that were not annotated fall back to checking the database.
         try:
-            group = ManagedGroup.objects.get(name="GREGOR_ALL")
-        except ManagedGroup.DoesNotExist:
-            has_consortium_access = False
-        else:
-            try:
-                has_consortium_access = record.has_group_in_authorization_domain(group) and record.is_shared_with_group(
-                    group
-                )
-            except WorkspaceAccessAuthorizationDomainUnknownError:
-                has_consortium_access = None
+            return record.has_group_in_authorization_domain(self.consortium_group) and record.is_shared_with_group(
+                self.consortium_group
+            )
+        except WorkspaceAccessAuthorizationDomainUnknownError:
+            return None
+
+    def render_consortium_access(self, record):
+        has_consortium_access = self.get_consortium_access(record)
 
         if has_consortium_access is None:
             icon = "question-circle-fill"
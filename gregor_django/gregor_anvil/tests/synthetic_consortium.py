@@ -0,0 +1,246 @@
+"""A synthetic GREGoR consortium for benchmarking audits. This module is only for use in development and tests."""
+
+import json
+import random
+import re
+import uuid
+from datetime import timedelta
+
+from allauth.socialaccount.models import SocialAccount
+from anvil_consortium_manager.models import GroupGroupMembership, ManagedGroup, WorkspaceGroupSharing
+from anvil_consortium_manager.tests.factories import (
+    GroupGroupMembershipFactory,
+    ManagedGroupFactory,
+    WorkspaceGroupSharingFactory,
+)
+from django.conf import settings
+from django.utils import timezone
+
+from gregor_django.drupal_oauth_provider.provider import CustomProvider
+from gregor_django.users.tests.factories import UserFactory
+
+from ..models import PartnerGroup, UploadCycle
+from . import factories
+
+# Prefix for the names of all objects created by this command.
+PREFIX = "BENCH"
+
+
+class SyntheticConsortium:
+    """Builds a synthetic GREGoR consortium and the matching mocked Drupal data for benchmarking audits.
+
+    Upload cycles are consecutive, with the last one current and all others in the past. Each upload cycle has
+    an upload workspace for every research center and consent group, a DCC processed data workspace for every
+    consent group, and a combined workspace. Workspaces start out with the sharing and auth domain membership
+    expected by the audits; `noise` is the probability that each expected record is dropped and that an
+    unexpected record is added, so that the audits find a mix of verified and needs action results.
+    """
+
+    def __init__(self, upload_cycles, research_centers, consent_groups, partner_groups, users, noise, seed):
+        self.n_upload_cycles = upload_cycles
+        self.n_research_centers = research_centers
+        self.n_consent_groups = consent_groups
+        self.n_partner_groups = partner_groups
+        self.n_users = users
+        self.noise = noise
+        self.rng = random.Random(seed)
+        # Remote Drupal data, keyed by JSON:API id.
+        self.drupal_sites = {}
+        self.drupal_partner_groups = {}
+        self.drupal_users = []
+
+    def _get_or_create_group(self, name):
+        return ManagedGroup.objects.filter(name=name).first() or ManagedGroupFactory.create(name=name)
+
+    def _keep(self):
+        return self.rng.random() >= self.noise
+
+    def _add_noise(self):
+        return self.rng.random() < self.noise
+
+    def _share(self, workspace, group, access, can_compute=False):
+        if self._keep():
+            WorkspaceGroupSharingFactory.create(
+                workspace=workspace, group=group, access=access, can_compute=can_compute
+            )
+
+    def _add_member(self, parent_group, child_group, role=GroupGroupMembership.RoleChoices.MEMBER):
+        if self._keep():
+            GroupGroupMembershipFactory.create(parent_group=parent_group, child_group=child_group, role=role)
+
+    def _add_unexpected_records(self, workspace):
+        if self._add_noise():
+            WorkspaceGroupSharingFactory.create(workspace=workspace, access=WorkspaceGroupSharing.READER)
+        if self._add_noise():
+            GroupGroupMembershipFactory.create(parent_group=workspace.authorization_domains.first())
+
+    def _add_dcc_records(self, workspace):
+        auth_domain = workspace.authorization_domains.first()
+        self._share(workspace, auth_domain, WorkspaceGroupSharing.READER)
+        self._share(workspace, self.dcc_admins, WorkspaceGroupSharing.OWNER, can_compute=True)
+        self._share(workspace, self.dcc_writers, WorkspaceGroupSharing.WRITER, can_compute=True)
+        self._add_member(auth_domain, self.dcc_admins, role=GroupGroupMembership.RoleChoices.ADMIN)
+        self._add_member(auth_domain, self.dcc_writers)
+        self._add_member(auth_domain, self.dcc_members)
+
+    def build(self):
+        """Create the synthetic consortium in the database."""
+        self.dcc_admins = self._get_or_create_group(settings.ANVIL_DCC_ADMINS_GROUP_NAME)
+        self.dcc_writers = self._get_or_create_group("GREGOR_DCC_WRITERS")
+        self.dcc_members = self._get_or_create_group("GREGOR_DCC_MEMBERS")
+        self.gregor_all = self._get_or_create_group("GREGOR_ALL")
+
+        research_centers = []
+        for i in range(self.n_research_centers):
+            short_name = "{}_RC{}".format(PREFIX, i)
+            research_center = factories.ResearchCenterFactory.create(
+                short_name=short_name,
+                full_name="Benchmark research center {}".format(i),
+                drupal_node_id=900000 + i,
+                member_group=ManagedGroupFactory.create(name="{}_MEMBERS".format(short_name)),
+                uploader_group=ManagedGroupFactory.create(name="{}_UPLOADERS".format(short_name)),
+                non_member_group=ManagedGroupFactory.create(name="{}_NONMEMBERS".format(short_name)),
+            )
+            research_centers.append(research_center)
+            self.drupal_sites[str(uuid.uuid4())] = {
+                "field_short_name": short_name,
+                "title": research_center.full_name,
+                "drupal_internal__nid": str(research_center.drupal_node_id),
+            }
+
+        for i in range(self.n_partner_groups):
+            full_name = "{}_PG{} - Benchmark partner group {}".format(PREFIX, i, i)
+            # Leave some partner groups out of the local database so that the audit finds new ones.
+            if self._keep():
+                factories.PartnerGroupFactory.create(
+                    short_name="{}_PG{}".format(PREFIX, i),
+                    full_name=full_name,
+                    drupal_node_id=910000 + i,
+                )
+            self.drupal_partner_groups[str(uuid.uuid4())] = {
+                "title": full_name,
+                "drupal_internal__nid": str(910000 + i),
+                "field_status": PartnerGroup.StatusTypes.ACTIVE,
+            }
+
+        consent_groups = [
+            factories.ConsentGroupFactory.create(
+                code="{}_C{}".format(PREFIX, i),
+                consent="Benchmark consent group {}".format(i),
+            )
+            for i in range(self.n_consent_groups)
+        ]
+
+        today = timezone.localdate()
+        first_cycle = (UploadCycle.objects.order_by("-cycle").values_list("cycle", flat=True).first() or 0) + 1
+        for i in range(self.n_upload_cycles):
+            # Cycles are 90 days long; the last one is current.
+            cycles_before_current = self.n_upload_cycles - 1 - i
+            start_date = today - timedelta(days=45 + 90 * cycles_before_current)
+            is_past = cycles_before_current > 0
+            upload_cycle = factories.UploadCycleFactory.create(
+                cycle=first_cycle + i,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=90),
+                date_ready_for_compute=start_date + timedelta(days=30) if is_past else None,
+            )
+            for research_center in research_centers:
+                for consent_group in consent_groups:
+                    upload_workspace = factories.UploadWorkspaceFactory.create(
+                        upload_cycle=upload_cycle,
+                        research_center=research_center,
+                        consent_group=consent_group,
+                        date_qc_completed=upload_cycle.end_date if is_past else None,
+                        workspace__name="{}_U{}_{}_{}".format(
+                            PREFIX, upload_cycle.cycle, research_center.short_name, consent_group.code
+                        ),
+                    )
+                    workspace = upload_workspace.workspace
+                    auth_domain = workspace.authorization_domains.first()
+                    self._add_dcc_records(workspace)
+                    self._share(workspace, research_center.uploader_group, WorkspaceGroupSharing.WRITER)
+                    self._add_member(auth_domain, research_center.member_group)
+                    self._add_member(auth_domain, research_center.uploader_group)
+                    self._add_member(auth_domain, research_center.non_member_group)
+                    if is_past:
+                        self._add_member(auth_domain, self.gregor_all)
+                    self._add_unexpected_records(workspace)
+            for consent_group in consent_groups:
+                dcc_processed_data_workspace = factories.DCCProcessedDataWorkspaceFactory.create(
+                    upload_cycle=upload_cycle,
+                    consent_group=consent_group,
+                    workspace__name="{}_U{}_DCC_PROCESSED_DATA_{}".format(
+                        PREFIX, upload_cycle.cycle, consent_group.code
+                    ),
+                )
+                self._add_dcc_records(dcc_processed_data_workspace.workspace)
+                self._add_unexpected_records(dcc_processed_data_workspace.workspace)
+            combined_workspace = factories.CombinedConsortiumDataWorkspaceFactory.create(
+                upload_cycle=upload_cycle,
+                date_completed=upload_cycle.end_date if is_past else None,
+                workspace__name="{}_U{}_COMBINED".format(PREFIX, upload_cycle.cycle),
+            )
+            workspace = combined_workspace.workspace
+            self._add_dcc_records(workspace)
+            if is_past:
+                self._share(workspace, self.gregor_all, WorkspaceGroupSharing.READER)
+                self._add_member(workspace.authorization_domains.first(), self.gregor_all)
+            self._add_unexpected_records(workspace)
+
+        site_ids = list(self.drupal_sites)
+        for i in range(self.n_users):
+            username = "{}_user{}".format(PREFIX.lower(), i)
+            drupal_uid = str(920000 + i)
+            # Leave some users out of the local database so that the audit finds new ones.
+            if self._keep():
+                user = UserFactory.create(
+                    username=username,
+                    name="Benchmark User{}".format(i),
+                    email="{}@example.com".format(username),
+                )
+                SocialAccount.objects.create(user=user, uid=drupal_uid, provider=CustomProvider.id)
+            self.drupal_users.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "drupal_internal__uid": drupal_uid,
+                    "name": username,
+                    "mail": "{}@example.com".format(username),
+                    "field_fname": "Benchmark",
+                    "field_lname": "User{}".format(i),
+                    "site_ids": self.rng.sample(site_ids, min(len(site_ids), 1)),
+                }
+            )
+
+    def _json_api_body(self, type_, data):
+        return json.dumps(
+            {"data": [{"type": type_, "id": id_, "attributes": attributes} for id_, attributes in data.items()]}
+        )
+
+    def _json_api_users_body(self):
+        data = []
+        for user in self.drupal_users:
+            attributes = {key: value for key, value in user.items() if key not in ("id", "site_ids")}
+            relationships = {
+                "field_research_center_or_site": {
+                    "data": [{"type": "node--research_center", "id": site_id} for site_id in user["site_ids"]]
+                }
+            }
+            data.append({"type": "users", "id": user["id"], "attributes": attributes, "relationships": relationships})
+        return json.dumps({"data": data})
+
+    def mock_drupal(self, requests_mock):
+        """Register mocked Drupal JSON:API responses for the synthetic data with a responses.RequestsMock."""
+        api_root = "{}/{}".format(settings.DRUPAL_SITE_URL, settings.DRUPAL_API_REL_PATH)
+        requests_mock.post(
+            "{}/oauth/token".format(settings.DRUPAL_SITE_URL),
+            json={"token_type": "Bearer", "access_token": "benchmark", "expires_in": 3600},
+        )
+        requests_mock.get(
+            re.compile(re.escape(api_root + "/node/research_center")),
+            body=self._json_api_body("node--research_center", self.drupal_sites),
+        )
+        requests_mock.get(
+            re.compile(re.escape(api_root + "/node/partner_group")),
+            body=self._json_api_body("node--partner_group", self.drupal_partner_groups),
+        )
+        requests_mock.get(re.compile(re.escape(api_root + "/user/user")), body=self._json_api_users_body())
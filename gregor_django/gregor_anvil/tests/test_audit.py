@@ -2,10 +2,14 @@
 
 from dataclasses import dataclass
 from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
 
 import django_tables2 as tables
 import responses
+from anvil_consortium_manager.anvil_api import AnVILAPIError
 from anvil_consortium_manager.models import GroupGroupMembership, WorkspaceGroupSharing
+from anvil_consortium_manager.tests.api_factories import ErrorResponseFactory
 from anvil_consortium_manager.tests.factories import (
     GroupGroupMembershipFactory,
     ManagedGroupFactory,
@@ -15,20 +19,26 @@ from anvil_consortium_manager.tests.factories import (
 )
 from anvil_consortium_manager.tests.utils import AnVILAPIMockTestMixin
 from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from faker import Faker
 from freezegun import freeze_time
 
-from .. import models
+from .. import models, reaudit_queue
 from ..audit import (
+    bulk_resolve,
     combined_workspace_audit,
     dcc_processed_data_workspace_audit,
+    result_store,
     upload_workspace_audit,
     workspace_auth_domain_audit_results,
     workspace_sharing_audit_results,
 )
 from ..audit.base import GREGoRAudit, GREGoRAuditResult
+from ..audit.upload_cycle_lookup import UploadCycleLookup
 from ..tests import factories
 
 fake = Faker()
@@ -175,6 +185,401 @@ class GREGoRAuditTest(TestCase):
         self.assertEqual(table.rows[0].get_cell("value"), "c")
 
 
+class UploadCycleLookupTest(TestCase):
+    """Tests for the `UploadCycleLookup` class."""
+
+    def test_today_default(self):
+        lookup = UploadCycleLookup()
+        self.assertEqual(lookup.today, timezone.localdate())
+
+    def test_today_specified(self):
+        today = timezone.localdate() - timedelta(days=5)
+        lookup = UploadCycleLookup(today=today)
+        self.assertEqual(lookup.today, today)
+
+    def test_base_audit_has_lookup(self):
+        audit = TempAudit()
+        self.assertIsInstance(audit.upload_cycle_lookup, UploadCycleLookup)
+
+    def test_is_current_is_past_is_future(self):
+        lookup = UploadCycleLookup()
+        # Previous cycle.
+        upload_cycle = factories.UploadCycleFactory.create(is_past=True)
+        self.assertTrue(lookup.is_past(upload_cycle))
+        self.assertFalse(lookup.is_current(upload_cycle))
+        self.assertFalse(lookup.is_future(upload_cycle))
+        # Current cycle, end date today.
+        upload_cycle = factories.UploadCycleFactory.create(
+            start_date=timezone.localdate() - timedelta(days=10),
+            end_date=timezone.localdate(),
+        )
+        self.assertFalse(lookup.is_past(upload_cycle))
+        self.assertTrue(lookup.is_current(upload_cycle))
+        self.assertFalse(lookup.is_future(upload_cycle))
+        # Current cycle, start date today.
+        upload_cycle = factories.UploadCycleFactory.create(
+            start_date=timezone.localdate(),
+            end_date=timezone.localdate() + timedelta(days=10),
+        )
+        self.assertFalse(lookup.is_past(upload_cycle))
+        self.assertTrue(lookup.is_current(upload_cycle))
+        self.assertFalse(lookup.is_future(upload_cycle))
+        # Future cycle.
+        upload_cycle = factories.UploadCycleFactory.create(is_future=True)
+        self.assertFalse(lookup.is_past(upload_cycle))
+        self.assertFalse(lookup.is_current(upload_cycle))
+        self.assertTrue(lookup.is_future(upload_cycle))
+
+    def test_status_uses_same_date_across_midnight(self):
+        """Status checks use the date when the lookup was created."""
+        upload_cycle = factories.UploadCycleFactory.create(
+            start_date=timezone.localdate() - timedelta(days=10),
+            end_date=timezone.localdate(),
+        )
+        lookup = UploadCycleLookup()
+        with freeze_time(timezone.now() + timedelta(days=1)):
+            self.assertTrue(lookup.is_current(upload_cycle))
+            self.assertFalse(lookup.is_past(upload_cycle))
+            self.assertTrue(UploadCycleLookup().is_past(upload_cycle))
+
+    def test_get_combined_workspace(self):
+        combined_workspace = factories.CombinedConsortiumDataWorkspaceFactory.create(
+            upload_cycle__is_past=True, date_completed=timezone.localdate()
+        )
+        lookup = UploadCycleLookup()
+        self.assertEqual(lookup.get_combined_workspace(combined_workspace.upload_cycle), combined_workspace)
+
+    def test_get_combined_workspace_not_completed(self):
+        combined_workspace = factories.CombinedConsortiumDataWorkspaceFactory.create(upload_cycle__is_past=True)
+        lookup = UploadCycleLookup()
+        self.assertIsNone(lookup.get_combined_workspace(combined_workspace.upload_cycle))
+
+    def test_get_combined_workspace_no_combined_workspace(self):
+        upload_cycle = factories.UploadCycleFactory.create(is_past=True)
+        lookup = UploadCycleLookup()
+        self.assertIsNone(lookup.get_combined_workspace(upload_cycle))
+
+    def test_get_combined_workspace_one_query(self):
+        upload_cycle_1 = factories.UploadCycleFactory.create(is_past=True)
+        factories.CombinedConsortiumDataWorkspaceFactory.create(
+            upload_cycle=upload_cycle_1, date_completed=timezone.localdate()
+        )
+        upload_cycle_2 = factories.UploadCycleFactory.create(is_current=True)
+        lookup = UploadCycleLookup()
+        with self.assertNumQueries(1):
+            for _ in range(3):
+                lookup.get_combined_workspace(upload_cycle_1)
+                lookup.get_combined_workspace(upload_cycle_2)
+
+
+class ResultStoreTest(TestCase):
+    """Tests for the `result_store` module."""
+
+    def run_and_save_audit(self, queryset=None):
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit(queryset=queryset)
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        return audit
+
+    def test_save_audit_results(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = self.run_and_save_audit()
+        stored_results = models.StoredAuditResult.objects.all()
+        self.assertEqual(stored_results.count(), len(audit.get_all_results()))
+        self.assertEqual(stored_results.values("run_id").distinct().count(), 1)
+        for stored_result in stored_results:
+            self.assertEqual(stored_result.audit_class, "UploadWorkspaceSharingAudit")
+            self.assertEqual(stored_result.workspace, upload_workspace.workspace)
+
+    def test_save_audit_results_status_and_details(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        WorkspaceGroupSharingFactory.create(
+            workspace=upload_workspace.workspace,
+            group=upload_workspace.workspace.authorization_domains.first(),
+            access=WorkspaceGroupSharing.READER,
+        )
+        audit = self.run_and_save_audit()
+        auth_domain = upload_workspace.workspace.authorization_domains.first()
+        audit_result = [x for x in audit.verified if x.managed_group == auth_domain][0]
+        stored_result = models.StoredAuditResult.objects.get(managed_group=auth_domain)
+        self.assertEqual(stored_result.status, models.StoredAuditResult.StatusTypes.VERIFIED)
+        self.assertEqual(stored_result.result_type, "VerifiedShared")
+        self.assertEqual(stored_result.get_table_dictionary(), audit_result.get_table_dictionary())
+
+    def test_save_audit_results_replaces_only_audited_workspaces(self):
+        upload_workspace_1 = factories.UploadWorkspaceFactory.create()
+        upload_workspace_2 = factories.UploadWorkspaceFactory.create()
+        self.run_and_save_audit()
+        run_id_2 = models.StoredAuditResult.objects.filter(workspace=upload_workspace_2.workspace).first().run_id
+        self.run_and_save_audit(queryset=models.UploadWorkspace.objects.filter(pk=upload_workspace_1.pk))
+        # Results for the second workspace are unchanged.
+        self.assertFalse(
+            models.StoredAuditResult.objects.filter(workspace=upload_workspace_2.workspace)
+            .exclude(run_id=run_id_2)
+            .exists()
+        )
+        self.assertFalse(
+            models.StoredAuditResult.objects.filter(workspace=upload_workspace_1.workspace, run_id=run_id_2).exists()
+        )
+
+    def test_stored_audit(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = self.run_and_save_audit()
+        stored_audit = result_store.StoredAudit(upload_workspace_audit.UploadWorkspaceSharingAudit())
+        stored_audit.run_audit()
+        self.assertIsNotNone(stored_audit.date_run)
+        self.assertEqual(len(stored_audit.verified), len(audit.verified))
+        self.assertEqual(len(stored_audit.needs_action), len(audit.needs_action))
+        self.assertEqual(len(stored_audit.errors), len(audit.errors))
+        self.assertEqual(stored_audit.ok(), audit.ok())
+        self.assertIsInstance(
+            stored_audit.get_needs_action_table(), upload_workspace_audit.UploadWorkspaceSharingAuditTable
+        )
+        self.assertIn(upload_workspace, stored_audit.queryset)
+
+    def test_stored_audit_no_stored_results(self):
+        factories.UploadWorkspaceFactory.create()
+        stored_audit = result_store.StoredAudit(upload_workspace_audit.UploadWorkspaceSharingAudit())
+        stored_audit.run_audit()
+        self.assertIsNone(stored_audit.date_run)
+        self.assertEqual(stored_audit.get_all_results(), [])
+
+    def test_reaudit_workspaces_no_stored_results(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        result_store.reaudit_workspaces([upload_workspace.workspace.pk])
+        self.assertEqual(models.StoredAuditResult.objects.count(), 0)
+
+    def test_reaudit_workspaces(self):
+        upload_workspace_1 = factories.UploadWorkspaceFactory.create()
+        upload_workspace_2 = factories.UploadWorkspaceFactory.create()
+        self.run_and_save_audit()
+        run_id = models.StoredAuditResult.objects.first().run_id
+        result_store.reaudit_workspaces([upload_workspace_1.workspace.pk])
+        self.assertFalse(
+            models.StoredAuditResult.objects.filter(workspace=upload_workspace_1.workspace, run_id=run_id).exists()
+        )
+        self.assertFalse(
+            models.StoredAuditResult.objects.filter(workspace=upload_workspace_2.workspace)
+            .exclude(run_id=run_id)
+            .exists()
+        )
+        # Audits that have not been stored are not run.
+        self.assertEqual(
+            set(models.StoredAuditResult.objects.values_list("audit_class", flat=True)),
+            {"UploadWorkspaceSharingAudit"},
+        )
+
+    def test_sharing_change_reaudits_workspace(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        auth_domain = upload_workspace.workspace.authorization_domains.first()
+        self.run_and_save_audit()
+        self.assertEqual(
+            models.StoredAuditResult.objects.get(managed_group=auth_domain).status,
+            models.StoredAuditResult.StatusTypes.NEEDS_ACTION,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkspaceGroupSharingFactory.create(
+                workspace=upload_workspace.workspace, group=auth_domain, access=WorkspaceGroupSharing.READER
+            )
+        # The change only queues the workspace to be re-audited.
+        self.assertEqual(
+            models.StoredAuditResult.objects.get(managed_group=auth_domain).status,
+            models.StoredAuditResult.StatusTypes.NEEDS_ACTION,
+        )
+        self.assertEqual(reaudit_queue.process_pending_reaudits(), 1)
+        self.assertEqual(
+            models.StoredAuditResult.objects.get(managed_group=auth_domain).status,
+            models.StoredAuditResult.StatusTypes.VERIFIED,
+        )
+
+    def test_sharing_change_other_workspace_not_reaudited(self):
+        upload_workspace_1 = factories.UploadWorkspaceFactory.create()
+        upload_workspace_2 = factories.UploadWorkspaceFactory.create()
+        self.run_and_save_audit()
+        run_id = models.StoredAuditResult.objects.first().run_id
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkspaceGroupSharingFactory.create(workspace=upload_workspace_1.workspace)
+        reaudit_queue.process_pending_reaudits()
+        self.assertFalse(
+            models.StoredAuditResult.objects.filter(workspace=upload_workspace_2.workspace)
+            .exclude(run_id=run_id)
+            .exists()
+        )
+
+    def test_changes_queue_each_workspace_once(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        self.run_and_save_audit()
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkspaceGroupSharingFactory.create_batch(3, workspace=upload_workspace.workspace)
+        self.assertEqual(models.PendingReaudit.objects.get().workspace, upload_workspace.workspace)
+        with patch.object(result_store, "reaudit_workspaces") as reaudit_workspaces:
+            self.assertEqual(reaudit_queue.process_pending_reaudits(), 1)
+        reaudit_workspaces.assert_called_once_with([upload_workspace.workspace.pk])
+        self.assertEqual(models.PendingReaudit.objects.count(), 0)
+
+    def test_process_pending_reaudits_in_batches(self):
+        workspaces = [x.workspace for x in factories.UploadWorkspaceFactory.create_batch(3)]
+        reaudit_queue.queue_reaudit([x.pk for x in workspaces])
+        with patch.object(result_store, "reaudit_workspaces") as reaudit_workspaces:
+            self.assertEqual(reaudit_queue.process_pending_reaudits(batch_size=2), 3)
+        self.assertEqual(reaudit_workspaces.call_count, 2)
+
+    def test_process_pending_reaudits_failure_requeues(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        reaudit_queue.queue_reaudit([upload_workspace.workspace.pk])
+        with patch.object(result_store, "reaudit_workspaces", side_effect=ValueError("audit failed")):
+            with self.assertRaises(ValueError):
+                reaudit_queue.process_pending_reaudits()
+        self.assertEqual(models.PendingReaudit.objects.get().workspace, upload_workspace.workspace)
+
+    def test_process_pending_reaudits_command(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        reaudit_queue.queue_reaudit([upload_workspace.workspace.pk])
+        out = StringIO()
+        call_command("process_pending_reaudits", stdout=out)
+        self.assertIn("Re-audited 1 workspaces.", out.getvalue())
+        self.assertEqual(models.PendingReaudit.objects.count(), 0)
+
+
+class BulkResolveTest(AnVILAPIMockTestMixin, TestCase):
+    """Tests for the `bulk_resolve` module."""
+
+    def get_share_as_reader_result(self, workspace_name):
+        workspace = WorkspaceFactory.create(billing_project__name="test-bp", name=workspace_name)
+        group = ManagedGroupFactory.create()
+        return workspace_sharing_audit_results.ShareAsReader(
+            workspace=workspace,
+            managed_group=group,
+            current_sharing_instance=None,
+            note="foo",
+        )
+
+    def add_acl_response(self, audit_result, status=200):
+        acls = [
+            {
+                "email": audit_result.managed_group.email,
+                "accessLevel": "READER",
+                "canShare": False,
+                "canCompute": False,
+            }
+        ]
+        if status == 200:
+            json = {"invitesSent": {}, "usersNotFound": {}, "usersUpdated": acls}
+        else:
+            json = ErrorResponseFactory().response
+        self.anvil_response_mock.add(
+            responses.PATCH,
+            self.api_client.rawls_entry_point
+            + "/api/workspaces/test-bp/{}/acl?inviteUsersNotFound=false".format(audit_result.workspace.name),
+            status=status,
+            match=[responses.matchers.json_params_matcher(acls)],
+            json=json,
+        )
+
+    def test_get_resolvable_results(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        resolvable_results = bulk_resolve.get_resolvable_results(audit)
+        self.assertTrue(all(x.action for x in resolvable_results))
+        auth_domain = upload_workspace.workspace.authorization_domains.first()
+        auth_domain_results = [x for x in resolvable_results if x.managed_group == auth_domain]
+        self.assertEqual(len(auth_domain_results), 1)
+        self.assertIsInstance(auth_domain_results[0], workspace_sharing_audit_results.ShareAsReader)
+
+    def test_resolve_no_results(self):
+        self.assertEqual(bulk_resolve.resolve_audit_results([], max_workers=1), [])
+
+    def test_resolve_two_results(self):
+        audit_result_1 = self.get_share_as_reader_result("ws-1")
+        audit_result_2 = self.get_share_as_reader_result("ws-2")
+        self.add_acl_response(audit_result_1)
+        self.add_acl_response(audit_result_2)
+        resolved_results = bulk_resolve.resolve_audit_results([audit_result_1, audit_result_2], max_workers=1)
+        self.assertEqual([x.audit_result for x in resolved_results], [audit_result_1, audit_result_2])
+        self.assertTrue(all(x.ok for x in resolved_results))
+        self.assertTrue(audit_result_1.handled)
+        self.assertTrue(audit_result_2.handled)
+        self.assertEqual(WorkspaceGroupSharing.objects.count(), 2)
+
+    def test_resolve_one_failure(self):
+        """A failed AnVIL call only rolls back the database changes for that result."""
+        audit_result_1 = self.get_share_as_reader_result("ws-1")
+        audit_result_2 = self.get_share_as_reader_result("ws-2")
+        self.add_acl_response(audit_result_1, status=400)
+        self.add_acl_response(audit_result_2)
+        resolved_results = bulk_resolve.resolve_audit_results([audit_result_1, audit_result_2], max_workers=1)
+        self.assertFalse(resolved_results[0].ok)
+        self.assertIsInstance(resolved_results[0].error, AnVILAPIError)
+        self.assertTrue(resolved_results[1].ok)
+        self.assertFalse(audit_result_1.handled)
+        self.assertEqual(WorkspaceGroupSharing.objects.count(), 1)
+        self.assertEqual(WorkspaceGroupSharing.objects.get().workspace, audit_result_2.workspace)
+
+    def test_resolve_retries_transient_error(self):
+        audit_result = self.get_share_as_reader_result("ws-1")
+        self.add_acl_response(audit_result, status=500)
+        self.add_acl_response(audit_result)
+        resolved_results = bulk_resolve.resolve_audit_results([audit_result], max_workers=1, retry_delay=0)
+        self.assertTrue(resolved_results[0].ok)
+        self.assertEqual(WorkspaceGroupSharing.objects.count(), 1)
+
+    def test_resolve_retries_exhausted(self):
+        audit_result = self.get_share_as_reader_result("ws-1")
+        self.add_acl_response(audit_result, status=500)
+        self.add_acl_response(audit_result, status=500)
+        resolved_results = bulk_resolve.resolve_audit_results(
+            [audit_result], max_workers=1, max_retries=1, retry_delay=0
+        )
+        self.assertFalse(resolved_results[0].ok)
+        self.assertEqual(WorkspaceGroupSharing.objects.count(), 0)
+
+    def test_max_workers_zero(self):
+        with self.assertRaises(ValueError):
+            bulk_resolve.resolve_audit_results([], max_workers=0)
+
+    def test_resolve_reaudits_changed_workspaces_once(self):
+        """Changed workspaces are queued for re-auditing once, after the caller's transaction commits."""
+        audit_result_1 = self.get_share_as_reader_result("ws-1")
+        audit_result_2 = self.get_share_as_reader_result("ws-2")
+        self.add_acl_response(audit_result_1)
+        self.add_acl_response(audit_result_2)
+        with patch.object(reaudit_queue, "queue_reaudit") as mock_queue:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                bulk_resolve.resolve_audit_results([audit_result_1, audit_result_2], max_workers=1)
+                mock_queue.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        mock_queue.assert_called_once_with({audit_result_1.workspace.pk, audit_result_2.workspace.pk})
+
+    def test_resolve_no_changes_no_reaudit(self):
+        audit_result = self.get_share_as_reader_result("ws-1")
+        self.add_acl_response(audit_result, status=400)
+        with self.captureOnCommitCallbacks() as callbacks:
+            bulk_resolve.resolve_audit_results([audit_result], max_workers=1)
+        self.assertEqual(callbacks, [])
+
+    def test_resolve_updates_stored_results(self):
+        """Stored results are up to date once the queued re-audit has run."""
+        upload_workspace = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="ws-1"
+        )
+        auth_domain = upload_workspace.workspace.authorization_domains.first()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        stored_result = models.StoredAuditResult.objects.get(managed_group=auth_domain)
+        self.assertEqual(stored_result.status, models.StoredAuditResult.StatusTypes.NEEDS_ACTION)
+        audit_result = [x for x in audit.needs_action if x.managed_group == auth_domain][0]
+        self.add_acl_response(audit_result)
+        with self.captureOnCommitCallbacks(execute=True):
+            resolved_results = bulk_resolve.resolve_audit_results([audit_result], max_workers=1)
+        self.assertTrue(resolved_results[0].ok)
+        reaudit_queue.process_pending_reaudits()
+        stored_result = models.StoredAuditResult.objects.get(managed_group=auth_domain)
+        self.assertEqual(stored_result.status, models.StoredAuditResult.StatusTypes.VERIFIED)
+        self.assertEqual(stored_result.result_type, "VerifiedShared")
+
+
 class WorkspaceSharingAuditResultTest(AnVILAPIMockTestMixin, TestCase):
     """General tests of the UploadWorkspaceSharingAuditResult dataclasses."""
 
@@ -1246,6 +1651,36 @@ class UploadWorkspaceSharingAuditTest(TestCase):
                 queryset=models.CombinedConsortiumDataWorkspace.objects.all()
             )
 
+    def test_num_queries_does_not_depend_on_number_of_workspaces(self):
+        """The number of queries in run_audit does not increase with the number of workspaces."""
+        ManagedGroupFactory.create(name="GREGOR_DCC_WRITERS")
+        ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
+        upload_workspace = factories.UploadWorkspaceFactory.create(
+            research_center__uploader_group=ManagedGroupFactory.create()
+        )
+        WorkspaceGroupSharingFactory.create(
+            workspace=upload_workspace.workspace, group=upload_workspace.workspace.authorization_domains.first()
+        )
+        factories.CombinedConsortiumDataWorkspaceFactory.create(
+            upload_cycle=upload_workspace.upload_cycle, date_completed=timezone.localdate()
+        )
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        with CaptureQueriesContext(connection) as context:
+            audit.run_audit()
+        n_queries = len(context.captured_queries)
+        # Add more workspaces.
+        for _ in range(3):
+            upload_workspace = factories.UploadWorkspaceFactory.create(
+                research_center__uploader_group=ManagedGroupFactory.create()
+            )
+            WorkspaceGroupSharingFactory.create(
+                workspace=upload_workspace.workspace, group=upload_workspace.workspace.authorization_domains.first()
+            )
+            WorkspaceGroupSharingFactory.create(workspace=upload_workspace.workspace)
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        with self.assertNumQueries(n_queries):
+            audit.run_audit()
+
 
 class UploadWorkspaceSharingAuditFutureCycleTest(TestCase):
     """Tests for the `UploadWorkspaceSharingAudit` class for future cycle UploadWorkspaces.
@@ -5035,6 +5470,42 @@ class UploadWorkspaceAuthDomainAuditTest(TestCase):
                 queryset=models.CombinedConsortiumDataWorkspace.objects.all()
             )
 
+    def test_num_queries_does_not_depend_on_number_of_workspaces(self):
+        """The number of queries in run_audit does not increase with the number of workspaces."""
+        ManagedGroupFactory.create(name="GREGOR_ALL")
+        ManagedGroupFactory.create(name="GREGOR_DCC_MEMBERS")
+        ManagedGroupFactory.create(name="GREGOR_DCC_WRITERS")
+        ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
+        upload_workspace = factories.UploadWorkspaceFactory.create(
+            research_center__member_group=ManagedGroupFactory.create(),
+            research_center__uploader_group=ManagedGroupFactory.create(),
+        )
+        GroupGroupMembershipFactory.create(
+            parent_group=upload_workspace.workspace.authorization_domains.first(),
+            child_group=upload_workspace.research_center.member_group,
+        )
+        factories.CombinedConsortiumDataWorkspaceFactory.create(
+            upload_cycle=upload_workspace.upload_cycle, date_completed=timezone.localdate()
+        )
+        audit = upload_workspace_audit.UploadWorkspaceAuthDomainAudit()
+        with CaptureQueriesContext(connection) as context:
+            audit.run_audit()
+        n_queries = len(context.captured_queries)
+        # Add more workspaces.
+        for _ in range(3):
+            upload_workspace = factories.UploadWorkspaceFactory.create(
+                research_center__member_group=ManagedGroupFactory.create(),
+                research_center__uploader_group=ManagedGroupFactory.create(),
+            )
+            GroupGroupMembershipFactory.create(
+                parent_group=upload_workspace.workspace.authorization_domains.first(),
+                child_group=upload_workspace.research_center.member_group,
+            )
+            GroupGroupMembershipFactory.create(parent_group=upload_workspace.workspace.authorization_domains.first())
+        audit = upload_workspace_audit.UploadWorkspaceAuthDomainAudit()
+        with self.assertNumQueries(n_queries):
+            audit.run_audit()
+
 
 class UploadWorkspaceAuthDomainAuditFutureCycleTest(TestCase):
     """Tests for the `UploadWorkspaceAuthDomainAudit` class for future cycle UploadWorkspaces."""
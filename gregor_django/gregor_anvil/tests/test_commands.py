@@ -1,22 +1,28 @@
 """Tests for management commands in the `gregor_anvil` app."""
 
+import json
 from datetime import timedelta
 from io import StringIO
+from unittest.mock import patch
 
+import responses
 from anvil_consortium_manager.models import GroupGroupMembership, WorkspaceGroupSharing
 from anvil_consortium_manager.tests.factories import (
     GroupGroupMembershipFactory,
     ManagedGroupFactory,
     WorkspaceGroupSharingFactory,
 )
+from anvil_consortium_manager.tests.utils import AnVILAPIMockTestMixin
 from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core import mail
 from django.core.management import call_command
-from django.test import TestCase
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
+from .. import email_outbox, models, workspace_report
 from . import factories
 
 
@@ -27,6 +33,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         """Test command output."""
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... ok!",
@@ -58,6 +65,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... ok!",
@@ -76,6 +84,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         factories.UploadWorkspaceFactory.create()
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... problems found.",
@@ -98,6 +107,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... problems found.",
@@ -119,6 +129,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running UploadWorkspace sharing audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -128,6 +139,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         factories.UploadWorkspaceFactory.create()
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... problems found.",
@@ -154,6 +166,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace sharing audit... problems found.",
@@ -173,6 +186,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         factories.UploadWorkspaceFactory.create()
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:upload_workspaces:sharing:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
@@ -199,6 +213,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace auth domain audit... ok!",
@@ -217,6 +232,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace auth domain audit... problems found.",
@@ -243,6 +259,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace auth domain audit... problems found.",
@@ -278,6 +295,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running UploadWorkspace auth domain audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -301,6 +319,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         # One message has been sent by default.
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
@@ -322,6 +341,7 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running UploadWorkspace auth domain audit... problems found.",
@@ -362,17 +382,37 @@ class RunUploadWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_upload_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:upload_workspaces:auth_domains:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
 
+    def test_both_audits_problems_email_digest(self):
+        """Reports from both audits are coalesced into one email."""
+        factories.UploadWorkspaceFactory.create()
+        ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
+        out = StringIO()
+        call_command("run_upload_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
+        self.assertIn("Running UploadWorkspace sharing audit... problems found.", out.getvalue())
+        self.assertIn("Running UploadWorkspace auth domain audit... problems found.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, ["test@example.com"])
+        self.assertEqual(email.subject, "GREGoR reports - 2 reports")
+        self.assertIn("UploadWorkspaceSharingAudit - problems found", email.body)
+        self.assertIn("UploadWorkspaceAuthDomainAudit - problems found", email.body)
+        self.assertEqual(len(email.attachments), 2)
+        self.assertFalse(models.QueuedEmail.objects.filter(status=models.QueuedEmail.StatusTypes.PENDING).exists())
+
 
 class RunCombinedWorkspaceAuditTestCase(TestCase):
     def test_no_workspaces(self):
         """Test command output."""
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... ok!",
@@ -400,6 +440,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         # Verified not shared with auth domain.
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... ok!",
@@ -418,6 +459,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         factories.CombinedConsortiumDataWorkspaceFactory.create(date_completed=timezone.now() - timedelta(days=1))
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... problems found.",
@@ -440,6 +482,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... problems found.",
@@ -458,6 +501,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         # Verified not shared with auth domain.
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running CombinedConsortiumDataWorkspace sharing audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -468,6 +512,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         factories.CombinedConsortiumDataWorkspaceFactory.create(date_completed=timezone.now() - timedelta(days=1))
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... problems found.",
@@ -494,6 +539,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace sharing audit... problems found.",
@@ -513,6 +559,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         factories.CombinedConsortiumDataWorkspaceFactory.create(date_completed=timezone.now() - timedelta(days=1))
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:combined_workspaces:sharing:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
@@ -539,6 +586,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace auth domain audit... ok!",
@@ -557,6 +605,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace auth domain audit... problems found.",
@@ -578,6 +627,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace auth domain audit... problems found.",
@@ -600,6 +650,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running CombinedConsortiumDataWorkspace auth domain audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -611,6 +662,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         factories.ManagedGroupFactory.create(name="GREGOR_ALL")
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         # One message has been sent by default.
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
@@ -626,6 +678,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         )
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running CombinedConsortiumDataWorkspace auth domain audit... problems found.",
@@ -660,6 +713,7 @@ class RunCombinedWorkspaceAuditTestCase(TestCase):
         ManagedGroupFactory.create(name="GREGOR_ALL")
         out = StringIO()
         call_command("run_combined_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:combined_workspaces:auth_domains:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
@@ -673,6 +727,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         """Test command output."""
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... ok!",
@@ -704,6 +759,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... ok!",
@@ -722,6 +778,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         factories.DCCProcessedDataWorkspaceFactory.create()
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... problems found.",
@@ -744,6 +801,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... problems found.",
@@ -765,6 +823,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running DCCProcessedDataWorkspace sharing audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -774,6 +833,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         factories.DCCProcessedDataWorkspaceFactory.create()
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... problems found.",
@@ -800,6 +860,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace sharing audit... problems found.",
@@ -819,6 +880,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         factories.DCCProcessedDataWorkspaceFactory.create()
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:dcc_processed_data_workspaces:sharing:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
@@ -845,6 +907,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace auth domain audit... ok!",
@@ -863,6 +926,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         ManagedGroupFactory.create(name=settings.ANVIL_DCC_ADMINS_GROUP_NAME)
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace auth domain audit... problems found.",
@@ -889,6 +953,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace auth domain audit... problems found.",
@@ -924,6 +989,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("Running DCCProcessedDataWorkspace auth domain audit... ok!", out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
@@ -947,6 +1013,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         # One message has been sent by default.
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
@@ -968,6 +1035,7 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         expected_string = "\n".join(
             [
                 "Running DCCProcessedDataWorkspace auth domain audit... problems found.",
@@ -1008,7 +1076,395 @@ class RunDCCProcessedDataWorkspaceAuditTest(TestCase):
         )
         out = StringIO()
         call_command("run_dcc_processed_data_workspace_audit", "--no-color", stdout=out)
+        email_outbox.send_queued_emails()
         url = reverse("gregor_anvil:audit:dcc_processed_data_workspaces:auth_domains:all")
         self.assertIn(url, out.getvalue())
         # Zero messages have been sent by default.
         self.assertEqual(len(mail.outbox), 0)
+
+
+class RunGREGoRAuditsTest(TestCase):
+    """Tests for the run_gregor_audits command"""
+
+    def test_no_workspaces(self):
+        """Test command output with no workspaces."""
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", stdout=out)
+        email_outbox.send_queued_emails()
+        for title in [
+            "UploadWorkspace sharing audit",
+            "UploadWorkspace auth domain audit",
+            "CombinedConsortiumDataWorkspace sharing audit",
+            "CombinedConsortiumDataWorkspace auth domain audit",
+            "DCCProcessedDataWorkspace sharing audit",
+            "DCCProcessedDataWorkspace auth domain audit",
+        ]:
+            expected_string = "\n".join(
+                [
+                    "{}... ok!".format(title),
+                    "* Verified: 0",
+                    "* Needs action: 0",
+                    "* Errors: 0",
+                ]
+            )
+            self.assertIn(expected_string, out.getvalue())
+        # Zero messages have been sent by default.
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_no_workspaces_multiple_workers(self):
+        """Audits can be run in a thread pool."""
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=3", stdout=out)
+        email_outbox.send_queued_emails()
+        self.assertEqual(out.getvalue().count("... ok!"), 6)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_max_workers_zero(self):
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("run_gregor_audits", "--no-color", "--max-workers=0", stdout=out)
+
+    def test_results_are_stored(self):
+        """Audit results are stored so that the audit views can show them."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", stdout=out)
+        stored_results = models.StoredAuditResult.objects.filter(audit_class="UploadWorkspaceSharingAudit")
+        self.assertTrue(stored_results.exists())
+        self.assertEqual(stored_results.values("run_id").distinct().count(), 1)
+        self.assertEqual(stored_results.first().workspace, upload_workspace.workspace)
+
+    def test_one_upload_workspace_needs_action(self):
+        """Test command output with one needs_action instance."""
+        factories.UploadWorkspaceFactory.create()
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", stdout=out)
+        email_outbox.send_queued_emails()
+        expected_string = "\n".join(
+            [
+                "UploadWorkspace sharing audit... problems found.",
+                "* Verified: 0",
+                "* Needs action: 1",
+                "* Errors: 0",
+            ]
+        )
+        self.assertIn(expected_string, out.getvalue())
+        self.assertIn("CombinedConsortiumDataWorkspace sharing audit... ok!", out.getvalue())
+        url = reverse("gregor_anvil:audit:upload_workspaces:sharing:all")
+        self.assertIn(url, out.getvalue())
+        # Zero messages have been sent by default.
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_one_upload_workspace_verified_email(self):
+        """No email is sent when there are no problems."""
+        workspace = factories.UploadWorkspaceFactory.create()
+        WorkspaceGroupSharingFactory.create(
+            workspace=workspace.workspace,
+            group=workspace.workspace.authorization_domains.first(),
+        )
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
+        self.assertIn("UploadWorkspace sharing audit... ok!", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_one_email_for_multiple_audits_with_problems(self):
+        """A single email is sent when multiple audits have problems."""
+        factories.UploadWorkspaceFactory.create()
+        combined_workspace = factories.CombinedConsortiumDataWorkspaceFactory.create()
+        # Shared with a group that should not have access.
+        WorkspaceGroupSharingFactory.create(workspace=combined_workspace.workspace)
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", email="test@example.com", stdout=out)
+        email_outbox.send_queued_emails()
+        self.assertIn("UploadWorkspace sharing audit... problems found.", out.getvalue())
+        self.assertIn("CombinedConsortiumDataWorkspace sharing audit... problems found.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, ["test@example.com"])
+        self.assertEqual(email.subject, "GREGoR audits - problems found")
+        html_body = email.alternatives[0][0]
+        self.assertIn("UploadWorkspace sharing audit", html_body)
+        self.assertIn("CombinedConsortiumDataWorkspace sharing audit", html_body)
+        self.assertNotIn("DCCProcessedDataWorkspace sharing audit", html_body)
+
+    def test_different_domain(self):
+        """Test command output when a different domain is specified."""
+        site = Site.objects.create(domain="foobar.com", name="test")
+        site.save()
+        with self.settings(SITE_ID=site.id):
+            factories.UploadWorkspaceFactory.create()
+            out = StringIO()
+            call_command("run_gregor_audits", "--no-color", "--max-workers=1", stdout=out)
+            self.assertIn("UploadWorkspace sharing audit... problems found.", out.getvalue())
+            self.assertIn("https://foobar.com", out.getvalue())
+
+
+class RunGREGoRAuditsResolveTest(AnVILAPIMockTestMixin, TestCase):
+    """Tests for the run_gregor_audits command with the --resolve option."""
+
+    def test_resolve_no_workspaces(self):
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", "--resolve", stdout=out)
+        self.assertNotIn("Resolving", out.getvalue())
+        self.assertEqual(out.getvalue().count("... ok!"), 6)
+
+    def test_resolve_one_upload_workspace(self):
+        upload_workspace = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="test-ws"
+        )
+        group = upload_workspace.workspace.authorization_domains.first()
+        acls = [
+            {
+                "email": group.email,
+                "accessLevel": "READER",
+                "canShare": False,
+                "canCompute": False,
+            }
+        ]
+        self.anvil_response_mock.add(
+            responses.PATCH,
+            self.api_client.rawls_entry_point + "/api/workspaces/test-bp/test-ws/acl?inviteUsersNotFound=false",
+            status=200,
+            match=[responses.matchers.json_params_matcher(acls)],
+            json={"invitesSent": {}, "usersNotFound": {}, "usersUpdated": acls},
+        )
+        out = StringIO()
+        call_command("run_gregor_audits", "--no-color", "--max-workers=1", "--resolve", stdout=out)
+        expected_string = "\n".join(
+            [
+                "Resolving UploadWorkspace sharing audit...",
+                "* Handled: 1",
+                "* Failed: 0",
+            ]
+        )
+        self.assertIn(expected_string, out.getvalue())
+        self.assertIn("UploadWorkspace sharing audit... ok!", out.getvalue())
+        sharing = WorkspaceGroupSharing.objects.get(workspace=upload_workspace.workspace, group=group)
+        self.assertEqual(sharing.access, WorkspaceGroupSharing.READER)
+
+
+class BenchmarkGREGoRAuditsTest(TestCase):
+    """Tests for the benchmark_gregor_audits command"""
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command(
+            "benchmark_gregor_audits",
+            "--upload-cycles=2",
+            "--research-centers=1",
+            "--consent-groups=1",
+            "--partner-groups=1",
+            "--users=2",
+            "--repeat=1",
+            *args,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        return json.loads(out.getvalue())
+
+    def test_output(self):
+        """Metrics are reported for each audit."""
+        results = self.call_command()
+        self.assertEqual(results["parameters"]["upload-cycles"], 2)
+        self.assertEqual(
+            set(results["audits"]),
+            {
+                "UploadWorkspaceSharingAudit",
+                "UploadWorkspaceAuthDomainAudit",
+                "CombinedConsortiumDataWorkspaceSharingAudit",
+                "CombinedConsortiumDataWorkspaceAuthDomainAudit",
+                "DCCProcessedDataWorkspaceSharingAudit",
+                "DCCProcessedDataWorkspaceAuthDomainAudit",
+                "UserAudit",
+                "SiteAudit",
+                "PartnerGroupAudit",
+            },
+        )
+        for metrics in results["audits"].values():
+            self.assertGreater(metrics["results"], 0)
+            self.assertGreater(metrics["queries"], 0)
+            self.assertGreater(metrics["peak_memory"], 0)
+            self.assertEqual(metrics["results"], metrics["verified"] + metrics["needs_action"] + metrics["errors"])
+
+    def test_data_is_rolled_back(self):
+        """The synthetic consortium is not kept by default."""
+        self.call_command()
+        self.assertEqual(models.UploadWorkspace.objects.count(), 0)
+        self.assertEqual(models.ResearchCenter.objects.count(), 0)
+
+    def test_keep_data(self):
+        self.call_command("--keep-data")
+        self.assertEqual(models.UploadWorkspace.objects.count(), 2)
+        self.assertEqual(models.CombinedConsortiumDataWorkspace.objects.count(), 2)
+
+    def test_repeat_zero(self):
+        with self.assertRaises(CommandError):
+            self.call_command("--repeat=0")
+
+    @override_settings(DEBUG=False, GREGOR_ALLOW_SYNTHETIC_DATA=False)
+    def test_refuses_to_run_without_debug(self):
+        with self.assertRaises(CommandError):
+            self.call_command()
+        self.assertEqual(models.UploadWorkspace.objects.count(), 0)
+
+    @override_settings(DEBUG=True, GREGOR_ALLOW_SYNTHETIC_DATA=False)
+    def test_runs_with_debug(self):
+        results = self.call_command()
+        self.assertIn("UploadWorkspaceSharingAudit", results["audits"])
+
+
+class SendQueuedEmailsTest(TestCase):
+    """Tests for the email outbox and the send_queued_emails command."""
+
+    def test_no_queued_emails(self):
+        out = StringIO()
+        call_command("send_queued_emails", "--no-color", stdout=out)
+        self.assertIn("Sent 0 messages.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_queue_email_without_recipients(self):
+        self.assertIsNone(email_outbox.queue_email("subject", "message", [None]))
+        self.assertEqual(models.QueuedEmail.objects.count(), 0)
+
+    def test_one_email(self):
+        queued_email = email_outbox.queue_email("subject", "message", ["test@example.com"], html_message="<p>hi</p>")
+        # Nothing is sent until the outbox is processed.
+        self.assertEqual(len(mail.outbox), 0)
+        out = StringIO()
+        call_command("send_queued_emails", "--no-color", stdout=out)
+        self.assertIn("Sent 1 messages.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, ["test@example.com"])
+        self.assertEqual(email.subject, "subject")
+        self.assertEqual(email.alternatives[0][0], "<p>hi</p>")
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, models.QueuedEmail.StatusTypes.SENT)
+        self.assertIsNotNone(queued_email.sent_at)
+        # Sent emails are not sent again.
+        call_command("send_queued_emails", "--no-color", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_coalesces_emails_by_recipients(self):
+        email_outbox.queue_email("subject 1", "message 1", ["test@example.com"])
+        email_outbox.queue_email("subject 2", "message 2", ["other@example.com"])
+        email_outbox.queue_email("subject 3", "message 3", ["test@example.com"], html_message="<p>3</p>")
+        self.assertEqual(email_outbox.send_queued_emails(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        digest = next(x for x in mail.outbox if x.to == ["test@example.com"])
+        self.assertEqual(digest.subject, "GREGoR reports - 2 reports")
+        self.assertEqual(
+            [(x[0], x[2]) for x in digest.attachments], [("report-1.txt", "text/plain"), ("report-2.html", "text/html")]
+        )
+        single = next(x for x in mail.outbox if x.to == ["other@example.com"])
+        self.assertEqual(single.subject, "subject 2")
+
+    def test_failed_email_is_retried(self):
+        queued_email = email_outbox.queue_email("subject", "message", ["test@example.com"])
+        with patch("django.core.mail.EmailMultiAlternatives.send", side_effect=OSError("SMTP error")):
+            out = StringIO()
+            call_command("send_queued_emails", "--no-color", stdout=out)
+        self.assertIn("Could not send 1 messages.", out.getvalue())
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, models.QueuedEmail.StatusTypes.PENDING)
+        self.assertEqual(queued_email.attempts, 1)
+        self.assertEqual(queued_email.last_error, "OSError: SMTP error")
+        # The email is sent on the next attempt.
+        self.assertEqual(email_outbox.send_queued_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_email_gives_up(self):
+        queued_email = email_outbox.queue_email("subject", "message", ["test@example.com"])
+        with patch("django.core.mail.EmailMultiAlternatives.send", side_effect=OSError("SMTP error")):
+            email_outbox.send_queued_emails(max_attempts=1)
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, models.QueuedEmail.StatusTypes.FAILED)
+        self.assertEqual(email_outbox.send_queued_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_email_is_not_sent_again(self):
+        """Emails claimed by another sender are skipped until their claim expires."""
+        queued_email = email_outbox.queue_email("subject", "message", ["test@example.com"])
+        queued_email.status = models.QueuedEmail.StatusTypes.SENDING
+        queued_email.claimed_at = timezone.now()
+        queued_email.save()
+        self.assertEqual(email_outbox.send_queued_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_expired_claim_is_sent(self):
+        """Emails whose sender stopped before recording the outcome are claimed again after the timeout."""
+        queued_email = email_outbox.queue_email("subject", "message", ["test@example.com"])
+        queued_email.status = models.QueuedEmail.StatusTypes.SENDING
+        queued_email.claimed_at = timezone.now() - email_outbox.CLAIM_TIMEOUT - timedelta(minutes=1)
+        queued_email.save()
+        self.assertEqual(email_outbox.send_queued_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        queued_email.refresh_from_db()
+        self.assertEqual(queued_email.status, models.QueuedEmail.StatusTypes.SENT)
+
+    def test_email_is_claimed_while_sending(self):
+        """Emails are marked as being sent before they are delivered."""
+        email_outbox.queue_email("subject", "message", ["test@example.com"])
+
+        def check_claimed(*args, **kwargs):
+            self.assertEqual(models.QueuedEmail.objects.get().status, models.QueuedEmail.StatusTypes.SENDING)
+            return 1
+
+        with patch("django.core.mail.EmailMultiAlternatives.send", side_effect=check_claimed):
+            self.assertEqual(email_outbox.send_queued_emails(), (1, 0))
+        self.assertEqual(models.QueuedEmail.objects.get().status, models.QueuedEmail.StatusTypes.SENT)
+
+
+class RebuildWorkspaceReportTest(TestCase):
+    """Tests for the rebuild_workspace_report command."""
+
+    def test_rebuild(self):
+        """The command recomputes counts that are out of date."""
+        factories.UploadWorkspaceFactory.create()
+        models.WorkspaceReportSummary.objects.update(workspace_counts={}, verified_linked_accounts=10)
+        out = StringIO()
+        call_command("rebuild_workspace_report", "--no-color", stdout=out)
+        self.assertIn("Rebuilt workspace report: 1 workspace types, 0 verified linked accounts.", out.getvalue())
+        summary = models.WorkspaceReportSummary.objects.get()
+        self.assertEqual(summary.workspace_counts, {"upload": {"n_total": 1, "n_shared": 0}})
+        self.assertEqual(summary.verified_linked_accounts, 0)
+
+    def test_creates_summary(self):
+        """The command creates the summary if it does not exist."""
+        models.WorkspaceReportSummary.objects.all().delete()
+        call_command("rebuild_workspace_report", stdout=StringIO())
+        self.assertEqual(models.WorkspaceReportSummary.objects.count(), 1)
+
+    def test_rebuild_twice(self):
+        """Rebuilding an existing summary does not create another one."""
+        call_command("rebuild_workspace_report", stdout=StringIO())
+        call_command("rebuild_workspace_report", stdout=StringIO())
+        self.assertEqual(models.WorkspaceReportSummary.objects.count(), 1)
+        self.assertEqual(models.WorkspaceReportSummary.objects.get().pk, workspace_report.SUMMARY_PK)
+
+
+class ExportGREGoRAuditsTest(TestCase):
+    """Tests for the export_gregor_audits command."""
+
+    def test_jsonl(self):
+        """Results of all audits are written as JSON Lines, running audits that have no stored results."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        out = StringIO()
+        call_command("export_gregor_audits", stdout=out)
+        rows = [json.loads(x) for x in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), models.StoredAuditResult.objects.count())
+        self.assertEqual(rows[0]["workspace"], str(upload_workspace.workspace))
+        self.assertIn("UploadWorkspaceSharingAudit", {x["audit"] for x in rows})
+
+    def test_csv_one_audit(self):
+        """Results of one audit are written as CSV."""
+        factories.UploadWorkspaceFactory.create()
+        out = StringIO()
+        call_command("export_gregor_audits", "--format", "csv", "--audit", "UploadWorkspaceSharingAudit", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "audit,status,workspace,managed_group,access,can_compute,note,action")
+        self.assertEqual(
+            len(lines) - 1,
+            models.StoredAuditResult.objects.filter(audit_class="UploadWorkspaceSharingAudit").count(),
+        )
@@ -1,3 +1,4 @@
+import uuid
 from datetime import date, timedelta
 
 from anvil_consortium_manager.tests.factories import ManagedGroupFactory, WorkspaceFactory
@@ -1447,6 +1448,40 @@ class CombinedConsortiumDataWorkspaceSuggestContributingWorkspacesTest(TestCase)
         self.assertIn(workspace_1, qs)
         self.assertNotIn(workspace_2, qs)
 
+    def test_partner_and_rc_processed_data_workspaces_single_query(self):
+        """Suggested workspaces for many groups are found with one query each."""
+        latest_partner_workspaces = []
+        latest_rc_workspaces = []
+        for _ in range(3):
+            workspace = factories.PartnerUploadWorkspaceFactory.create(date_completed=fake.date_object(), version=1)
+            latest_partner_workspaces.append(
+                factories.PartnerUploadWorkspaceFactory.create(
+                    partner_group=workspace.partner_group,
+                    consent_group=workspace.consent_group,
+                    date_completed=fake.date_object(),
+                    version=2,
+                )
+            )
+            workspace = factories.RCProcessedDataWorkspaceFactory.create(date_completed=fake.date_object(), version=1)
+            latest_rc_workspaces.append(
+                factories.RCProcessedDataWorkspaceFactory.create(
+                    research_center=workspace.research_center,
+                    consent_group=workspace.consent_group,
+                    date_completed=fake.date_object(),
+                    version=2,
+                )
+            )
+        with self.assertNumQueries(1):
+            partner_workspaces = list(
+                self.combined_consortium_data_workspace.suggest_contributing_partner_upload_workspaces()
+            )
+        self.assertEqual(set(partner_workspaces), set(latest_partner_workspaces))
+        with self.assertNumQueries(1):
+            rc_workspaces = list(
+                self.combined_consortium_data_workspace.suggest_contributing_rc_processed_data_workspaces()
+            )
+        self.assertEqual(set(rc_workspaces), set(latest_rc_workspaces))
+
 
 class ReleaseWorkspaceTest(TestCase):
     """Tests for the ReleaseWorkspace model."""
@@ -1956,6 +1991,40 @@ class ReleaseWorkspaceSuggestContributingWorkspacesTest(TestCase):
         self.assertIn(workspace_1, qs)
         self.assertIn(workspace_2, qs)
 
+    def test_partner_and_rc_processed_data_workspaces_single_query(self):
+        """Suggested workspaces for many groups are found with one query each."""
+        latest_partner_workspaces = []
+        latest_rc_workspaces = []
+        for _ in range(3):
+            workspace = factories.PartnerUploadWorkspaceFactory.create(
+                consent_group=self.release_workspace.consent_group, date_completed=fake.date_object(), version=1
+            )
+            latest_partner_workspaces.append(
+                factories.PartnerUploadWorkspaceFactory.create(
+                    partner_group=workspace.partner_group,
+                    consent_group=self.release_workspace.consent_group,
+                    date_completed=fake.date_object(),
+                    version=2,
+                )
+            )
+            workspace = factories.RCProcessedDataWorkspaceFactory.create(
+                consent_group=self.release_workspace.consent_group, date_completed=fake.date_object(), version=1
+            )
+            latest_rc_workspaces.append(
+                factories.RCProcessedDataWorkspaceFactory.create(
+                    research_center=workspace.research_center,
+                    consent_group=self.release_workspace.consent_group,
+                    date_completed=fake.date_object(),
+                    version=2,
+                )
+            )
+        with self.assertNumQueries(1):
+            partner_workspaces = list(self.release_workspace.suggest_contributing_partner_upload_workspaces())
+        self.assertEqual(set(partner_workspaces), set(latest_partner_workspaces))
+        with self.assertNumQueries(1):
+            rc_workspaces = list(self.release_workspace.suggest_contributing_rc_processed_data_workspaces())
+        self.assertEqual(set(rc_workspaces), set(latest_rc_workspaces))
+
 
 class DCCProcessingWorkspaceTest(TestCase):
     """Tests for the DCCProcessingWorkspace model."""
@@ -2187,3 +2256,51 @@ class RCProcessedDataWorkspace(TestCase):
         self.assertIn("date_completed", e.exception.error_dict)
         self.assertEqual(len(e.exception.error_dict["date_completed"]), 1)
         self.assertIn("Date cannot be in the future", e.exception.message_dict["date_completed"][0])
+
+
+class StoredAuditResultTest(TestCase):
+    """Tests for the StoredAuditResult model."""
+
+    def get_instance(self, **kwargs):
+        defaults = {
+            "audit_class": "UploadWorkspaceSharingAudit",
+            "run_id": uuid.uuid4(),
+            "workspace": WorkspaceFactory.create(),
+            "managed_group": ManagedGroupFactory.create(),
+            "result_type": "ShareAsReader",
+            "status": models.StoredAuditResult.StatusTypes.NEEDS_ACTION,
+            "note": "a note",
+            "action": "Share as reader",
+            "details": {"access": None, "can_compute": None},
+        }
+        defaults.update(kwargs)
+        return models.StoredAuditResult.objects.create(**defaults)
+
+    def test_model_saving(self):
+        """Creation using the model constructor and .save() works."""
+        instance = self.get_instance()
+        self.assertIsInstance(instance, models.StoredAuditResult)
+
+    def test_str_method(self):
+        """The custom __str__ method returns the correct string."""
+        instance = self.get_instance()
+        self.assertIsInstance(instance.__str__(), str)
+        self.assertIn("ShareAsReader", instance.__str__())
+
+    def test_get_table_dictionary(self):
+        instance = self.get_instance()
+        self.assertEqual(
+            instance.get_table_dictionary(),
+            {
+                "workspace": instance.workspace,
+                "managed_group": instance.managed_group,
+                "access": None,
+                "can_compute": None,
+                "note": "a note",
+                "action": "Share as reader",
+            },
+        )
+
+    def test_get_table_dictionary_no_action(self):
+        instance = self.get_instance(action="")
+        self.assertIsNone(instance.get_table_dictionary()["action"])
@@ -8,8 +8,10 @@ from anvil_consortium_manager.tests.factories import (
     WorkspaceFactory,
     WorkspaceGroupSharingFactory,
 )
+from django.db import connection
 from django.db.models import Count, Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .. import models, tables
 from . import factories
@@ -276,6 +278,60 @@ class WorkspaceConsortiumAccessTableTest(TestCase):
         table = tables.WorkspaceConsortiumAccessTable(Workspace.objects.all())
         self.assertIn("question-circle-fill", table.render_consortium_access(workspace))
 
+    def test_annotated_rows(self):
+        """Rows from the table queryset render the same values as un-annotated records."""
+        shared_in_auth_domain = WorkspaceFactory.create(name="a")
+        auth_domain = WorkspaceAuthorizationDomainFactory.create(workspace=shared_in_auth_domain)
+        GroupGroupMembershipFactory.create(parent_group=auth_domain.group, child_group=self.gregor_all)
+        WorkspaceGroupSharingFactory.create(workspace=shared_in_auth_domain, group=auth_domain.group)
+        shared_not_in_auth_domain = WorkspaceFactory.create(name="b")
+        WorkspaceAuthorizationDomainFactory.create(workspace=shared_not_in_auth_domain)
+        WorkspaceGroupSharingFactory.create(workspace=shared_not_in_auth_domain, group=self.gregor_all)
+        not_managed = WorkspaceFactory.create(name="c")
+        auth_domain = WorkspaceAuthorizationDomainFactory.create(workspace=not_managed, group__is_managed_by_app=False)
+        GroupGroupMembershipFactory.create(parent_group=auth_domain.group, child_group=self.gregor_all)
+        WorkspaceGroupSharingFactory.create(workspace=not_managed, group=self.gregor_all)
+        no_auth_domain = WorkspaceFactory.create(name="d")
+        WorkspaceGroupSharingFactory.create(workspace=no_auth_domain, group=self.gregor_all)
+        table = tables.WorkspaceConsortiumAccessTable(Workspace.objects.order_by("name"))
+        values = [str(row.get_cell("consortium_access")) for row in table.rows]
+        self.assertIn("check-circle-fill", values[0])
+        self.assertNotIn("check-circle-fill", values[1])
+        self.assertIn("question-circle-fill", values[2])
+        self.assertIn("check-circle-fill", values[3])
+
+    def test_no_gregor_all_group(self):
+        """The column is empty if the GREGOR_ALL group does not exist."""
+        self.gregor_all.delete()
+        WorkspaceFactory.create()
+        table = tables.WorkspaceConsortiumAccessTable(Workspace.objects.all())
+        self.assertNotIn("check-circle-fill", str(table.rows[0].get_cell("consortium_access")))
+
+    def test_number_of_queries(self):
+        """Rendering the column does not run a query for each row."""
+        auth_domain_group = ManagedGroupFactory.create()
+        GroupGroupMembershipFactory.create(parent_group=auth_domain_group, child_group=self.gregor_all)
+
+        def render_all():
+            table = tables.WorkspaceConsortiumAccessTable(Workspace.objects.all())
+            return [str(row.get_cell("consortium_access")) for row in table.rows]
+
+        def create_workspace():
+            workspace = WorkspaceFactory.create()
+            WorkspaceAuthorizationDomainFactory.create(workspace=workspace, group=auth_domain_group)
+            WorkspaceGroupSharingFactory.create(workspace=workspace, group=self.gregor_all)
+
+        create_workspace()
+        with CaptureQueriesContext(connection) as one_workspace_queries:
+            render_all()
+        for _ in range(4):
+            create_workspace()
+        with self.assertNumQueries(len(one_workspace_queries)):
+            values = render_all()
+        self.assertEqual(len(values), 5)
+        for value in values:
+            self.assertIn("check-circle-fill", value)
+
 
 class DefaultWorkspaceTableTest(TestCase):
     model = Workspace
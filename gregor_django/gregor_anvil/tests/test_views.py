@@ -1,5 +1,7 @@
+import csv
 import json
 from datetime import date, timedelta
+from unittest.mock import patch
 
 import responses
 from anvil_consortium_manager import models as acm_models
@@ -13,9 +15,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.contrib.messages import get_messages
 from django.core.exceptions import PermissionDenied
+from django.db import connection
 from django.http.response import Http404
 from django.shortcuts import resolve_url
 from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
@@ -27,6 +31,7 @@ from .. import adapters, forms, models, tables, views
 from ..audit import (
     combined_workspace_audit,
     dcc_processed_data_workspace_audit,
+    result_store,
     upload_workspace_audit,
     workspace_auth_domain_audit_results,
     workspace_sharing_audit_results,
@@ -38,6 +43,56 @@ from . import factories
 User = get_user_model()
 
 
+class PageQueriesTestMixin:
+    """Mixin for view tests that check the number of queries used to load a page as `self.user`."""
+
+    def get_page_queries(self, url):
+        """Return the queries run to load `url`."""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def assertPageNumQueries(self, num, url):
+        """Assert that loading `url` runs `num` queries and return the response."""
+        self.client.force_login(self.user)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+def create_group_members(obj, n, users_field):
+    """Add `n` users to `obj` through `users_field` of the User model, and `n` accounts to each of its member and
+    uploader groups. All users are also in a second research center, so the research centers column is not trivial."""
+    for user in UserFactory.create_batch(n):
+        getattr(user, users_field).add(obj)
+        user.research_centers.add(factories.ResearchCenterFactory.create())
+    for group in (obj.member_group, obj.uploader_group):
+        for account in acm_factories.AccountFactory.create_batch(n, verified=True):
+            acm_factories.GroupAccountMembershipFactory.create(account=account, group=group)
+            account.user.research_centers.add(factories.ResearchCenterFactory.create())
+
+
+def add_contributing_workspaces(workspace_data, n):
+    """Add `n` contributing workspaces of each type to a combined or release workspace, with the upload workspaces
+    shared with GREGOR_ALL."""
+    group = acm_models.ManagedGroup.objects.filter(name="GREGOR_ALL").first()
+    if group is None:
+        group = acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+    for upload_workspace in factories.UploadWorkspaceFactory.create_batch(n):
+        acm_factories.WorkspaceGroupSharingFactory.create(workspace=upload_workspace.workspace, group=group)
+        workspace_data.contributing_upload_workspaces.add(upload_workspace)
+    workspace_data.contributing_dcc_processed_data_workspaces.add(
+        *factories.DCCProcessedDataWorkspaceFactory.create_batch(n)
+    )
+    workspace_data.contributing_partner_upload_workspaces.add(*factories.PartnerUploadWorkspaceFactory.create_batch(n))
+    workspace_data.contributing_rc_processed_data_workspaces.add(
+        *factories.RCProcessedDataWorkspaceFactory.create_batch(n)
+    )
+
+
 class HomeTest(TestCase):
     """Tests for the home page related to anvil_consortium_manager content."""
 
@@ -225,7 +280,7 @@ class ConsentGroupListTest(TestCase):
         self.assertEqual(len(response.context_data["table"].rows), 2)
 
 
-class ResearchCenterDetailTest(TestCase):
+class ResearchCenterDetailTest(PageQueriesTestMixin, TestCase):
     """Tests for the ResearchCenterDetail view."""
 
     def setUp(self):
@@ -252,6 +307,20 @@ class ResearchCenterDetailTest(TestCase):
         response = self.client.get(self.get_url(1))
         self.assertRedirects(response, resolve_url(settings.LOGIN_URL) + "?next=" + self.get_url(1))
 
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of users and accounts."""
+        # Session, user, two for permissions, the research center, its member and uploader groups, a count and a page
+        # for each of the three tables, the users' research centers, and the announcement text.
+        for n in (1, 5):
+            with self.subTest(n=n):
+                obj = self.model_factory.create(
+                    member_group=acm_factories.ManagedGroupFactory.create(),
+                    uploader_group=acm_factories.ManagedGroupFactory.create(),
+                )
+                create_group_members(obj, n, "research_centers")
+                response = self.assertPageNumQueries(15, self.get_url(obj.pk))
+                self.assertEqual([len(table.rows) for table in response.context_data["tables"]], [n, n, n])
+
     def test_status_code_with_user_permission(self):
         """Returns successful response code."""
         obj = self.model_factory.create()
@@ -459,7 +528,7 @@ class ResearchCenterListTest(TestCase):
         self.assertEqual(len(response.context_data["table"].rows), 2)
 
 
-class PartnerGroupDetailTest(TestCase):
+class PartnerGroupDetailTest(PageQueriesTestMixin, TestCase):
     """Tests for the PartnerGroupDetail view."""
 
     def setUp(self):
@@ -486,6 +555,20 @@ class PartnerGroupDetailTest(TestCase):
         response = self.client.get(self.get_url(1))
         self.assertRedirects(response, resolve_url(settings.LOGIN_URL) + "?next=" + self.get_url(1))
 
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of users and accounts."""
+        # Session, user, two for permissions, the partner group, its member and uploader groups, a count and a page
+        # for each of the three tables, the users' research centers, and the announcement text.
+        for n in (1, 5):
+            with self.subTest(n=n):
+                obj = self.model_factory.create(
+                    member_group=acm_factories.ManagedGroupFactory.create(),
+                    uploader_group=acm_factories.ManagedGroupFactory.create(),
+                )
+                create_group_members(obj, n, "partner_groups")
+                response = self.assertPageNumQueries(15, self.get_url(obj.pk))
+                self.assertEqual([len(table.rows) for table in response.context_data["tables"]], [n, n, n])
+
     def test_status_code_with_user_permission(self):
         """Returns successful response code."""
         obj = self.model_factory.create()
@@ -992,7 +1075,7 @@ class UploadCycleUpdateTest(TestCase):
         self.assertIsNone(obj.date_ready_for_compute)
 
 
-class UploadCycleDetailTest(TestCase):
+class UploadCycleDetailTest(PageQueriesTestMixin, TestCase):
     """Tests for the UploadCycle view."""
 
     def setUp(self):
@@ -1068,6 +1151,35 @@ class UploadCycleDetailTest(TestCase):
         self.assertIsInstance(response.context_data["tables"][5], tables.PartnerUploadWorkspaceTable)
         self.assertIsInstance(response.context_data["tables"][6], tables.RCProcessedDataWorkspaceTable)
 
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of workspaces in the upload cycle."""
+        acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+        # Session, user, two for permissions, the upload cycle, GREGOR_ALL and its parents, a count for each of the
+        # seven tables, a page for each of the five tables shown without staff view permission, and the announcement
+        # text.
+        for n in (1, 3):
+            with self.subTest(n=n):
+                obj = self._create_upload_cycle(n)
+                response = self.assertPageNumQueries(20, self.get_url(obj.cycle))
+                self.assertEqual(len(response.context_data["tables"][0].rows), n)
+                self.assertEqual(len(response.context_data["tables"][5].rows), n)
+
+    def _create_upload_cycle(self, n):
+        """Return an upload cycle with `n` workspaces of each type."""
+        obj = self.model_factory.create()
+        combined_workspace = factories.CombinedConsortiumDataWorkspaceFactory.create(upload_cycle=obj)
+        factories.UploadWorkspaceFactory.create_batch(n, upload_cycle=obj)
+        factories.ReleaseWorkspaceFactory.create_batch(n, upload_cycle=obj)
+        factories.DCCProcessingWorkspaceFactory.create_batch(n, upload_cycle=obj)
+        factories.DCCProcessedDataWorkspaceFactory.create_batch(n, upload_cycle=obj)
+        combined_workspace.contributing_partner_upload_workspaces.add(
+            *factories.PartnerUploadWorkspaceFactory.create_batch(n, date_completed=obj.end_date - timedelta(days=1))
+        )
+        combined_workspace.contributing_rc_processed_data_workspaces.add(
+            *factories.RCProcessedDataWorkspaceFactory.create_batch(n, date_completed=obj.end_date - timedelta(days=1))
+        )
+        return obj
+
     def test_upload_workspace_table(self):
         """Contains a table of UploadWorkspaces from this upload cycle."""
         obj = self.model_factory.create()
@@ -2131,7 +2243,7 @@ class ConsortiumCombinedDataWorkspaceListTest(TestCase):
         self.assertIs(type(response.context_data["table"]), tables.CombinedConsortiumDataWorkspaceTable)
 
 
-class ConsortiumCombinedDataWorkspaceDetailTest(TestCase):
+class ConsortiumCombinedDataWorkspaceDetailTest(PageQueriesTestMixin, TestCase):
     """Tests of the anvil_consortium_manager WorkspaceDetail view using the CombinedConsortiumDataWorkspace adapter."""
 
     def setUp(self):
@@ -2261,6 +2373,30 @@ class ConsortiumCombinedDataWorkspaceDetailTest(TestCase):
             ),
         )
 
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of contributing workspaces."""
+        acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+        url = self.get_url(self.object.workspace.billing_project.name, self.object.workspace.name)
+        # The rest of the page is rendered by anvil_consortium_manager, so compare to the page without any
+        # contributing workspaces; the queries for the contributing workspace tables are pinned below.
+        num_queries = len(self.get_page_queries(url))
+        for n in (1, 5):
+            with self.subTest(n=n):
+                add_contributing_workspaces(self.object, n)
+                self.assertPageNumQueries(num_queries, url)
+
+    def test_number_of_queries_contributing_workspace_tables(self):
+        """The contributing workspace tables are loaded and rendered with a fixed number of queries."""
+        add_contributing_workspaces(self.object, 5)
+        # GREGOR_ALL, its parents, and the contributing workspaces with their related data.
+        with self.assertNumQueries(3):
+            contributing_tables = adapters.get_contributing_workspace_tables(self.object)
+            for table in contributing_tables.values():
+                self.assertEqual(len(table.rows), 5)
+                # Render every cell.
+                for row in table.rows:
+                    list(row)
+
     def test_contributing_workspaces_no_upload(self):
         self.client.force_login(self.user)
         response = self.client.get(self.get_url(self.object.workspace.billing_project.name, self.object.workspace.name))
@@ -3004,7 +3140,7 @@ class ReleaseWorkspaceListTest(TestCase):
         self.assertIs(type(response.context_data["table"]), tables.ReleaseWorkspaceTable)
 
 
-class ReleaseWorkspaceDetailTest(TestCase):
+class ReleaseWorkspaceDetailTest(PageQueriesTestMixin, TestCase):
     """Tests of the anvil_consortium_manager WorkspaceDetail view using the ReleaseWorkspaceAdapter."""
 
     def setUp(self):
@@ -3027,6 +3163,30 @@ class ReleaseWorkspaceDetailTest(TestCase):
         response = self.client.get(self.get_url(self.object.workspace.billing_project.name, self.object.workspace.name))
         self.assertEqual(response.status_code, 200)
 
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of contributing workspaces."""
+        acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+        url = self.get_url(self.object.workspace.billing_project.name, self.object.workspace.name)
+        # The rest of the page is rendered by anvil_consortium_manager, so compare to the page without any
+        # contributing workspaces; the queries for the contributing workspace tables are pinned below.
+        num_queries = len(self.get_page_queries(url))
+        for n in (1, 5):
+            with self.subTest(n=n):
+                add_contributing_workspaces(self.object, n)
+                self.assertPageNumQueries(num_queries, url)
+
+    def test_number_of_queries_contributing_workspace_tables(self):
+        """The contributing workspace tables are loaded and rendered with a fixed number of queries."""
+        add_contributing_workspaces(self.object, 5)
+        # GREGOR_ALL, its parents, and the contributing workspaces with their related data.
+        with self.assertNumQueries(3):
+            contributing_tables = adapters.get_contributing_workspace_tables(self.object)
+            for table in contributing_tables.values():
+                self.assertEqual(len(table.rows), 5)
+                # Render every cell.
+                for row in table.rows:
+                    list(row)
+
     def test_contributing_workspaces_no_upload(self):
         self.client.force_login(self.user)
         response = self.client.get(self.get_url(self.object.workspace.billing_project.name, self.object.workspace.name))
@@ -3836,7 +3996,7 @@ class ReleaseWorkspaceUpdateContributingWorkspacesTest(TestCase):
         self.assertEqual(len(form.initial["contributing_rc_processed_data_workspaces"]), 0)
 
 
-class WorkspaceReportTest(TestCase):
+class WorkspaceReportTest(PageQueriesTestMixin, TestCase):
     def setUp(self):
         """Set up test class."""
         self.factory = RequestFactory()
@@ -3996,6 +4156,48 @@ class WorkspaceReportTest(TestCase):
         self.assertTrue("verified_linked_accounts" in response.context_data)
         self.assertEqual(response.context_data["verified_linked_accounts"], 1)
 
+    def test_workspace_count_table_sharing_deleted(self):
+        """Workspace table is updated when a workspace is no longer shared with the consortium."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        group = acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+        sharing = acm_factories.WorkspaceGroupSharingFactory.create(workspace=upload_workspace.workspace, group=group)
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url())
+        table = response.context_data["workspace_count_table"]
+        self.assertIn({"workspace_type": "upload", "n_total": 1, "n_shared": 1}, table.data)
+        # The summary is refreshed once the change is committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            sharing.delete()
+        response = self.client.get(self.get_url())
+        table = response.context_data["workspace_count_table"]
+        self.assertIn({"workspace_type": "upload", "n_total": 1, "n_shared": 0}, table.data)
+
+    def test_verified_linked_accounts_updated(self):
+        """The number of verified linked accounts is refreshed once a new account is committed."""
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.context_data["verified_linked_accounts"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            acm_factories.AccountFactory.create(user=self.user, verified=True)
+        response = self.client.get(self.get_url())
+        self.assertEqual(response.context_data["verified_linked_accounts"], 1)
+
+    def test_number_of_queries(self):
+        """The number of queries does not depend on the number of workspaces."""
+        group = acm_factories.ManagedGroupFactory.create(name="GREGOR_ALL")
+        # Session, user, two for permissions, the summary, and the announcement text.
+        for n in (1, 5):
+            with self.subTest(n=n):
+                # Keep the summary up to date, as the signals do after each commit.
+                with self.captureOnCommitCallbacks(execute=True):
+                    for upload_workspace in factories.UploadWorkspaceFactory.create_batch(n):
+                        acm_factories.WorkspaceGroupSharingFactory.create(
+                            workspace=upload_workspace.workspace, group=group
+                        )
+                    factories.CombinedConsortiumDataWorkspaceFactory.create_batch(n)
+                    acm_factories.AccountFactory.create_batch(n, verified=True)
+                self.assertPageNumQueries(6, self.get_url())
+
 
 class DCCProcessingWorkspaceListTest(TestCase):
     """Tests of the anvil_consortium_manager WorkspaceList view using this app's adapter."""
@@ -4848,6 +5050,135 @@ class UploadWorkspaceSharingAuditTest(AnVILAPIMockTestMixin, TestCase):
         self.assertIn(upload_workspace_1, audit_results.queryset)
         self.assertIn(upload_workspace_2, audit_results.queryset)
 
+    def test_results_are_stored(self):
+        """Audit results are stored when the audit is run."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url())
+        audit_results = response.context_data["audit_results"]
+        stored_results = models.StoredAuditResult.objects.filter(audit_class="UploadWorkspaceSharingAudit")
+        self.assertEqual(stored_results.count(), len(audit_results.get_all_results()))
+        self.assertEqual(stored_results.first().workspace, upload_workspace.workspace)
+
+    def test_context_audit_results_stored(self):
+        """The audit_results are loaded from the stored results if they exist."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url())
+        audit_results = response.context_data["audit_results"]
+        self.assertIsInstance(audit_results, result_store.StoredAudit)
+        self.assertIsNotNone(audit_results.date_run)
+        self.assertIn(upload_workspace, audit_results.queryset)
+        self.assertEqual(response.context_data["result_counts"], audit.get_result_counts())
+        self.assertEqual(len(response.context_data["needs_action_table"].rows), len(audit.needs_action))
+
+    def test_post_reruns_audit(self):
+        """Posting to the view re-runs the audit and replaces the stored results."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        auth_domain = upload_workspace.workspace.authorization_domains.first()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        acm_factories.WorkspaceGroupSharingFactory.create(
+            workspace=upload_workspace.workspace, group=auth_domain, access=acm_models.WorkspaceGroupSharing.READER
+        )
+        self.client.force_login(self.user)
+        response = self.client.post(self.get_url())
+        self.assertRedirects(response, self.get_url())
+        stored_result = models.StoredAuditResult.objects.get(managed_group=auth_domain)
+        self.assertEqual(stored_result.status, models.StoredAuditResult.StatusTypes.VERIFIED)
+
+    def test_results_tables_loaded_separately(self):
+        """The page does not render the results tables, which are loaded by htmx."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url())
+        audit_results = response.context_data["audit_results"]
+        self.assertEqual(response.context_data["result_counts"]["needs_action"], len(audit_results.needs_action))
+        self.assertContains(response, 'hx-get="{}?table=needs_action"'.format(self.get_url()))
+        self.assertNotContains(response, upload_workspace.workspace.get_absolute_url())
+
+    def test_results_table(self):
+        """A request with the table parameter renders one page of the stored results with that status."""
+        upload_workspaces = factories.UploadWorkspaceFactory.create_batch(6)
+        self.client.force_login(self.user)
+        self.client.get(self.get_url())
+        stored_results = models.StoredAuditResult.objects.filter(
+            status=models.StoredAuditResult.StatusTypes.NEEDS_ACTION
+        )
+        with patch.object(views.UploadWorkspaceSharingAudit, "results_table_per_page", 5):
+            response = self.client.get(self.get_url(), {"table": "needs_action"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "gregor_anvil/snippets/audit_results_table.html")
+        table = response.context["table"]
+        self.assertIsInstance(table, upload_workspace_audit.UploadWorkspaceSharingAuditTable)
+        self.assertEqual(len(table.rows), stored_results.count())
+        self.assertEqual(len(table.page.object_list), 5)
+        first_workspace = min((x.workspace for x in upload_workspaces), key=lambda x: x.name)
+        self.assertEqual(table.page.object_list[0].get_cell_value("workspace"), first_workspace)
+        self.assertContains(response, "?table=needs_action&amp;page=2")
+
+    def test_results_table_sorted(self):
+        """The results table is sorted in the database."""
+        upload_workspaces = factories.UploadWorkspaceFactory.create_batch(2)
+        self.client.force_login(self.user)
+        self.client.get(self.get_url())
+        response = self.client.get(self.get_url(), {"table": "needs_action", "sort": "-workspace"})
+        table = response.context["table"]
+        last_workspace = max((x.workspace for x in upload_workspaces), key=lambda x: x.name)
+        self.assertEqual(table.page.object_list[0].get_cell_value("workspace"), last_workspace)
+
+    def test_results_table_unknown(self):
+        """Returns a 404 for an unknown results table."""
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url(), {"table": "foo"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_csv(self):
+        """All stored results can be exported as CSV."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url(), {"export": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="UploadWorkspaceSharingAudit.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), len(audit.get_all_results()))
+        self.assertEqual(rows[0]["audit"], "UploadWorkspaceSharingAudit")
+        self.assertEqual(rows[0]["workspace"], str(upload_workspace.workspace))
+        self.assertEqual(
+            sorted(x["status"] for x in rows),
+            sorted(["verified"] * len(audit.verified) + ["needs_action"] * len(audit.needs_action)),
+        )
+
+    def test_export_jsonl(self):
+        """All stored results can be exported as JSON Lines."""
+        upload_workspace = factories.UploadWorkspaceFactory.create()
+        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url(), {"export": "jsonl"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/jsonl")
+        rows = [json.loads(x) for x in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), len(audit.get_all_results()))
+        self.assertEqual(rows[0]["workspace"], str(upload_workspace.workspace))
+        self.assertIn("managed_group", rows[0])
+
+    def test_export_unknown_format(self):
+        """Returns a 404 for an unknown export format."""
+        self.client.force_login(self.user)
+        response = self.client.get(self.get_url(), {"export": "xml"})
+        self.assertEqual(response.status_code, 404)
+
     def test_context_verified_table_access(self):
         """verified_table shows a record when audit has verified access."""
         upload_workspace = factories.UploadWorkspaceFactory.create()
@@ -6911,6 +7242,129 @@ class UploadWorkspaceSharingAuditResolveTest(AnVILAPIMockTestMixin, TestCase):
         self.assertEqual(len(messages), 0)
 
 
+class UploadWorkspaceSharingAuditBulkResolveTest(AnVILAPIMockTestMixin, TestCase):
+    """Tests for the UploadWorkspaceSharingAuditBulkResolve view."""
+
+    def setUp(self):
+        """Set up test class."""
+        super().setUp()
+        self.factory = RequestFactory()
+        # Create a user with both view and edit permission.
+        self.user = User.objects.create_user(username="test", password="test")
+        self.user.user_permissions.add(
+            Permission.objects.get(codename=AnVILProjectManagerAccess.STAFF_VIEW_PERMISSION_CODENAME)
+        )
+        self.user.user_permissions.add(
+            Permission.objects.get(codename=AnVILProjectManagerAccess.STAFF_EDIT_PERMISSION_CODENAME)
+        )
+
+    def get_url(self, *args):
+        """Get the url for the view being tested."""
+        return reverse(
+            "gregor_anvil:audit:upload_workspaces:sharing:resolve_all",
+            args=args,
+        )
+
+    def get_view(self):
+        """Return the view being tested."""
+        return views.UploadWorkspaceSharingAuditBulkResolve.as_view()
+
+    def add_acl_response(self, workspace_name, group, status=200):
+        acls = [
+            {
+                "email": group.email,
+                "accessLevel": "READER",
+                "canShare": False,
+                "canCompute": False,
+            }
+        ]
+        if status == 200:
+            json = {"invitesSent": {}, "usersNotFound": {}, "usersUpdated": acls}
+        else:
+            json = ErrorResponseFactory().response
+        self.anvil_response_mock.add(
+            responses.PATCH,
+            self.api_client.rawls_entry_point
+            + "/api/workspaces/test-bp/{}/acl?inviteUsersNotFound=false".format(workspace_name),
+            status=status,
+            match=[responses.matchers.json_params_matcher(acls)],
+            json=json,
+        )
+
+    def test_view_redirect_not_logged_in(self):
+        "View redirects to login view when user is not logged in."
+        response = self.client.post(self.get_url())
+        self.assertRedirects(
+            response,
+            resolve_url(settings.LOGIN_URL) + "?next=" + self.get_url(),
+        )
+
+    def test_status_code_with_user_permission_staff_view(self):
+        """Raises permission denied if the user has staff view permission."""
+        user_view = User.objects.create_user(username="test-view", password="test-view")
+        user_view.user_permissions.add(
+            Permission.objects.get(codename=AnVILProjectManagerAccess.STAFF_VIEW_PERMISSION_CODENAME)
+        )
+        request = self.factory.post(self.get_url())
+        request.user = user_view
+        with self.assertRaises(PermissionDenied):
+            self.get_view()(request)
+
+    def test_post_no_results(self):
+        self.client.force_login(self.user)
+        response = self.client.post(self.get_url())
+        self.assertRedirects(response, reverse("gregor_anvil:audit:upload_workspaces:sharing:all"))
+
+    def test_post_two_workspaces(self):
+        upload_workspace_1 = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="test-ws-1"
+        )
+        upload_workspace_2 = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="test-ws-2"
+        )
+        group_1 = upload_workspace_1.workspace.authorization_domains.first()
+        group_2 = upload_workspace_2.workspace.authorization_domains.first()
+        self.add_acl_response("test-ws-1", group_1)
+        self.add_acl_response("test-ws-2", group_2)
+        self.client.force_login(self.user)
+        response = self.client.post(self.get_url())
+        self.assertRedirects(response, reverse("gregor_anvil:audit:upload_workspaces:sharing:all"))
+        self.assertEqual(acm_models.WorkspaceGroupSharing.objects.count(), 2)
+        sharing = acm_models.WorkspaceGroupSharing.objects.get(workspace=upload_workspace_1.workspace, group=group_1)
+        self.assertEqual(sharing.access, acm_models.WorkspaceGroupSharing.READER)
+        sharing = acm_models.WorkspaceGroupSharing.objects.get(workspace=upload_workspace_2.workspace, group=group_2)
+        self.assertEqual(sharing.access, acm_models.WorkspaceGroupSharing.READER)
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertIn("Handled 2 audit results.", messages)
+
+    def test_post_htmx_one_error(self):
+        """Each result is reported with the htmx success or error response."""
+        upload_workspace_1 = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="test-ws-1"
+        )
+        upload_workspace_2 = factories.UploadWorkspaceFactory.create(
+            workspace__billing_project__name="test-bp", workspace__name="test-ws-2"
+        )
+        group_1 = upload_workspace_1.workspace.authorization_domains.first()
+        group_2 = upload_workspace_2.workspace.authorization_domains.first()
+        self.add_acl_response("test-ws-1", group_1, status=400)
+        self.add_acl_response("test-ws-2", group_2)
+        self.client.force_login(self.user)
+        header = {"HTTP_HX-Request": "true"}
+        response = self.client.post(self.get_url(), **header)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, views.UploadWorkspaceSharingAuditBulkResolve.htmx_success, count=1)
+        self.assertContains(response, views.UploadWorkspaceSharingAuditBulkResolve.htmx_error, count=1)
+        self.assertEqual(acm_models.WorkspaceGroupSharing.objects.count(), 1)
+        self.assertEqual(acm_models.WorkspaceGroupSharing.objects.get().workspace, upload_workspace_2.workspace)
+
+    def test_audit_page_links_to_bulk_resolve(self):
+        factories.UploadWorkspaceFactory.create()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("gregor_anvil:audit:upload_workspaces:sharing:all"))
+        self.assertContains(response, self.get_url())
+
+
 class UploadWorkspaceAuthDomainAuditTest(AnVILAPIMockTestMixin, TestCase):
     """Tests for the UploadWorkspaceSharingAudit view."""
 
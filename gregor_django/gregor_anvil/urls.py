@@ -90,6 +90,7 @@ combined_consortium_data_workspace_patterns = (
 upload_workspace_sharing_audit_patterns = (
     [
         path("all/", views.UploadWorkspaceSharingAudit.as_view(), name="all"),
+        path("resolve/all/", views.UploadWorkspaceSharingAuditBulkResolve.as_view(), name="resolve_all"),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.UploadWorkspaceSharingAuditResolve.as_view(),
@@ -112,6 +113,7 @@ upload_workspace_sharing_audit_patterns = (
 upload_workspace_auth_domain_audit_patterns = (
     [
         path("all/", views.UploadWorkspaceAuthDomainAudit.as_view(), name="all"),
+        path("resolve/all/", views.UploadWorkspaceAuthDomainAuditBulkResolve.as_view(), name="resolve_all"),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.UploadWorkspaceAuthDomainAuditResolve.as_view(),
@@ -142,6 +144,9 @@ upload_workspace_audit_patterns = (
 combined_workspace_sharing_audit_patterns = (
     [
         path("all/", views.CombinedConsortiumDataWorkspaceSharingAudit.as_view(), name="all"),
+        path(
+            "resolve/all/", views.CombinedConsortiumDataWorkspaceSharingAuditBulkResolve.as_view(), name="resolve_all"
+        ),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.CombinedConsortiumDataWorkspaceSharingAuditResolve.as_view(),
@@ -159,6 +164,11 @@ combined_workspace_sharing_audit_patterns = (
 combined_workspace_auth_domain_audit_patterns = (
     [
         path("all/", views.CombinedConsortiumDataWorkspaceAuthDomainAudit.as_view(), name="all"),
+        path(
+            "resolve/all/",
+            views.CombinedConsortiumDataWorkspaceAuthDomainAuditBulkResolve.as_view(),
+            name="resolve_all",
+        ),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.CombinedConsortiumDataWorkspaceAuthDomainAuditResolve.as_view(),
@@ -184,6 +194,7 @@ combined_workspace_audit_patterns = (
 dcc_processed_data_workspace_sharing_audit_patterns = (
     [
         path("all/", views.DCCProcessedDataWorkspaceSharingAudit.as_view(), name="all"),
+        path("resolve/all/", views.DCCProcessedDataWorkspaceSharingAuditBulkResolve.as_view(), name="resolve_all"),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.DCCProcessedDataWorkspaceSharingAuditResolve.as_view(),
@@ -206,6 +217,7 @@ dcc_processed_data_workspace_sharing_audit_patterns = (
 dcc_processed_data_workspace_auth_domain_audit_patterns = (
     [
         path("all/", views.DCCProcessedDataWorkspaceAuthDomainAudit.as_view(), name="all"),
+        path("resolve/all/", views.DCCProcessedDataWorkspaceAuthDomainAuditBulkResolve.as_view(), name="resolve_all"),
         path(
             "resolve/<slug:billing_project_slug>/<slug:workspace_slug>/<slug:managed_group_slug>/",
             views.DCCProcessedDataWorkspaceAuthDomainAuditResolve.as_view(),
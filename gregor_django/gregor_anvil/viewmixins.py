@@ -3,28 +3,148 @@ from anvil_consortium_manager.exceptions import AnVILGroupNotFound
 from anvil_consortium_manager.models import (
     ManagedGroup,
 )
+from django.conf import settings
 from django.contrib import messages
 from django.db import transaction
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.views.generic.detail import SingleObjectMixin
+from django_tables2 import RequestConfig
+
+from .audit import bulk_resolve, export, result_store
+from .models import StoredAuditResult
 
 
 class AuditMixin:
-    """Mixin to assist with auditing views."""
+    """Mixin to assist with auditing views.
+
+    Results are rendered from the most recently stored audit run for the audited workspaces. The audit is only run
+    if no results have been stored yet, or when the "re-run now" form is submitted.
+
+    The page itself only shows the number of results of each type. Each results table is loaded separately by htmx,
+    from the same url with a `table` query parameter set to the result status, and is paginated and sorted in the
+    database. All results can be downloaded from the same url with an `export` query parameter set to "csv" or
+    "jsonl"."""
+
+    results_table_template_name = "gregor_anvil/snippets/audit_results_table.html"
+    results_table_per_page = 25
+
+    def get_audit(self):
+        raise NotImplementedError("AuditMixin.get_audit() must be implemented in a subclass")
 
     def run_audit(self):
-        raise NotImplementedError("AuditMixin.run_audit() must be implemented in a subclass")
+        """Run the audit, store its results, and return it."""
+        audit = self.get_audit()
+        audit.run_audit()
+        result_store.save_audit_results(audit)
+        return audit
+
+    def get_audit_results(self):
+        """Return a summary of the stored results for the audit, or run the audit if no results have been stored."""
+        audit_results = result_store.StoredAudit(self.get_audit())
+        audit_results.load_summary()
+        if audit_results.date_run is None:
+            audit_results = self.run_audit()
+        return audit_results
+
+    def get(self, request, *args, **kwargs):
+        status = request.GET.get("table")
+        export_format = request.GET.get("export")
+        if status is None and export_format is None:
+            return super().get(request, *args, **kwargs)
+        if isinstance(self, SingleObjectMixin):
+            self.object = self.get_object()
+        if export_format is not None:
+            return self.render_export(export_format)
+        return self.render_results_table(status)
+
+    def render_results_table(self, status):
+        """Render one page of the stored results with the given status."""
+        if status not in StoredAuditResult.StatusTypes.values:
+            raise Http404("Unknown audit results table.")
+        table = result_store.StoredAudit(self.get_audit()).get_results_table(status)
+        # Only the header and pagination links load the table again; links and forms in rows behave as usual.
+        table.attrs["tbody"]["hx-boost"] = "false"
+        RequestConfig(self.request, paginate={"per_page": self.results_table_per_page}).configure(table)
+        return render(self.request, self.results_table_template_name, {"table": table})
+
+    def render_export(self, export_format):
+        """Stream all results for the audit, one row at a time, in the given export format."""
+        if export_format not in export.EXPORT_FORMATS:
+            raise Http404("Unknown export format.")
+        audit_results = self.get_audit_results()
+        response = StreamingHttpResponse(
+            export.export_results(audit_results, export_format),
+            content_type=export.EXPORT_FORMATS[export_format],
+        )
+        response["Content-Disposition"] = 'attachment; filename="{}.{}"'.format(
+            export.get_audit_name(audit_results), export_format
+        )
+        return response
 
     def get_context_data(self, **kwargs):
-        """Run the audit and add it to the context."""
+        """Add the audit results to the context."""
         context = super().get_context_data(**kwargs)
-        # Run the audit.
-        audit_results = self.run_audit()
+        audit_results = self.get_audit_results()
         context["verified_table"] = audit_results.get_verified_table()
         context["errors_table"] = audit_results.get_errors_table()
         context["needs_action_table"] = audit_results.get_needs_action_table()
         context["audit_results"] = audit_results
+        context["result_counts"] = audit_results.get_result_counts()
         return context
 
+    def post(self, request, *args, **kwargs):
+        """Re-run the audit now and redirect back to the results."""
+        if isinstance(self, SingleObjectMixin):
+            self.object = self.get_object()
+        self.run_audit()
+        messages.success(self.request, "Audit re-run successfully.")
+        return HttpResponseRedirect(self.request.get_full_path())
+
+
+class AuditBulkResolveMixin:
+    """Mixin to resolve all "needs action" results of an audit at once.
+
+    AnVIL API calls are made concurrently, using up to `settings.GREGOR_AUDIT_RESOLVE_MAX_WORKERS` threads. htmx
+    requests get back the `htmx_success` or `htmx_error` response for each result; other requests are redirected to
+    the success url with a summary message."""
+
+    results_template_name = "gregor_anvil/snippets/audit_bulk_resolve_results.html"
+    htmx_success = """<i class="bi bi-check-circle-fill"></i> Handled!"""
+    htmx_error = """<i class="bi bi-x-circle-fill"></i> Error!"""
+
+    def get_audit(self):
+        raise NotImplementedError("AuditBulkResolveMixin.get_audit() must be implemented in a subclass")
+
+    def get_success_url(self):
+        raise NotImplementedError("AuditBulkResolveMixin.get_success_url() must be implemented in a subclass")
+
+    def post(self, request, *args, **kwargs):
+        audit = self.get_audit()
+        audit.run_audit()
+        resolved_results = bulk_resolve.resolve_audit_results(
+            bulk_resolve.get_resolvable_results(audit),
+            max_workers=settings.GREGOR_AUDIT_RESOLVE_MAX_WORKERS,
+            # Do not block the request while waiting to retry; failed results are shown and can be resolved again.
+            max_retries=0,
+        )
+        if self.request.htmx:
+            html = render_to_string(
+                self.results_template_name,
+                context={
+                    "resolved_results": resolved_results,
+                    "htmx_success": self.htmx_success,
+                    "htmx_error": self.htmx_error,
+                },
+            )
+            return HttpResponse(html)
+        n_errors = len([x for x in resolved_results if not x.ok])
+        messages.success(self.request, "Handled {} audit results.".format(len(resolved_results) - n_errors))
+        if n_errors:
+            messages.error(self.request, "AnVIL API Error: could not handle {} audit results.".format(n_errors))
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class AuditResolveMixin:
     """Mixin to assist with audit resolution views."""
@@ -9,16 +9,16 @@ from anvil_consortium_manager.models import (
 )
 from django.contrib.auth import get_user_model
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Count, Q
 from django.forms import Form
 from django.http import Http404
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import CreateView, DetailView, FormView, TemplateView, UpdateView
+from django.views.generic import CreateView, DetailView, FormView, TemplateView, UpdateView, View
 from django_tables2 import MultiTableMixin, SingleTableView
 
 from gregor_django.users.tables import UserTable
 
-from . import forms, models, tables, viewmixins
+from . import forms, models, tables, viewmixins, workspace_report
 from .audit import (
     combined_workspace_audit,
     dcc_processed_data_workspace_audit,
@@ -60,7 +60,9 @@ class ResearchCenterDetail(AnVILConsortiumManagerStaffViewRequired, MultiTableMi
                 groupaccountmembership__group=self.object.uploader_group,
             )
         return [
-            UserTable(User.objects.filter(is_active=True, research_centers=self.object)),
+            UserTable(
+                User.objects.filter(is_active=True, research_centers=self.object).prefetch_related("research_centers")
+            ),
             tables.AccountTable(members, exclude=("user__research_centers", "number_groups")),
             tables.AccountTable(uploaders, exclude=("user__research_centers", "number_groups")),
         ]
@@ -92,7 +94,9 @@ class PartnerGroupDetail(AnVILConsortiumManagerStaffViewRequired, MultiTableMixi
                 groupaccountmembership__group=self.object.uploader_group,
             )
         return [
-            UserTable(User.objects.filter(is_active=True, partner_groups=self.object)),
+            UserTable(
+                User.objects.filter(is_active=True, partner_groups=self.object).prefetch_related("research_centers")
+            ),
             tables.AccountTable(members, exclude=("user__research_centers", "number_groups")),
             tables.AccountTable(uploaders, exclude=("user__research_centers", "number_groups")),
         ]
@@ -138,27 +142,50 @@ class UploadCycleDetail(AnVILConsortiumManagerViewRequired, MultiTableMixin, Det
     ]
 
     def get_tables_data(self):
-        upload_workspace_qs = Workspace.objects.filter(uploadworkspace__upload_cycle=self.object)
-        combined_workspace_qs = Workspace.objects.filter(combinedconsortiumdataworkspace__upload_cycle=self.object)
-        release_workspace_qs = Workspace.objects.filter(releaseworkspace__upload_cycle=self.object)
-        dcc_processing_workspace_qs = Workspace.objects.filter(
-            dccprocessingworkspace__upload_cycle=self.object,
+        # Load the type-specific data and billing project for each workspace along with the workspace.
+        workspaces = Workspace.objects.select_related("billing_project")
+        upload_workspace_qs = workspaces.filter(uploadworkspace__upload_cycle=self.object).select_related(
+            "uploadworkspace__upload_cycle",
+            "uploadworkspace__research_center",
+            "uploadworkspace__consent_group",
+        )
+        combined_workspace_qs = workspaces.filter(
+            combinedconsortiumdataworkspace__upload_cycle=self.object
+        ).select_related(
+            "combinedconsortiumdataworkspace__upload_cycle",
+        )
+        release_workspace_qs = workspaces.filter(releaseworkspace__upload_cycle=self.object).select_related(
+            "releaseworkspace__upload_cycle",
+            "releaseworkspace__consent_group",
         )
-        dcc_processed_data_workspace_qs = Workspace.objects.filter(
+        dcc_processing_workspace_qs = workspaces.filter(
+            dccprocessingworkspace__upload_cycle=self.object,
+        ).select_related("dccprocessingworkspace__upload_cycle")
+        dcc_processed_data_workspace_qs = workspaces.filter(
             dccprocesseddataworkspace__upload_cycle=self.object,
+        ).select_related(
+            "dccprocesseddataworkspace__upload_cycle",
+            "dccprocesseddataworkspace__consent_group",
         )
-        # Select PartnerUpload and RCProcessedData workspaces based on whether they are part of the combined workspace.
-        if combined_workspace_qs.exists():
-            combined_workspace = combined_workspace_qs.get().combinedconsortiumdataworkspace
-            partner_workspace_qs = Workspace.objects.filter(
-                partneruploadworkspace__combined_workspaces=combined_workspace
+        # Select PartnerUpload and RCProcessedData workspaces based on whether they are part of a combined workspace
+        # for this upload cycle.
+        partner_workspace_qs = (
+            workspaces.filter(partneruploadworkspace__combined_workspaces__upload_cycle=self.object)
+            .select_related(
+                "partneruploadworkspace__partner_group",
+                "partneruploadworkspace__consent_group",
             )
-            rc_processed_data_workspace_qs = Workspace.objects.filter(
-                rcprocesseddataworkspace__combined_workspaces=combined_workspace,
+            .distinct()
+        )
+        rc_processed_data_workspace_qs = (
+            workspaces.filter(rcprocesseddataworkspace__combined_workspaces__upload_cycle=self.object)
+            .select_related(
+                "rcprocesseddataworkspace__research_center",
+                "rcprocesseddataworkspace__consent_group",
+                "rcprocesseddataworkspace__upload_cycle",
             )
-        else:
-            partner_workspace_qs = Workspace.objects.none()
-            rc_processed_data_workspace_qs = Workspace.objects.none()
+            .distinct()
+        )
 
         return [
             upload_workspace_qs,
@@ -170,6 +197,16 @@ class UploadCycleDetail(AnVILConsortiumManagerViewRequired, MultiTableMixin, Det
             rc_processed_data_workspace_qs,
         ]
 
+    def get_tables(self):
+        # Look up GREGOR_ALL and its parent groups once for all tables with a consortium access column.
+        consortium_groups = tables.WorkspaceConsortiumAccessTable.get_consortium_groups()
+        return [
+            table_class(data, consortium_groups=consortium_groups)
+            if issubclass(table_class, tables.WorkspaceConsortiumAccessTable)
+            else table_class(data)
+            for table_class, data in zip(self.tables, self.get_tables_data())
+        ]
+
 
 class UploadCycleList(AnVILConsortiumManagerViewRequired, SingleTableView):
     """View to show a list of `UploadCycle` objects."""
@@ -185,17 +222,14 @@ class WorkspaceReport(AnVILConsortiumManagerStaffViewRequired, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["verified_linked_accounts"] = Account.objects.filter(
-            verified_email_entry__date_verified__isnull=False
-        ).count()
-        qs = Workspace.objects.values("workspace_type").annotate(
-            n_total=Count("pk", distinct=True),
-            n_shared=Count(
-                "workspacegroupsharing",
-                filter=Q(workspacegroupsharing__group__name="GREGOR_ALL"),
-            ),
-        )
-        context["workspace_count_table"] = tables.WorkspaceReportTable(qs)
+        # Counts are precomputed and kept up to date by signals.
+        summary = workspace_report.get_summary()
+        context["verified_linked_accounts"] = summary.verified_linked_accounts
+        rows = [
+            {"workspace_type": workspace_type, **counts}
+            for workspace_type, counts in sorted(summary.workspace_counts.items())
+        ]
+        context["workspace_count_table"] = tables.WorkspaceReportTable(rows)
         return context
 
 
@@ -204,10 +238,25 @@ class UploadWorkspaceSharingAudit(AnVILConsortiumManagerStaffViewRequired, viewm
 
     template_name = "gregor_anvil/upload_workspace_sharing_audit.html"
 
-    def run_audit(self, **kwargs):
-        audit = upload_workspace_audit.UploadWorkspaceSharingAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceSharingAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse("gregor_anvil:audit:upload_workspaces:sharing:resolve_all")
+        return context
+
+
+class UploadWorkspaceSharingAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all UploadWorkspace sharing audit results that need action."""
+
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceSharingAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:upload_workspaces:sharing:all")
 
 
 class UploadWorkspaceSharingAuditByWorkspace(
@@ -236,12 +285,8 @@ class UploadWorkspaceSharingAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        audit = upload_workspace_audit.UploadWorkspaceSharingAudit(
-            queryset=self.model.objects.filter(pk=self.object.pk)
-        )
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceSharingAudit(queryset=self.model.objects.filter(pk=self.object.pk))
 
 
 class UploadWorkspaceSharingAuditByUploadCycle(
@@ -266,13 +311,10 @@ class UploadWorkspaceSharingAuditByUploadCycle(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        # Run the audit.
-        audit = upload_workspace_audit.UploadWorkspaceSharingAudit(
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceSharingAudit(
             queryset=models.UploadWorkspace.objects.filter(upload_cycle=self.object)
         )
-        audit.run_audit()
-        return audit
 
 
 class UploadWorkspaceSharingAuditResolve(
@@ -317,10 +359,25 @@ class UploadWorkspaceAuthDomainAudit(AnVILConsortiumManagerStaffViewRequired, vi
 
     template_name = "gregor_anvil/upload_workspace_auth_domain_audit.html"
 
-    def run_audit(self):
-        audit = upload_workspace_audit.UploadWorkspaceAuthDomainAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceAuthDomainAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse("gregor_anvil:audit:upload_workspaces:auth_domains:resolve_all")
+        return context
+
+
+class UploadWorkspaceAuthDomainAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all UploadWorkspace auth domain audit results that need action."""
+
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceAuthDomainAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:upload_workspaces:auth_domains:all")
 
 
 class UploadWorkspaceAuthDomainAuditByWorkspace(
@@ -349,12 +406,10 @@ class UploadWorkspaceAuthDomainAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self):
-        audit = upload_workspace_audit.UploadWorkspaceAuthDomainAudit(
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceAuthDomainAudit(
             queryset=self.model.objects.filter(pk=self.object.pk)
         )
-        audit.run_audit()
-        return audit
 
 
 class UploadWorkspaceAuthDomainAuditByUploadCycle(
@@ -379,12 +434,10 @@ class UploadWorkspaceAuthDomainAuditByUploadCycle(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        audit = upload_workspace_audit.UploadWorkspaceAuthDomainAudit(
+    def get_audit(self):
+        return upload_workspace_audit.UploadWorkspaceAuthDomainAudit(
             queryset=models.UploadWorkspace.objects.filter(upload_cycle=self.object)
         )
-        audit.run_audit()
-        return audit
 
 
 class UploadWorkspaceAuthDomainAuditResolve(
@@ -431,10 +484,25 @@ class CombinedConsortiumDataWorkspaceSharingAudit(
 
     template_name = "gregor_anvil/combinedconsortiumdataworkspace_sharing_audit.html"
 
-    def run_audit(self, **kwargs):
-        audit = combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse("gregor_anvil:audit:combined_workspaces:sharing:resolve_all")
+        return context
+
+
+class CombinedConsortiumDataWorkspaceSharingAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all CombinedConsortiumDataWorkspace sharing audit results that need action."""
+
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:combined_workspaces:sharing:all")
 
 
 class CombinedConsortiumDataWorkspaceSharingAuditByWorkspace(
@@ -463,12 +531,10 @@ class CombinedConsortiumDataWorkspaceSharingAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        audit = combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit(
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceSharingAudit(
             queryset=self.model.objects.filter(pk=self.object.pk)
         )
-        audit.run_audit()
-        return audit
 
 
 class CombinedConsortiumDataWorkspaceSharingAuditResolve(
@@ -515,10 +581,25 @@ class CombinedConsortiumDataWorkspaceAuthDomainAudit(
 
     template_name = "gregor_anvil/combinedconsortiumdataworkspace_auth_domain_audit.html"
 
-    def run_audit(self, **kwargs):
-        audit = combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse("gregor_anvil:audit:combined_workspaces:auth_domains:resolve_all")
+        return context
+
+
+class CombinedConsortiumDataWorkspaceAuthDomainAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all CombinedConsortiumDataWorkspace auth domain audit results that need action."""
+
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:combined_workspaces:auth_domains:all")
 
 
 class CombinedConsortiumDataWorkspaceAuthDomainAuditByWorkspace(
@@ -547,13 +628,10 @@ class CombinedConsortiumDataWorkspaceAuthDomainAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        # Run the audit.
-        audit = combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit(
+    def get_audit(self):
+        return combined_workspace_audit.CombinedConsortiumDataWorkspaceAuthDomainAudit(
             queryset=self.model.objects.filter(pk=self.object.pk)
         )
-        audit.run_audit()
-        return audit
 
 
 class CombinedConsortiumDataWorkspaceAuthDomainAuditResolve(
@@ -659,10 +737,25 @@ class DCCProcessedDataWorkspaceSharingAudit(
 
     template_name = "gregor_anvil/dccprocesseddataworkspace_sharing_audit.html"
 
-    def run_audit(self, **kwargs):
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse("gregor_anvil:audit:dcc_processed_data_workspaces:sharing:resolve_all")
+        return context
+
+
+class DCCProcessedDataWorkspaceSharingAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all DCCProcessedDataWorkspace sharing audit results that need action."""
+
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:dcc_processed_data_workspaces:sharing:all")
 
 
 class DCCProcessedDataWorkspaceSharingAuditByWorkspace(
@@ -691,12 +784,10 @@ class DCCProcessedDataWorkspaceSharingAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit(
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit(
             queryset=self.model.objects.filter(pk=self.object.pk)
         )
-        audit.run_audit()
-        return audit
 
 
 class DCCProcessedDataWorkspaceSharingAuditByUploadCycle(
@@ -721,13 +812,10 @@ class DCCProcessedDataWorkspaceSharingAuditByUploadCycle(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        # Run the audit.
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit(
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceSharingAudit(
             queryset=models.DCCProcessedDataWorkspace.objects.filter(upload_cycle=self.object)
         )
-        audit.run_audit()
-        return audit
 
 
 class DCCProcessedDataWorkspaceSharingAuditResolve(
@@ -774,10 +862,27 @@ class DCCProcessedDataWorkspaceAuthDomainAudit(
 
     template_name = "gregor_anvil/dccprocesseddataworkspace_auth_domain_audit.html"
 
-    def run_audit(self):
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit()
-        audit.run_audit()
-        return audit
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_resolve_url"] = reverse(
+            "gregor_anvil:audit:dcc_processed_data_workspaces:auth_domains:resolve_all"
+        )
+        return context
+
+
+class DCCProcessedDataWorkspaceAuthDomainAuditBulkResolve(
+    AnVILConsortiumManagerStaffEditRequired, viewmixins.AuditBulkResolveMixin, View
+):
+    """View to resolve all DCCProcessedDataWorkspace auth domain audit results that need action."""
+
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit()
+
+    def get_success_url(self):
+        return reverse("gregor_anvil:audit:dcc_processed_data_workspaces:auth_domains:all")
 
 
 class DCCProcessedDataWorkspaceAuthDomainAuditByWorkspace(
@@ -806,12 +911,10 @@ class DCCProcessedDataWorkspaceAuthDomainAuditByWorkspace(
             )
         return obj
 
-    def run_audit(self):
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit(
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit(
             queryset=self.model.objects.filter(pk=self.object.pk)
         )
-        audit.run_audit()
-        return audit
 
 
 class DCCProcessedDataWorkspaceAuthDomainAuditByUploadCycle(
@@ -835,12 +938,10 @@ class DCCProcessedDataWorkspaceAuthDomainAuditByUploadCycle(
             )
         return obj
 
-    def run_audit(self, **kwargs):
-        audit = dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit(
+    def get_audit(self):
+        return dcc_processed_data_workspace_audit.DCCProcessedDataWorkspaceAuthDomainAudit(
             queryset=models.DCCProcessedDataWorkspace.objects.filter(upload_cycle=self.object)
         )
-        audit.run_audit()
-        return audit
 
 
 class DCCProcessedDataWorkspaceAuthDomainAuditResolve(
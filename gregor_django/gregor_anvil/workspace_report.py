@@ -0,0 +1,95 @@
+from anvil_consortium_manager.models import Account, Workspace
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import WorkspaceReportSummary
+
+# Primary key of the only WorkspaceReportSummary.
+SUMMARY_PK = 1
+
+
+def _count_workspaces(workspace_types=None):
+    """Return a dictionary of workspace counts keyed by workspace type, for the given types or all types."""
+    qs = Workspace.objects.all()
+    if workspace_types is not None:
+        qs = qs.filter(workspace_type__in=workspace_types)
+    qs = (
+        qs.order_by()
+        .values("workspace_type")
+        .annotate(
+            n_total=Count("pk", distinct=True),
+            n_shared=Count(
+                "workspacegroupsharing",
+                filter=Q(workspacegroupsharing__group__name="GREGOR_ALL"),
+            ),
+        )
+    )
+    return {x["workspace_type"]: {"n_total": x["n_total"], "n_shared": x["n_shared"]} for x in qs}
+
+
+def _count_verified_linked_accounts():
+    return Account.objects.filter(verified_email_entry__date_verified__isnull=False).count()
+
+
+def _update_summary(**counts):
+    """Write counts to the summary in a single UPDATE, without locking it first.
+
+    Returns:
+        bool: Whether the summary exists and was updated.
+    """
+    return bool(WorkspaceReportSummary.objects.filter(pk=SUMMARY_PK).update(modified=timezone.now(), **counts))
+
+
+def rebuild_summary():
+    """Recompute all counts in the workspace report summary from scratch and return the summary."""
+    counts = {
+        "workspace_counts": _count_workspaces(),
+        "verified_linked_accounts": _count_verified_linked_accounts(),
+    }
+    # A concurrent first build creates the same row, so there is never more than one summary.
+    summary, created = WorkspaceReportSummary.objects.get_or_create(pk=SUMMARY_PK, defaults=counts)
+    if not created:
+        _update_summary(**counts)
+        summary.refresh_from_db()
+    return summary
+
+
+def get_summary():
+    """Return the workspace report summary, building it if it does not exist yet."""
+    summary = WorkspaceReportSummary.objects.filter(pk=SUMMARY_PK).first()
+    if summary is None:
+        summary = rebuild_summary()
+    return summary
+
+
+def refresh_workspace_types(workspace_types):
+    """Recompute the workspace counts for only the given workspace types.
+
+    The counts are computed before the summary is locked, so the lock is only held while they are merged in."""
+    counts = _count_workspaces(workspace_types)
+    with transaction.atomic():
+        summary = WorkspaceReportSummary.objects.select_for_update().filter(pk=SUMMARY_PK).first()
+        if summary is None:
+            # Everything is counted when the summary is first built.
+            rebuild_summary()
+            return
+        for workspace_type in workspace_types:
+            if workspace_type in counts:
+                summary.workspace_counts[workspace_type] = counts[workspace_type]
+            else:
+                summary.workspace_counts.pop(workspace_type, None)
+        summary.save(update_fields=["workspace_counts", "modified"])
+
+
+def refresh_workspaces(workspace_pks):
+    """Recompute the workspace counts for the types of the given workspaces."""
+    workspace_types = set(Workspace.objects.filter(pk__in=workspace_pks).values_list("workspace_type", flat=True))
+    if workspace_types:
+        refresh_workspace_types(workspace_types)
+
+
+def refresh_verified_linked_accounts():
+    """Recompute the number of verified linked accounts."""
+    if not _update_summary(verified_linked_accounts=_count_verified_linked_accounts()):
+        rebuild_summary()
@@ -5,8 +5,9 @@ from allauth.account.adapter import DefaultAccountAdapter
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.conf import settings
 from django.contrib.auth.models import Group
-from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.core.exceptions import ImproperlyConfigured
 from django.core.mail import mail_admins
+from django.db.models import Q
 from django.http import HttpRequest
 
 from gregor_django.gregor_anvil.models import PartnerGroup, ResearchCenter
@@ -54,120 +55,133 @@ class SocialAccountAdapter(DefaultSocialAccountAdapter):
         if user_changed is True:
             user.save()
 
+    def _get_pks_by_name(self, model, names):
+        """Return a dict mapping each name in `names` to the pk of the matching `model` instance.
+
+        Names are matched against `short_name`, falling back to `full_name` for the transition from passed full
+        names to short names. Names that match neither are left out of the dict.
+        """
+        pks_by_name = {}
+        matches = list(
+            model.objects.filter(Q(short_name__in=names) | Q(full_name__in=names)).values_list(
+                "pk", "short_name", "full_name"
+            )
+        )
+        for pk, short_name, full_name in matches:
+            pks_by_name.setdefault(full_name, pk)
+        for pk, short_name, full_name in matches:
+            pks_by_name[short_name] = pk
+        return pks_by_name
+
+    def _set_related_pks(self, relation, new_pks):
+        """Replace the pks in the m2m `relation` with `new_pks`, and return the (added, removed) sets of pks."""
+        existing_pks = set(relation.values_list("pk", flat=True))
+        added_pks = new_pks - existing_pks
+        removed_pks = existing_pks - new_pks
+        if added_pks:
+            relation.add(*added_pks)
+        if removed_pks:
+            relation.remove(*removed_pks)
+        return added_pks, removed_pks
+
     def update_user_partner_groups(self, user, extra_data: Dict):
         partner_groups = extra_data.get("partner_group", [])
         logger.debug(f"partner groups: {partner_groups} for user {user}")
-        partner_group_object_list = []
+        partner_group_pks = set()
         if partner_groups:
             if not isinstance(partner_groups, list):
                 raise ImproperlyConfigured("sociallogin.extra_data.partner_groups should be None or a list")
 
+            pks_by_name = self._get_pks_by_name(PartnerGroup, partner_groups)
             for pg_name in partner_groups:
-                try:
-                    pg = PartnerGroup.objects.get(short_name=pg_name)
-                except ObjectDoesNotExist:
-                    try:
-                        pg = PartnerGroup.objects.get(full_name=pg_name)
-                    except ObjectDoesNotExist:
-                        logger.debug(
-                            f"[SocialAccountAdapter:update_user_partner_groups] Ignoring drupal "
-                            f"partner_group {pg_name} - not in PartnerGroup domain"
-                        )
-                        mail_admins(
-                            subject="Missing PartnerGroup",
-                            message=f"Missing partner group ({pg_name}) passed from drupal for user {user}",
-                        )
-                    else:
-                        partner_group_object_list.append(pg)
+                if pg_name in pks_by_name:
+                    partner_group_pks.add(pks_by_name[pg_name])
                 else:
-                    partner_group_object_list.append(pg)
-
-            for pg in partner_group_object_list:
-                if not user.partner_groups.filter(pk=pg.pk):
-                    user.partner_groups.add(pg)
-                    logger.info(
-                        f"[SocialAccountAdatpter:update_user_partner_groups] adding user "
-                        f"partner_groups user: {user} rc: {pg}"
+                    logger.debug(
+                        f"[SocialAccountAdapter:update_user_partner_groups] Ignoring drupal "
+                        f"partner_group {pg_name} - not in PartnerGroup domain"
+                    )
+                    mail_admins(
+                        subject="Missing PartnerGroup",
+                        message=f"Missing partner group ({pg_name}) passed from drupal for user {user}",
                     )
 
-        for existing_pg in user.partner_groups.all():
-            if existing_pg not in partner_group_object_list:
-                user.partner_groups.remove(existing_pg)
-                logger.info(
-                    f"[SocialAccountAdapter:update_user_partner_groups] removing pg {existing_pg} for user {user}"
-                )
+        added_pks, removed_pks = self._set_related_pks(user.partner_groups, partner_group_pks)
+        if added_pks:
+            logger.info(
+                f"[SocialAccountAdatpter:update_user_partner_groups] adding user "
+                f"partner_groups user: {user} pgs: {sorted(added_pks)}"
+            )
+        if removed_pks:
+            logger.info(
+                f"[SocialAccountAdapter:update_user_partner_groups] removing pgs {sorted(removed_pks)} for user {user}"
+            )
 
     def update_user_research_centers(self, user, extra_data: Dict):
-        # Get list of research centers in domain table
-
         research_center_or_site = extra_data.get("research_center_or_site", [])
-        research_center_object_list = []
+        research_center_pks = set()
         if research_center_or_site:
             if not isinstance(research_center_or_site, list):
                 raise ImproperlyConfigured("sociallogin.extra_data.research_center_or_site should be a list")
 
+            pks_by_name = self._get_pks_by_name(ResearchCenter, research_center_or_site)
             for rc_name in research_center_or_site:
-                try:
-                    # For transition from passed full name to short name support both
-                    rc = ResearchCenter.objects.get(short_name=rc_name)
-                except ObjectDoesNotExist:
-                    try:
-                        rc = ResearchCenter.objects.get(full_name=rc_name)
-                    except ObjectDoesNotExist:
-                        logger.debug(
-                            f"[SocialAccountAdapter:update_user_research_centers] Ignoring drupal "
-                            f"research_center_or_site {rc_name} - not in ResearchCenter domain"
-                        )
-                        mail_admins(
-                            subject="Missing ResearchCenter",
-                            message=f"Missing research center {rc_name} passed from drupal for user {user}",
-                        )
-                    else:
-                        research_center_object_list.append(rc)
+                if rc_name in pks_by_name:
+                    research_center_pks.add(pks_by_name[rc_name])
                 else:
-                    research_center_object_list.append(rc)
-
-            for rc in research_center_object_list:
-                if not user.research_centers.filter(pk=rc.pk):
-                    user.research_centers.add(rc)
-                    logger.info(
-                        f"[SocialAccountAdatpter:update_user_research_centers] adding user "
-                        f"research_centers user: {user} rc: {rc}"
+                    logger.debug(
+                        f"[SocialAccountAdapter:update_user_research_centers] Ignoring drupal "
+                        f"research_center_or_site {rc_name} - not in ResearchCenter domain"
+                    )
+                    mail_admins(
+                        subject="Missing ResearchCenter",
+                        message=f"Missing research center {rc_name} passed from drupal for user {user}",
                     )
 
-        for existing_rc in user.research_centers.all():
-            if existing_rc not in research_center_object_list:
-                user.research_centers.remove(existing_rc)
-                logger.info(
-                    f"[SocialAccountAdatpter:update_user_research_centers] removing rc {existing_rc} for user {user}"
-                )
+        added_pks, removed_pks = self._set_related_pks(user.research_centers, research_center_pks)
+        if added_pks:
+            logger.info(
+                f"[SocialAccountAdatpter:update_user_research_centers] adding user "
+                f"research_centers user: {user} rcs: {sorted(added_pks)}"
+            )
+        if removed_pks:
+            logger.info(
+                f"[SocialAccountAdatpter:update_user_research_centers] removing rcs {sorted(removed_pks)} "
+                f"for user {user}"
+            )
 
     def update_user_groups(self, user, extra_data: Dict):
         managed_scope_status = extra_data.get("managed_scope_status")
         if managed_scope_status:
-            added_groups = []
-            removed_groups = []
             if not isinstance(managed_scope_status, dict):
                 raise ImproperlyConfigured("sociallogin.extra_data.managed_scope_status should be a dict")
-            else:
-                for group_name, user_has_group in managed_scope_status.items():
-                    user_group, was_created = Group.objects.get_or_create(name=group_name)
-                    if was_created:
-                        logger.debug(
-                            f"[SocialAccountAdatpter:update_user_data] created mapped user group: {group_name}"
-                        )
-                    if user_has_group is True:
-                        if user_group not in user.groups.all():
-                            user.groups.add(user_group)
-                            added_groups.append(user_group.name)
-                    else:
-                        if user_group in user.groups.all():
-                            user.groups.remove(user_group)
-                            removed_groups.append(user_group.name)
-            if added_groups or removed_groups:
+            group_pks_by_name = dict(Group.objects.filter(name__in=managed_scope_status).values_list("name", "pk"))
+            missing_group_names = [name for name in managed_scope_status if name not in group_pks_by_name]
+            if missing_group_names:
+                # Another login may create the same group concurrently, so ignore conflicts and re-read the pks.
+                Group.objects.bulk_create([Group(name=name) for name in missing_group_names], ignore_conflicts=True)
+                group_pks_by_name.update(Group.objects.filter(name__in=missing_group_names).values_list("name", "pk"))
+                logger.debug(
+                    f"[SocialAccountAdatpter:update_user_data] created mapped user groups: {missing_group_names}"
+                )
+            granted_pks = {
+                group_pks_by_name[name] for name, has_group in managed_scope_status.items() if has_group is True
+            }
+            revoked_pks = {
+                group_pks_by_name[name] for name, has_group in managed_scope_status.items() if has_group is not True
+            }
+            existing_pks = set(user.groups.filter(pk__in=group_pks_by_name.values()).values_list("pk", flat=True))
+            added_pks = granted_pks - existing_pks
+            removed_pks = revoked_pks & existing_pks
+            if added_pks:
+                user.groups.add(*added_pks)
+            if removed_pks:
+                user.groups.remove(*removed_pks)
+            if added_pks or removed_pks:
+                names_by_pk = {pk: name for name, pk in group_pks_by_name.items()}
                 logger.info(
                     f"[SocialAccountAdatpter:update_user_data] user: {user} updated groups: "
-                    f"added {added_groups} removed: {removed_groups} "
+                    f"added {[names_by_pk[pk] for pk in added_pks]} removed: {[names_by_pk[pk] for pk in removed_pks]} "
                     f"managed_scope_status: {managed_scope_status}"
                 )
 
@@ -182,9 +196,14 @@ class SocialAccountAdapter(DefaultSocialAccountAdapter):
         user = sociallogin.user
 
         self.update_user_info(user, extra_data)
+        self.update_user_groups(user, extra_data)
+
+    def sync_user_data(self, user, extra_data: Dict):
+        """Update a user's research centers and partner groups from their Drupal profile data.
+
+        This runs after the login has completed (see `login_sync`), because it may notify the admins by email."""
         self.update_user_research_centers(user, extra_data)
         self.update_user_partner_groups(user, extra_data)
-        self.update_user_groups(user, extra_data)
 
     def on_authentication_error(self, request, provider_id, error, exception, extra_context):
         """
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
 from gregor_django.users.forms import UserChangeForm, UserCreationForm
+from gregor_django.users.models import DrupalSyncWatermark, LoginSyncTask
 
 User = get_user_model()
 
@@ -44,3 +45,16 @@ class UserAdmin(auth_admin.UserAdmin):
         "research_centers",
         "partner_groups",
     )
+
+
+@admin.register(DrupalSyncWatermark)
+class DrupalSyncWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "synced_at")
+
+
+@admin.register(LoginSyncTask)
+class LoginSyncTaskAdmin(admin.ModelAdmin):
+    list_display = ("user", "status", "attempts", "available_at", "created")
+    list_filter = ("status",)
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
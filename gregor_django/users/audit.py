@@ -1,18 +1,26 @@
 import logging
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import reduce
+from urllib import parse
 
 import django_tables2 as tables
 import jsonapi_requests
+import requests
 from allauth.socialaccount.models import SocialAccount
 from anvil_consortium_manager.models import Account
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django_tables2.export import TableExport
+from jsonapi_requests.request_factory import ApiConnectionError, ApiRequestFactory
 from oauthlib.oauth2 import BackendApplicationClient
 from requests_oauthlib import OAuth2, OAuth2Session
 
@@ -135,162 +143,344 @@ class OverDeactivateThresholdUser(UserAuditResult):
     pass
 
 
+@dataclass
+class UserChangeNotWritten(UserAuditResult):
+    pass
+
+
+class UserAuditChanges:
+    """Changes to local users found by a UserAudit, collected so that they can be written in batches.
+
+    New users and their social accounts are created with `bulk_create`, changed users are saved with
+    `bulk_update`, and research center memberships are added and removed directly in the many-to-many table.
+    Each call to `write` uses a single transaction. If that transaction fails with an IntegrityError (e.g., because
+    a new user has the same username as an existing user), the changes are written again one at a time, so that
+    only the offending changes are lost.
+    """
+
+    #: User fields that can be changed by the audit.
+    USER_FIELDS = ("name", "username", "email", "is_active")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.new_social_accounts = []
+        self.changed_users = {}
+        # Lists of (user, research center) pairs. New users do not have a pk yet, so they cannot be in a set.
+        self.research_centers_to_add = []
+        self.research_centers_to_remove = []
+
+    def __len__(self):
+        return (
+            len(self.new_social_accounts)
+            + len(self.changed_users)
+            + len(self.research_centers_to_add)
+            + len(self.research_centers_to_remove)
+        )
+
+    def add_new_user(self, social_account, research_centers):
+        """Create an unsaved social account and its unsaved user, and add the user to the research centers."""
+        self.new_social_accounts.append(social_account)
+        for research_center in research_centers:
+            self.research_centers_to_add.append((social_account.user, research_center))
+
+    def update_user(self, user):
+        self.changed_users[user.pk] = user
+
+    def add_research_center(self, user, research_center):
+        self.research_centers_to_add.append((user, research_center))
+
+    def remove_research_center(self, user, research_center):
+        self.research_centers_to_remove.append((user, research_center))
+
+    def write(self):
+        """Write all collected changes to the database and clear them.
+
+        Returns:
+            list: A (user, exception) tuple for each change that could not be written.
+        """
+        if not len(self):
+            return []
+        try:
+            with transaction.atomic():
+                self._write_batch()
+        except IntegrityError as e:
+            logger.warning(
+                f"[UserAuditChanges] could not write batch of {len(self)} changes, writing them one by one: {e}"
+            )
+            failed = self._write_rows()
+        else:
+            failed = []
+        self.clear()
+        return failed
+
+    def _write_batch(self):
+        through_model = get_user_model().research_centers.through
+        get_user_model().objects.bulk_create([x.user for x in self.new_social_accounts])
+        # The user ids of the social accounts are set from the now saved users.
+        SocialAccount.objects.bulk_create(self.new_social_accounts)
+        if self.changed_users:
+            get_user_model().objects.bulk_update(self.changed_users.values(), self.USER_FIELDS)
+        if self.research_centers_to_remove:
+            through_model.objects.filter(
+                reduce(
+                    operator.or_,
+                    (
+                        Q(user_id=user.pk, researchcenter_id=research_center.pk)
+                        for user, research_center in self.research_centers_to_remove
+                    ),
+                )
+            ).delete()
+        through_model.objects.bulk_create(
+            [
+                through_model(user_id=user.pk, researchcenter_id=research_center.pk)
+                for user, research_center in self.research_centers_to_add
+            ],
+            ignore_conflicts=True,
+        )
+
+    def _write_rows(self):
+        """Write each collected change in its own transaction and return the changes that could not be written."""
+        through_model = get_user_model().research_centers.through
+        failed = []
+        for social_account in self.new_social_accounts:
+            user = social_account.user
+            # The rolled back batch may have set primary keys on the new objects.
+            user.pk = None
+            user._state.adding = True
+            social_account.pk = None
+            social_account._state.adding = True
+            try:
+                with transaction.atomic():
+                    user.save()
+                    social_account.user = user
+                    social_account.save()
+            except IntegrityError as e:
+                # Research center memberships of users without a pk are skipped below.
+                user.pk = None
+                failed.append((user, e))
+        for user in self.changed_users.values():
+            try:
+                with transaction.atomic():
+                    user.save(update_fields=self.USER_FIELDS)
+            except IntegrityError as e:
+                failed.append((user, e))
+        for user, research_center in self.research_centers_to_remove:
+            through_model.objects.filter(user_id=user.pk, researchcenter_id=research_center.pk).delete()
+        for user, research_center in self.research_centers_to_add:
+            if user.pk is None:
+                continue
+            try:
+                with transaction.atomic():
+                    through_model.objects.bulk_create(
+                        [through_model(user_id=user.pk, researchcenter_id=research_center.pk)], ignore_conflicts=True
+                    )
+            except IntegrityError as e:
+                failed.append((user, e))
+        return failed
+
+
 class UserAudit(GREGoRAudit):
     ISSUE_TYPE_USER_INACTIVE = "User is inactive in drupal"
     ISSUE_TYPE_USER_REMOVED_FROM_SITE = "User removed from site"
     results_table_class = UserAuditResultsTable
 
-    def __init__(self, apply_changes=False, ignore_deactivate_threshold=False):
+    def __init__(self, apply_changes=False, ignore_deactivate_threshold=False, batch_size=500, changed_since=None):
         """Initialize the audit.
 
         Args:
             apply_changes: Whether to make changes to align the audit
+            batch_size: Number of pending changes at which to write them to the database, if applying changes.
+            changed_since: If set, only audit remote users changed after this datetime. Local users that are no
+                longer in Drupal are still found, using a listing of remote uids.
         """
         super().__init__()
         self.apply_changes = apply_changes
+        # Shared with the other Drupal data audits in the same run by assigning the same instance to each audit.
+        self.drupal_session = DrupalSyncSession()
         self.ignore_deactivate_threshold = ignore_deactivate_threshold
+        self.batch_size = batch_size
+        self.changed_since = changed_since
         self.USER_DEACTIVATE_THRESHOLD = settings.DRUPAL_DATA_AUDIT_DEACTIVATE_USER_THRESHOLD
 
+    def _write_changes(self, changes):
+        """Write the collected changes, recording each change that could not be written as an error."""
+        for user, error in changes.write():
+            if user.pk is None:
+                # The new user was counted as verified on the assumption that it would be created.
+                self.verified = [x for x in self.verified if x.local_user is None or x.local_user.user is not user]
+                local_user = None
+            else:
+                local_user = SocialAccount.objects.filter(user=user, provider=CustomProvider.id).first()
+            self.errors.append(
+                UserChangeNotWritten(
+                    local_user=local_user,
+                    note=f"Could not write changes for user {user.username}: {type(error).__name__}: {error}",
+                )
+            )
+
     def _run_audit(self):
         """Run the audit on local and remote users."""
         user_endpoint_url = "user/user"
         drupal_uids = set()
-        json_api = get_drupal_json_api()
-        study_sites = get_study_sites(json_api)
-
-        user_count = 0
-        while user_endpoint_url is not None:
-            users_endpoint = json_api.endpoint(user_endpoint_url)
-            users_endpoint_response = users_endpoint.get()
+        json_api = self.drupal_session.get_json_api()
+        study_sites = self.drupal_session.get_study_sites()
+        if self.changed_since is not None:
+            drupal_uids = get_drupal_user_uids(json_api)
+            user_endpoint_url += "?" + parse.urlencode(
+                {
+                    "filter[changed][condition][path]": "changed",
+                    "filter[changed][condition][operator]": ">",
+                    "filter[changed][condition][value]": int(self.changed_since.timestamp()),
+                }
+            )
+        # Load all local data needed to reconcile users up front, so that each remote user is checked in memory.
+        research_centers_by_short_name = {x.short_name: x for x in ResearchCenter.objects.all()}
+        social_accounts_by_uid = {
+            x.uid: x
+            for x in SocialAccount.objects.filter(provider=CustomProvider.id)
+            .select_related("user")
+            .prefetch_related("user__research_centers")
+        }
 
-            # If there are more, there will be a 'next' link
+        changes = UserAuditChanges()
 
-            user_endpoint_url = users_endpoint_response.content.links.get("next", {}).get("href")
-
-            for user in users_endpoint_response.data:
-                drupal_uid = user.attributes.get("drupal_internal__uid")
-                drupal_username = user.attributes.get("name")
-                drupal_email = user.attributes.get("mail")
-                drupal_firstname = user.attributes.get("field_fname")
-                drupal_lastname = user.attributes.get("field_lname")
-                drupal_full_name = " ".join(part for part in (drupal_firstname, drupal_lastname) if part)
-                drupal_study_sites_rel = user.relationships.get("field_research_center_or_site")
-                # drupal_partner_groups_rel = user.relationships.get('field_partner_member_group')
-                drupal_user_study_site_shortnames = []
-                if drupal_study_sites_rel:
-                    for dss in drupal_study_sites_rel.data:
-                        study_site_uuid = dss.id
-                        study_site_info = study_sites[study_site_uuid]
-
-                        drupal_user_study_site_shortnames.append(study_site_info["short_name"])
-                new_user_sites = ResearchCenter.objects.filter(short_name__in=drupal_user_study_site_shortnames)
-                # no uid is blocked or anonymous
-                if not drupal_uid:
-                    # potential blocked user, but will no longer have a drupal uid
-                    # so we cover these below
-                    continue
-                sa = None
-                try:
-                    sa = SocialAccount.objects.get(
+        user_count = 0
+        for user in iter_drupal_json_api(json_api, user_endpoint_url):
+            drupal_uid = user.attributes.get("drupal_internal__uid")
+            drupal_username = user.attributes.get("name")
+            drupal_email = user.attributes.get("mail")
+            drupal_firstname = user.attributes.get("field_fname")
+            drupal_lastname = user.attributes.get("field_lname")
+            drupal_full_name = " ".join(part for part in (drupal_firstname, drupal_lastname) if part)
+            drupal_study_sites_rel = user.relationships.get("field_research_center_or_site")
+            # drupal_partner_groups_rel = user.relationships.get('field_partner_member_group')
+            drupal_user_study_site_shortnames = []
+            if drupal_study_sites_rel:
+                for dss in drupal_study_sites_rel.data:
+                    study_site_uuid = dss.id
+                    study_site_info = study_sites[study_site_uuid]
+
+                    drupal_user_study_site_shortnames.append(study_site_info["short_name"])
+            new_user_sites = [
+                research_centers_by_short_name[short_name]
+                for short_name in drupal_user_study_site_shortnames
+                if short_name in research_centers_by_short_name
+            ]
+            # no uid is blocked or anonymous
+            if not drupal_uid:
+                # potential blocked user, but will no longer have a drupal uid
+                # so we cover these below
+                continue
+            # SocialAccount uids are strings, but Drupal returns them as integers.
+            sa = social_accounts_by_uid.get(str(drupal_uid))
+            if sa is None:
+                drupal_user = get_user_model()()
+                drupal_user.username = drupal_username
+                drupal_user.name = drupal_full_name
+                drupal_user.email = drupal_email
+                if self.apply_changes is True:
+                    sa = SocialAccount(
+                        user=drupal_user,
                         uid=user.attributes["drupal_internal__uid"],
                         provider=CustomProvider.id,
                     )
-                except ObjectDoesNotExist:
-                    drupal_user = get_user_model()()
-                    drupal_user.username = drupal_username
-                    drupal_user.name = drupal_full_name
-                    drupal_user.email = drupal_email
-                    if self.apply_changes is True:
-                        drupal_user.save()
-                        drupal_user.research_centers.set(new_user_sites)
-                    if self.apply_changes is True:
-                        sa = SocialAccount.objects.create(
-                            user=drupal_user,
-                            uid=user.attributes["drupal_internal__uid"],
-                            provider=CustomProvider.id,
-                        )
-                    self.needs_action.append(NewUser(local_user=sa, remote_user_data=user))
-
-                if sa:
-                    user_updates = {}
-                    if sa.user.name != drupal_full_name:
-                        user_updates.update({"name": {"old": sa.user.name, "new": drupal_full_name}})
-                        sa.user.name = drupal_full_name
-                    if sa.user.username != drupal_username:
-                        user_updates.update(
-                            {
-                                "username": {
-                                    "old": sa.user.username,
-                                    "new": drupal_username,
-                                }
+                    changes.add_new_user(sa, new_user_sites)
+                    # The new user will match the remote user once the changes are written.
+                    self.verified.append(VerifiedUser(local_user=sa, remote_user_data=user))
+                self.needs_action.append(NewUser(local_user=sa, remote_user_data=user))
+            else:
+                user_updates = {}
+                if sa.user.name != drupal_full_name:
+                    user_updates.update({"name": {"old": sa.user.name, "new": drupal_full_name}})
+                    sa.user.name = drupal_full_name
+                if sa.user.username != drupal_username:
+                    user_updates.update(
+                        {
+                            "username": {
+                                "old": sa.user.username,
+                                "new": drupal_username,
                             }
-                        )
-                        sa.user.username = drupal_username
-                    if sa.user.email != drupal_email:
-                        user_updates.update({"email": {"old": sa.user.email, "new": drupal_email}})
-                        sa.user.email = drupal_email
-
-                    if sa.user.is_active is False:
-                        user_updates.update({"is_active": {"old": False, "new": True}})
-                        sa.user.is_active = True
-
-                    prev_user_site_names = set(sa.user.research_centers.all().values_list("short_name", flat=True))
-                    new_user_site_names = set(drupal_user_study_site_shortnames)
-                    if prev_user_site_names != new_user_site_names:
-                        user_updates.update(
-                            {
-                                "sites": {
-                                    "old": prev_user_site_names,
-                                    "new": new_user_site_names,
-                                }
+                        }
+                    )
+                    sa.user.username = drupal_username
+                if sa.user.email != drupal_email:
+                    user_updates.update({"email": {"old": sa.user.email, "new": drupal_email}})
+                    sa.user.email = drupal_email
+
+                if sa.user.is_active is False:
+                    user_updates.update({"is_active": {"old": False, "new": True}})
+                    sa.user.is_active = True
+
+                prev_user_sites = list(sa.user.research_centers.all())
+                prev_user_site_names = {x.short_name for x in prev_user_sites}
+                new_user_site_names = set(drupal_user_study_site_shortnames)
+                if prev_user_site_names != new_user_site_names:
+                    user_updates.update(
+                        {
+                            "sites": {
+                                "old": prev_user_site_names,
+                                "new": new_user_site_names,
                             }
-                        )
-                        # do not remove from sites by default
-                        removed_sites = prev_user_site_names.difference(new_user_site_names)
-                        new_sites = new_user_site_names.difference(prev_user_site_names)
-
-                        if settings.DRUPAL_DATA_AUDIT_REMOVE_USER_SITES is True:
-                            if self.apply_changes is True:
-                                sa.user.research_centers.set(new_user_sites)
-                        else:
-                            if removed_sites:
-                                self.errors.append(
-                                    UpdateUser(
-                                        local_user=sa,
-                                        remote_user_data=user,
-                                        changes=user_updates,
-                                    )
-                                )
-                            if new_sites:
-                                for new_site in new_user_sites:
-                                    if new_site.short_name in new_user_site_names:
-                                        if self.apply_changes is True:
-                                            sa.user.research_centers.add(new_site)
+                        }
+                    )
+                    # do not remove from sites by default
+                    removed_sites = prev_user_site_names.difference(new_user_site_names)
+                    new_sites = new_user_site_names.difference(prev_user_site_names)
 
-                    if user_updates:
+                    if settings.DRUPAL_DATA_AUDIT_REMOVE_USER_SITES is True:
                         if self.apply_changes is True:
-                            sa.user.save()
-
-                        self.needs_action.append(
-                            UpdateUser(
-                                local_user=sa,
-                                remote_user_data=user,
-                                changes=user_updates,
+                            for prev_site in prev_user_sites:
+                                if prev_site.short_name in removed_sites:
+                                    changes.remove_research_center(sa.user, prev_site)
+                            for new_site in new_user_sites:
+                                if new_site.short_name in new_sites:
+                                    changes.add_research_center(sa.user, new_site)
+                    else:
+                        if removed_sites:
+                            self.errors.append(
+                                UpdateUser(
+                                    local_user=sa,
+                                    remote_user_data=user,
+                                    changes=user_updates,
+                                )
                             )
+                        if new_sites:
+                            for new_site in new_user_sites:
+                                if new_site.short_name in new_sites:
+                                    if self.apply_changes is True:
+                                        changes.add_research_center(sa.user, new_site)
+
+                if user_updates:
+                    if self.apply_changes is True:
+                        changes.update_user(sa.user)
+
+                    self.needs_action.append(
+                        UpdateUser(
+                            local_user=sa,
+                            remote_user_data=user,
+                            changes=user_updates,
                         )
-                    else:
-                        self.verified.append(VerifiedUser(local_user=sa, remote_user_data=user))
+                    )
+                else:
+                    self.verified.append(VerifiedUser(local_user=sa, remote_user_data=user))
 
-                drupal_uids.add(drupal_uid)
-                user_count += 1
+            drupal_uids.add(drupal_uid)
+            user_count += 1
+            if len(changes) >= self.batch_size:
+                self._write_changes(changes)
+        self._write_changes(changes)
 
         # find active django accounts that are drupal based
         # users that we did not get from drupal
         # these may include blocked users
 
-        unaudited_drupal_accounts = SocialAccount.objects.filter(
-            provider=CustomProvider.id, user__is_active=True
-        ).exclude(uid__in=drupal_uids)
+        unaudited_drupal_accounts = (
+            SocialAccount.objects.filter(provider=CustomProvider.id, user__is_active=True)
+            .exclude(uid__in=drupal_uids)
+            .select_related("user")
+        )
         user_ids_to_check = []
         count_inactive = unaudited_drupal_accounts.count()
         over_threshold = False
@@ -305,12 +495,14 @@ class UserAudit(GREGoRAudit):
                 uda.user.is_active = False
                 if over_threshold is False:
                     if self.apply_changes is True:
-                        uda.user.save()
+                        changes.update_user(uda.user)
                     handled = True
                     self.needs_action.append(RemoveUser(local_user=uda))
             if handled is False:
                 self.errors.append(RemoveUser(local_user=uda, note=f"Over Threshold {over_threshold}"))
 
+        self._write_changes(changes)
+
         # Use distinct so this returns one row per Account
         # instead of row per groupaccountmembership
         inactive_anvil_users = Account.objects.filter(
@@ -410,28 +602,32 @@ class SiteAudit(GREGoRAudit):
         """
         super().__init__()
         self.apply_changes = apply_changes
+        self.drupal_session = DrupalSyncSession()
 
     def _run_audit(self):
         """Run the audit on local and remote users."""
         valid_nodes = set()
-        json_api = get_drupal_json_api()
-        study_sites = get_study_sites(json_api=json_api)
+        study_sites = self.drupal_session.get_study_sites()
+        research_centers_by_node_id = {
+            x.drupal_node_id: x for x in ResearchCenter.objects.filter(drupal_node_id__isnull=False)
+        }
+        new_study_sites = []
+        changed_study_sites = []
         for study_site_info in study_sites.values():
             short_name = study_site_info["short_name"]
             full_name = study_site_info["full_name"]
             node_id = study_site_info["node_id"]
             valid_nodes.add(node_id)
 
-            try:
-                study_site = ResearchCenter.objects.get(drupal_node_id=node_id)
-            except ObjectDoesNotExist:
-                study_site = None
+            study_site = research_centers_by_node_id.get(int(node_id))
+            if study_site is None:
                 if self.apply_changes is True:
-                    study_site = ResearchCenter.objects.create(
+                    study_site = ResearchCenter(
                         drupal_node_id=node_id,
                         short_name=short_name,
                         full_name=full_name,
                     )
+                    new_study_sites.append(study_site)
                 self.needs_action.append(NewSite(remote_site_data=study_site_info, local_site=study_site))
             else:
                 study_site_updates = {}
@@ -453,7 +649,7 @@ class SiteAudit(GREGoRAudit):
 
                 if study_site_updates:
                     if self.apply_changes is True:
-                        study_site.save()
+                        changed_study_sites.append(study_site)
                     self.needs_action.append(
                         UpdateSite(
                             local_site=study_site,
@@ -464,6 +660,11 @@ class SiteAudit(GREGoRAudit):
                 else:
                     self.verified.append(VerifiedSite(local_site=study_site, remote_site_data=study_site_info))
 
+        if new_study_sites or changed_study_sites:
+            with transaction.atomic():
+                ResearchCenter.objects.bulk_create(new_study_sites)
+                ResearchCenter.objects.bulk_update(changed_study_sites, ["full_name", "short_name"])
+
         invalid_study_sites = ResearchCenter.objects.exclude(drupal_node_id__in=valid_nodes)
 
         for iss in invalid_study_sites:
@@ -556,12 +757,17 @@ class PartnerGroupAudit(GREGoRAudit):
         """
         super().__init__()
         self.apply_changes = apply_changes
+        self.drupal_session = DrupalSyncSession()
 
     def _run_audit(self):
         """Run the audit on local and remote users."""
         valid_nodes = set()
-        json_api = get_drupal_json_api()
-        study_partner_groups = get_partner_groups(json_api=json_api)
+        study_partner_groups = self.drupal_session.get_partner_groups()
+        partner_groups_by_node_id = {
+            x.drupal_node_id: x for x in PartnerGroup.objects.filter(drupal_node_id__isnull=False)
+        }
+        new_partner_groups = []
+        changed_partner_groups = []
         newly_inactive_partner_groups = set()
         for study_partner_group_info in study_partner_groups.values():
             short_name = study_partner_group_info["short_name"]
@@ -571,17 +777,16 @@ class PartnerGroupAudit(GREGoRAudit):
 
             valid_nodes.add(node_id)
 
-            try:
-                study_partner_group = PartnerGroup.objects.get(drupal_node_id=node_id)
-            except ObjectDoesNotExist:
-                study_partner_group = None
+            study_partner_group = partner_groups_by_node_id.get(int(node_id))
+            if study_partner_group is None:
                 if self.apply_changes is True:
-                    study_partner_group = PartnerGroup.objects.create(
+                    study_partner_group = PartnerGroup(
                         drupal_node_id=node_id,
                         short_name=short_name,
                         full_name=full_name,
                         status=status,
                     )
+                    new_partner_groups.append(study_partner_group)
                 self.needs_action.append(
                     NewPartnerGroup(
                         remote_partner_group_data=study_partner_group_info, local_partner_group=study_partner_group
@@ -610,7 +815,7 @@ class PartnerGroupAudit(GREGoRAudit):
 
                 if study_partner_group_updates:
                     if self.apply_changes is True:
-                        study_partner_group.save()
+                        changed_partner_groups.append(study_partner_group)
                     self.needs_action.append(
                         UpdatePartnerGroup(
                             local_partner_group=study_partner_group,
@@ -625,6 +830,11 @@ class PartnerGroupAudit(GREGoRAudit):
                         )
                     )
 
+        if new_partner_groups or changed_partner_groups:
+            with transaction.atomic():
+                PartnerGroup.objects.bulk_create(new_partner_groups)
+                PartnerGroup.objects.bulk_update(changed_partner_groups, ["full_name", "short_name", "status"])
+
         invalid_study_partner_groups = PartnerGroup.objects.exclude(drupal_node_id__in=valid_nodes)
 
         for iss in invalid_study_partner_groups:
@@ -642,33 +852,207 @@ class PartnerGroupAudit(GREGoRAudit):
                     self.errors.append(MembershipIssuePartnerGroup(local_partner_group=inactive_partner_group))
 
 
-def get_drupal_json_api():
+class SessionApiRequestFactory(ApiRequestFactory):
+    """A jsonapi_requests request factory that sends all requests through one pooled requests.Session.
+
+    jsonapi_requests calls `requests.request` for every request, which opens a new connection each time.
+    """
+
+    def __init__(self, config, session):
+        super().__init__(config)
+        self.session = session
+
+    def _build_absolute_url(self, api_path):
+        # Page links returned by the API already have a query string; do not append a slash to it.
+        url = parse.urljoin(self.config.API_ROOT, api_path)
+        if self.config.APPEND_SLASH and not parse.urlsplit(url).query and not url.endswith("/"):
+            url += "/"
+        return url
+
+    def _request(self, absolute_url, method, **kwargs):
+        options = self.default_options
+        options.update(self.configured_options)
+        options.update(kwargs)
+        try:
+            response = self.session.request(method, absolute_url, **options)
+        except (requests.ConnectionError, requests.Timeout):
+            raise ApiConnectionError
+        return self._parse_response(response)
+
+
+def iter_drupal_json_api(json_api, path):
+    """Yield the objects from every page of a Drupal JSON:API collection.
+
+    The next page is requested in a background thread while the objects from the current page are being
+    processed, so only one page is held in memory at a time and network latency overlaps with the caller's work.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(json_api.endpoint(path).get)
+        while future is not None:
+            response = future.result()
+            # If there are more, there will be a 'next' link
+            next_url = response.content.links.get("next", {}).get("href")
+            future = executor.submit(json_api.endpoint(next_url).get) if next_url else None
+            yield from response.data
+
+
+def fetch_drupal_token():
+    """Fetch an OAuth token for the Drupal JSON:API using the client credentials flow."""
     json_api_client_id = settings.DRUPAL_API_CLIENT_ID
     json_api_client_secret = settings.DRUPAL_API_CLIENT_SECRET
 
     token_url = f"{settings.DRUPAL_SITE_URL}/oauth/token"
     client = BackendApplicationClient(client_id=json_api_client_id)
     oauth = OAuth2Session(client=client)
-    api_root = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}"
-
-    token = oauth.fetch_token(
+    return oauth.fetch_token(
         token_url=token_url,
         client_id=json_api_client_id,
         client_secret=json_api_client_secret,
     )
 
+
+def get_drupal_json_api(token=None, session=None, auth=None):
+    """Return a jsonapi_requests Api for the Drupal JSON:API.
+
+    Args:
+        token: An OAuth token from `fetch_drupal_token`. If None, a new token is fetched.
+        session: The requests.Session through which to send requests. If None, a new session is used.
+        auth: A requests auth to send with each request instead of `token`.
+    """
+    json_api_client_id = settings.DRUPAL_API_CLIENT_ID
+    api_root = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}"
+
+    if auth is None:
+        if token is None:
+            token = fetch_drupal_token()
+        client = BackendApplicationClient(client_id=json_api_client_id)
+        auth = OAuth2(client=client, client_id=json_api_client_id, token=token)
+
     drupal_api = jsonapi_requests.Api.config(
         {
             "API_ROOT": api_root,
-            "AUTH": OAuth2(client=client, client_id=json_api_client_id, token=token),
+            "AUTH": auth,
             "VALIDATE_SSL": True,
             "TIMEOUT": 5,  # default is 1
             "RETRIES": 5,  # default is 3
         }
     )
+    # Reuse connections for all requests to the API.
+    drupal_api.requests = SessionApiRequestFactory(drupal_api.requests.config, session or requests.Session())
     return drupal_api
 
 
+class DrupalSyncTokenAuth(requests.auth.AuthBase):
+    """A requests auth that sends the current OAuth token of a `DrupalSyncSession` with each request.
+
+    The token is checked before every request, so that a long paged crawl does not outlive it. A request that is
+    rejected with 401 Unauthorized is sent once more with a new token."""
+
+    def __init__(self, drupal_session):
+        self.drupal_session = drupal_session
+
+    def __call__(self, request):
+        self.add_token(request, self.drupal_session.get_token())
+        request.register_hook("response", self.handle_401)
+        return request
+
+    @staticmethod
+    def add_token(request, token):
+        request.headers["Authorization"] = f"Bearer {token['access_token']}"
+
+    def handle_401(self, response, **kwargs):
+        if response.status_code != 401:
+            return response
+        # The token may have been revoked or may have expired early; retry once with a new token.
+        token = self.drupal_session.refresh_token()
+        # Release the connection so that it can be reused for the retry.
+        response.content
+        response.close()
+        request = response.request.copy()
+        request.deregister_hook("response", self.handle_401)
+        self.add_token(request, token)
+        retry_response = response.connection.send(request, **kwargs)
+        retry_response.history.append(response)
+        retry_response.request = request
+        return retry_response
+
+
+class DrupalSyncSession:
+    """A run-scoped connection to the Drupal JSON:API, shared by the Drupal data audits.
+
+    The OAuth token is fetched the first time the API is needed. It is checked before each request and fetched
+    again when it is about to expire or when Drupal rejects it. The research center and partner group collections
+    are fetched once and cached for the rest of the run, so that every audit sees the same remote data.
+
+    Typical usage:
+        drupal_session = DrupalSyncSession()
+        site_audit = SiteAudit()
+        site_audit.drupal_session = drupal_session
+        user_audit = UserAudit()
+        user_audit.drupal_session = drupal_session
+    """
+
+    #: Number of seconds before a token expires at which a new token is fetched.
+    TOKEN_EXPIRY_MARGIN = 60
+
+    def __init__(self):
+        self.http_session = requests.Session()
+        self._token = None
+        # Pages of a collection are requested from a background thread.
+        self._token_lock = threading.Lock()
+        self._json_api = None
+        self._study_sites = None
+        self._partner_groups = None
+
+    def _token_is_valid(self):
+        expires_at = self._token.get("expires_at")
+        return expires_at is None or expires_at - self.TOKEN_EXPIRY_MARGIN > time.time()
+
+    def get_token(self):
+        """Return the current token, fetching a new one if there is none yet or it is about to expire."""
+        with self._token_lock:
+            if self._token is None or not self._token_is_valid():
+                self._token = fetch_drupal_token()
+            return self._token
+
+    def refresh_token(self):
+        """Fetch a new token and return it."""
+        with self._token_lock:
+            self._token = fetch_drupal_token()
+            return self._token
+
+    def get_json_api(self):
+        """Return a jsonapi_requests Api that sends a valid token with each request."""
+        self.get_token()
+        if self._json_api is None:
+            self._json_api = get_drupal_json_api(auth=DrupalSyncTokenAuth(self), session=self.http_session)
+        return self._json_api
+
+    def get_study_sites(self):
+        """Return the remote research centers, keyed by uuid."""
+        if self._study_sites is None:
+            self._study_sites = get_study_sites(self.get_json_api())
+        return self._study_sites
+
+    def get_partner_groups(self):
+        """Return the remote partner groups, keyed by uuid."""
+        if self._partner_groups is None:
+            self._partner_groups = get_partner_groups(self.get_json_api())
+        return self._partner_groups
+
+
+def get_drupal_user_uids(json_api):
+    """Return the set of uids of all Drupal users, requesting only the uid field for each user."""
+    path = "user/user?" + parse.urlencode({"fields[user--user]": "drupal_internal__uid"})
+    drupal_uids = set()
+    for user in iter_drupal_json_api(json_api, path):
+        drupal_uid = user.attributes.get("drupal_internal__uid")
+        # Blocked or anonymous users do not have a uid.
+        if drupal_uid:
+            drupal_uids.add(drupal_uid)
+    return drupal_uids
+
+
 def get_study_sites(json_api):
     study_sites_endpoint = json_api.endpoint("node/research_center")
     study_sites_response = study_sites_endpoint.get()
@@ -0,0 +1,131 @@
+"""Outbox queue for the research center and partner group sync that runs after a user logs in.
+
+The user's info and permission groups are updated during the login itself; reconciling research centers and partner
+groups may notify the admins by email, so logging in only records a LoginSyncTask for it. The task is handed to an
+in-process worker thread once the login transaction commits, so it normally runs within moments of the login response.
+Tasks that are not processed in-process (e.g., because the web process restarted) or that failed are picked up by the
+`process-login-sync-tasks` management command.
+"""
+
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from allauth.socialaccount.adapter import get_adapter
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import LoginSyncTask
+
+logger = logging.getLogger(__name__)
+
+# Number of attempts after which a failing task is marked as failed and no longer retried.
+MAX_ATTEMPTS = 5
+# Delay before the first retry of a failed task. The delay doubles after each further failure.
+RETRY_DELAY = timedelta(minutes=1)
+
+
+def enqueue_login_sync(user, extra_data):
+    """Record a sync of `user` from `extra_data` and queue it for the in-process worker.
+
+    Returns:
+        LoginSyncTask: The created task.
+    """
+    task = LoginSyncTask.objects.create(user=user, extra_data=extra_data)
+    transaction.on_commit(lambda: _worker.submit(task.pk))
+    return task
+
+
+def _process(task):
+    """Run the sync for a claimed task and record the outcome. Must be called inside a transaction."""
+    task.attempts += 1
+    try:
+        # The sync changes are rolled back if it fails, but the failed attempt is still recorded.
+        with transaction.atomic():
+            get_adapter().sync_user_data(task.user, task.extra_data)
+    except Exception as e:
+        logger.exception(f"[login_sync] attempt {task.attempts} failed for {task}")
+        task.last_error = f"{type(e).__name__}: {e}"
+        if task.attempts >= MAX_ATTEMPTS:
+            task.status = LoginSyncTask.StatusTypes.FAILED
+        else:
+            task.available_at = timezone.now() + RETRY_DELAY * 2 ** (task.attempts - 1)
+    else:
+        task.status = LoginSyncTask.StatusTypes.DONE
+        task.last_error = ""
+    task.save()
+    return task
+
+
+def _process_next(tasks):
+    """Claim and process the first due task in `tasks`, or return None if there is none.
+
+    Tasks are locked while they are processed, so that concurrent workers do not process the same task.
+    """
+    with transaction.atomic():
+        task = (
+            tasks.filter(status=LoginSyncTask.StatusTypes.PENDING, available_at__lte=timezone.now())
+            .select_for_update(skip_locked=True)
+            .select_related("user")
+            .order_by("available_at", "pk")
+            .first()
+        )
+        if task is None:
+            return None
+        return _process(task)
+
+
+def process_task(pk):
+    """Process the task with primary key `pk` if it is due and not already being processed.
+
+    Returns:
+        LoginSyncTask: The processed task, or None if the task was not processed.
+    """
+    return _process_next(LoginSyncTask.objects.filter(pk=pk))
+
+
+def process_pending_tasks(limit=None):
+    """Process due tasks until there are none left or `limit` tasks have been processed.
+
+    Returns:
+        list: The processed LoginSyncTask instances.
+    """
+    processed = []
+    while limit is None or len(processed) < limit:
+        task = _process_next(LoginSyncTask.objects.all())
+        if task is None:
+            break
+        processed.append(task)
+    return processed
+
+
+class _InProcessWorker:
+    """A daemon thread that processes task primary keys from an in-memory queue."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, pk):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="login-sync-worker", daemon=True)
+                self._thread.start()
+        self._queue.put(pk)
+
+    def _run(self):
+        while True:
+            pk = self._queue.get()
+            try:
+                process_task(pk)
+            except Exception:
+                # The task is left pending and will be picked up by the management command.
+                logger.exception(f"[login_sync] in-process worker could not process task {pk}")
+            finally:
+                # Database connections are per-thread; close this worker's connections between tasks.
+                connections.close_all()
+
+
+_worker = _InProcessWorker()
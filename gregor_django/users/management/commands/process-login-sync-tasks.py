@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gregor_django.users import login_sync
+
+
+class Command(BaseCommand):
+    help = "Process queued syncs of Drupal profile data for users who have logged in."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of tasks to process in each pass. If not set, all due tasks are processed.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            default=False,
+            help="Keep running and process due tasks every --interval seconds, instead of making a single pass.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Number of seconds to wait between passes when running with --loop.",
+        )
+
+    def _process(self, limit):
+        tasks = login_sync.process_pending_tasks(limit=limit)
+        n_done = len([x for x in tasks if x.status == x.StatusTypes.DONE])
+        n_failed = len([x for x in tasks if x.status == x.StatusTypes.FAILED])
+        n_retry = len(tasks) - n_done - n_failed
+        self.stdout.write(
+            "Processed {} login sync tasks: {} done, {} to retry, {} failed.".format(
+                len(tasks), n_done, n_retry, n_failed
+            )
+        )
+        for task in tasks:
+            if task.status != task.StatusTypes.DONE:
+                self.stdout.write(self.style.ERROR("  {}: {}".format(task, task.last_error)))
+
+    def handle(self, *args, **options):
+        if options["limit"] is not None and options["limit"] < 1:
+            raise CommandError("--limit must be at least 1.")
+        self._process(options["limit"])
+        while options["loop"]:
+            time.sleep(options["interval"])
+            self._process(options["limit"])
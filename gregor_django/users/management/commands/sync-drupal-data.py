@@ -1,15 +1,22 @@
 import logging
+from datetime import timedelta
 
-from django.core.mail import send_mail
 from django.core.management.base import BaseCommand
 from django.http import HttpRequest
 from django.template.loader import render_to_string
-from django.utils.timezone import localtime
+from django.utils.timezone import localtime, now
 
+from gregor_django.gregor_anvil import email_outbox
 from gregor_django.users import audit
+from gregor_django.users.models import DrupalSyncWatermark
 
 logger = logging.getLogger(__name__)
 
+# Name of the watermark recording the last successful sync with --update.
+WATERMARK_NAME = "sync-drupal-data"
+# Users changed shortly before the last sync started are synced again, in case the clocks differ.
+WATERMARK_OVERLAP = timedelta(hours=1)
+
 
 class Command(BaseCommand):
     help = "Sync drupal user and domain data"
@@ -29,6 +36,15 @@ class Command(BaseCommand):
             default=False,
             help="Ignore user deactivation threshold",
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            dest="incremental",
+            default=False,
+            help="""Only sync users that were changed in Drupal since the last successful sync with --update.
+            Sites and partner groups are always synced in full. Runs a full sync if there has been no successful
+            sync yet.""",
+        )
 
         parser.add_argument(
             "--email",
@@ -64,12 +80,10 @@ class Command(BaseCommand):
                     "apply_changes": self.apply_changes,
                 },
             )
-            send_mail(
+            email_outbox.queue_email(
                 subject,
                 "Drupal data audit problems or changes found. Please see attached report.",
-                None,
-                recipient_list=recipient_list,
-                fail_silently=False,
+                recipient_list,
                 html_message=html_body,
             )
 
@@ -78,12 +92,23 @@ class Command(BaseCommand):
         self.email = options["email"]
         self.error_email = options["error_email"]
         self.ignore_threshold = options["ignore_threshold"]
+        sync_started_at = now()
+        changed_since = None
+        if options["incremental"]:
+            watermark = DrupalSyncWatermark.objects.filter(name=WATERMARK_NAME).first()
+            if watermark:
+                changed_since = watermark.synced_at - WATERMARK_OVERLAP
 
         notification_content = (
             f"[sync-drupal-data] start: Applying Changes: {self.apply_changes} "
-            f"Ignoring Threshold: {self.ignore_threshold} Start time: {localtime()}\n"
+            f"Ignoring Threshold: {self.ignore_threshold} Start time: {localtime(sync_started_at)}\n"
         )
+        if changed_since:
+            notification_content += f"Incremental sync of users changed since: {localtime(changed_since)}\n"
+        # Share one token and the remote reference data between all audits.
+        drupal_session = audit.DrupalSyncSession()
         site_audit = audit.SiteAudit(apply_changes=self.apply_changes)
+        site_audit.drupal_session = drupal_session
         site_audit.run_audit()
 
         notification_content += (
@@ -98,6 +123,7 @@ class Command(BaseCommand):
             notification_content += site_audit.get_errors_table().render_to_text()
 
         partner_group_audit = audit.PartnerGroupAudit(apply_changes=self.apply_changes)
+        partner_group_audit.drupal_session = drupal_session
         partner_group_audit.run_audit()
 
         notification_content += (
@@ -116,7 +142,9 @@ class Command(BaseCommand):
         user_audit = audit.UserAudit(
             apply_changes=self.apply_changes,
             ignore_deactivate_threshold=self.ignore_threshold,
+            changed_since=changed_since,
         )
+        user_audit.drupal_session = drupal_session
         user_audit.run_audit()
         notification_content += (
             "--------------------------------------\n"
@@ -130,6 +158,19 @@ class Command(BaseCommand):
             notification_content += "Users that need intervention (cannot be resolved by script):\n"
             notification_content += user_audit.get_errors_table().render_to_text()
 
+        # Only advance the watermark if every change was written, so that the next incremental sync retries the
+        # users whose changes could not be written.
+        n_unwritten = len([x for x in user_audit.errors if isinstance(x, audit.UserChangeNotWritten)])
+        if n_unwritten:
+            notification_content += (
+                f"{n_unwritten} user changes could not be written; the incremental sync watermark was not advanced.\n"
+            )
+        elif self.apply_changes:
+            DrupalSyncWatermark.objects.update_or_create(
+                name=WATERMARK_NAME,
+                defaults={"synced_at": sync_started_at},
+            )
+
         self.stdout.write(notification_content)
         if self.email:
             self._send_email(user_audit, site_audit, partner_group_audit)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_blank_research_center_or_partner_group'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DrupalSyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name of the sync that this watermark tracks.', max_length=255, unique=True)),
+                ('synced_at', models.DateTimeField(help_text='Start time of the last successful sync.')),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.14 on 2026-10-16 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import django_extensions.db.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_drupalsyncwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginSyncTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('extra_data', models.JSONField(help_text='Drupal profile data for the user at the time of login.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times processing this task has been attempted.')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Time after which this task may be processed.')),
+                ('last_error', models.TextField(blank=True, help_text='Error from the most recent failed attempt.')),
+                ('user', models.ForeignKey(help_text='User whose profile data should be synced.', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'available_at'], name='loginsynctask_status_avail')],
+            },
+        ),
+    ]
@@ -1,7 +1,21 @@
 from django.contrib.auth.models import AbstractUser
-from django.db.models import CharField, ManyToManyField
+from django.db.models import (
+    CASCADE,
+    CharField,
+    DateTimeField,
+    ForeignKey,
+    Index,
+    JSONField,
+    ManyToManyField,
+    Model,
+    PositiveIntegerField,
+    TextChoices,
+    TextField,
+)
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 
 from gregor_django.gregor_anvil.models import PartnerGroup, ResearchCenter
 
@@ -24,3 +38,37 @@ class User(AbstractUser):
 
         """
         return reverse("users:detail", kwargs={"username": self.username})
+
+
+class DrupalSyncWatermark(Model):
+    """The time up to which data has been synced from Drupal, used by incremental syncs."""
+
+    name = CharField(max_length=255, unique=True, help_text="Name of the sync that this watermark tracks.")
+    synced_at = DateTimeField(help_text="Start time of the last successful sync.")
+
+    def __str__(self):
+        return "{} at {}".format(self.name, self.synced_at)
+
+
+class LoginSyncTask(TimeStampedModel, Model):
+    """A queued sync of a user's Drupal profile data, recorded when the user logs in and processed afterwards."""
+
+    class StatusTypes(TextChoices):
+        PENDING = "pending", "Pending"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    user = ForeignKey(User, on_delete=CASCADE, help_text="User whose profile data should be synced.")
+    extra_data = JSONField(help_text="Drupal profile data for the user at the time of login.")
+    status = CharField(max_length=20, choices=StatusTypes.choices, default=StatusTypes.PENDING)
+    attempts = PositiveIntegerField(default=0, help_text="Number of times processing this task has been attempted.")
+    available_at = DateTimeField(default=timezone.now, help_text="Time after which this task may be processed.")
+    last_error = TextField(blank=True, help_text="Error from the most recent failed attempt.")
+
+    class Meta:
+        indexes = [
+            Index(fields=["status", "available_at"], name="loginsynctask_status_avail"),
+        ]
+
+    def __str__(self):
+        return "Login sync for {} ({})".format(self.user, self.status)
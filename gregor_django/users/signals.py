@@ -6,14 +6,18 @@ from gregor_django.drupal_oauth_provider.provider import (
     CustomProvider as DrupalProvider,
 )
 
+from .login_sync import enqueue_login_sync
+
 
 @receiver(user_logged_in)
 def custom_user_logged_in_processing(sender, **kwargs):
     # After a successful social login
     # If the user logged in with the gregor oauth provider
-    # update additional user info
+    # update additional user info and permission groups, and queue an update of research centers and partner
+    # groups, so that the login response is not held up by the admin notifications
     sociallogin = kwargs.get("sociallogin")
     if sociallogin:
         user_provider_id = sociallogin.account.provider
         if user_provider_id == DrupalProvider.id:
             get_adapter().update_user_data(sociallogin)
+            enqueue_login_sync(sociallogin.user, sociallogin.account.extra_data)
@@ -10,15 +10,17 @@ from django.contrib.auth.models import AnonymousUser
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.contrib.sites.models import Site
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
 from django.test import TestCase
 from django.test.client import RequestFactory
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
 from gregor_django.drupal_oauth_provider.provider import CustomProvider
 from gregor_django.gregor_anvil.tests.factories import (
     PartnerGroupFactory,
     ResearchCenterFactory,
 )
+from gregor_django.users import login_sync
 from gregor_django.users.adapters import AccountAdapter, SocialAccountAdapter
 
 from .factories import GroupFactory, UserFactory
@@ -63,6 +65,7 @@ class SocialAccountAdapterTest(TestCase):
                 "first_name": new_first_name,
                 "last_name": new_last_name,
                 "email": "testuser@example.com",
+                "managed_scope_status": {"TEST_GROUP": True},
             },
         )
 
@@ -86,7 +89,11 @@ class SocialAccountAdapterTest(TestCase):
         # Check if the login completed successfully
         self.assertEqual(sociallogin.user, user)
         self.assertEqual(request.user, user)
+        # The user info is updated during the login; research centers and partner groups are synced later.
+        user.refresh_from_db()
         self.assertEqual(user.name, f"{new_first_name} {new_last_name}")
+        self.assertTrue(user.groups.filter(name="TEST_GROUP").exists())
+        self.assertEqual(login_sync.process_pending_tasks()[0].user, user)
 
     def test_update_user_info(self):
         adapter = SocialAccountAdapter()
@@ -293,6 +300,35 @@ class SocialAccountAdapterTest(TestCase):
         with pytest.raises(ImproperlyConfigured):
             adapter.update_user_groups(user, dict(managed_scope_status="FOO"))
 
+    def _count_update_queries(self, n):
+        """Return the number of queries used to reconcile a user with `n` sites, partner groups, and scopes."""
+        adapter = SocialAccountAdapter()
+        user = UserFactory()
+        old_research_centers = ResearchCenterFactory.create_batch(n)
+        user.research_centers.add(*old_research_centers)
+        old_groups = GroupFactory.create_batch(n)
+        user.groups.add(*old_groups)
+        extra_data = {
+            "research_center_or_site": [x.short_name for x in ResearchCenterFactory.create_batch(n)],
+            "partner_group": [x.full_name for x in PartnerGroupFactory.create_batch(n)],
+            "managed_scope_status": {
+                **{x.name: False for x in old_groups},
+                **{f"new_group_{user.pk}_{i}": True for i in range(n)},
+            },
+        }
+        with CaptureQueriesContext(connection) as queries:
+            adapter.update_user_research_centers(user, extra_data)
+            adapter.update_user_partner_groups(user, extra_data)
+            adapter.update_user_groups(user, extra_data)
+        assert user.research_centers.count() == n
+        assert user.partner_groups.count() == n
+        assert user.groups.count() == n
+        return len(queries)
+
+    def test_update_user_number_of_queries(self):
+        """Reconciling a user's sites, partner groups, and groups takes the same number of queries for any size."""
+        assert self._count_update_queries(1) == self._count_update_queries(5)
+
     @override_settings(ACCOUNT_ALLOW_REGISTRATION=True)
     def test_account_is_open_for_signup(self):
         request = RequestFactory()
@@ -1,5 +1,6 @@
 import json
 import time
+from datetime import timedelta
 from io import StringIO
 
 import responses
@@ -13,12 +14,16 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core import mail
 from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from marshmallow_jsonapi import Schema, fields
 
 from gregor_django.drupal_oauth_provider.provider import CustomProvider
+from gregor_django.gregor_anvil import email_outbox
 from gregor_django.users import audit
-from gregor_django.users.models import PartnerGroup, ResearchCenter
+from gregor_django.users.models import DrupalSyncWatermark, PartnerGroup, ResearchCenter
 
 
 class ResearchCenterMockObject:
@@ -446,6 +451,210 @@ class TestUserDataAudit(TestCase):
         users = get_user_model().objects.all()
         assert users.count() == 0
 
+    @responses.activate
+    def test_full_user_audit_multiple_pages(self):
+        """Users from every page of the user endpoint are audited."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        api_root = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}"
+        next_url = f"{api_root}/user/user?page[offset]=1"
+        second_user = UserMockObject(
+            id="usr3",
+            display_name="dnusr3",
+            drupal_internal__uid="usr3",
+            name="testuser3",
+            mail="testuser3@test.com",
+            field_fname="test3",
+            field_lname="user3",
+            field_research_center_or_site=[],
+        )
+        first_page = UserSchema(many=True).dump([TEST_USER_DATA[0]])
+        first_page["links"] = {"next": {"href": next_url}}
+        responses.get(url=f"{api_root}/user/user/", body=json.dumps(first_page))
+        responses.get(url=next_url, body=json.dumps(UserSchema(many=True).dump([second_user])))
+        user_audit = audit.UserAudit(apply_changes=False)
+        user_audit.run_audit()
+        self.assertEqual(len(user_audit.needs_action), 2)
+        self.assertEqual(
+            {result.remote_user_data.attributes["name"] for result in user_audit.needs_action},
+            {"testuser1", "testuser3"},
+        )
+
+    @responses.activate
+    def test_user_audit_number_of_queries(self):
+        """The number of queries does not depend on the number of remote users."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        research_center = ResearchCenter.objects.create(
+            drupal_node_id=TEST_STUDY_SITE_DATA[0].drupal_internal__nid,
+            short_name=TEST_STUDY_SITE_DATA[0].field_short_name,
+            full_name=TEST_STUDY_SITE_DATA[0].title,
+        )
+        remote_users = []
+        for i in range(3):
+            remote_user = UserMockObject(
+                id=f"usr{i}",
+                display_name=f"dnusr{i}",
+                drupal_internal__uid=f"usr{i}",
+                name=f"testuser{i}",
+                mail=f"testuser{i}@test.com",
+                field_fname=f"test{i}",
+                field_lname=f"user{i}",
+                field_research_center_or_site=[TEST_STUDY_SITE_DATA[0]],
+            )
+            remote_users.append(remote_user)
+            local_user = get_user_model().objects.create(
+                username=remote_user.name, email=remote_user.mail, name=f"test{i} user{i}"
+            )
+            local_user.research_centers.add(research_center)
+            SocialAccount.objects.create(
+                user=local_user, uid=remote_user.drupal_internal__uid, provider=CustomProvider.id
+            )
+        url_path = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/user/user/"
+        schema = UserSchema(include_data=("field_research_center_or_site",), many=True)
+        # Responses for the same url are returned in the order they are registered.
+        responses.get(url=url_path, body=json.dumps(schema.dump(remote_users[:1])))
+        responses.get(url=url_path, body=json.dumps(schema.dump(remote_users)))
+        # Only audit the first user.
+        SocialAccount.objects.exclude(uid="usr0").update(provider="other")
+        with CaptureQueriesContext(connection) as one_user_queries:
+            user_audit = audit.UserAudit(apply_changes=False)
+            user_audit.run_audit()
+        self.assertEqual(len(user_audit.verified), 1)
+        SocialAccount.objects.update(provider=CustomProvider.id)
+        with self.assertNumQueries(len(one_user_queries)):
+            user_audit = audit.UserAudit(apply_changes=False)
+            user_audit.run_audit()
+        self.assertEqual(len(user_audit.verified), 3)
+        self.assertEqual(len(user_audit.needs_action), 0)
+
+    @responses.activate
+    def test_user_audit_new_users_in_batches(self):
+        """New users are created in batches when applying changes."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        research_center = ResearchCenter.objects.create(
+            drupal_node_id=TEST_STUDY_SITE_DATA[0].drupal_internal__nid,
+            short_name=TEST_STUDY_SITE_DATA[0].field_short_name,
+            full_name=TEST_STUDY_SITE_DATA[0].title,
+        )
+        remote_users = [
+            UserMockObject(
+                id=f"usr{i}",
+                display_name=f"dnusr{i}",
+                drupal_internal__uid=f"usr{i}",
+                name=f"testuser{i}",
+                mail=f"testuser{i}@test.com",
+                field_fname=f"test{i}",
+                field_lname=f"user{i}",
+                field_research_center_or_site=[TEST_STUDY_SITE_DATA[0]],
+            )
+            for i in range(3)
+        ]
+        url_path = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/user/user/"
+        schema = UserSchema(include_data=("field_research_center_or_site",), many=True)
+        responses.get(url=url_path, body=json.dumps(schema.dump(remote_users)))
+        user_audit = audit.UserAudit(apply_changes=True, batch_size=2)
+        user_audit.run_audit()
+        self.assertEqual(len(user_audit.needs_action), 3)
+        for result in user_audit.needs_action:
+            self.assertIsNotNone(result.local_user.pk)
+        self.assertEqual(SocialAccount.objects.filter(provider=CustomProvider.id).count(), 3)
+        for remote_user in remote_users:
+            user = get_user_model().objects.get(socialaccount__uid=remote_user.drupal_internal__uid)
+            self.assertEqual(user.username, remote_user.name)
+            self.assertEqual(user.name, f"{remote_user.field_fname} {remote_user.field_lname}")
+            self.assertEqual(list(user.research_centers.all()), [research_center])
+
+    @responses.activate
+    def test_user_audit_batch_with_conflicting_user(self):
+        """A change that cannot be written is recorded as an error, and the other changes in its batch are written."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        research_center = ResearchCenter.objects.create(
+            drupal_node_id=TEST_STUDY_SITE_DATA[0].drupal_internal__nid,
+            short_name=TEST_STUDY_SITE_DATA[0].field_short_name,
+            full_name=TEST_STUDY_SITE_DATA[0].title,
+        )
+        # A local user that is not linked to drupal, with the same username as one of the new remote users.
+        get_user_model().objects.create(username="testuser1", email="other@test.com")
+        remote_users = [
+            UserMockObject(
+                id=f"usr{i}",
+                display_name=f"dnusr{i}",
+                drupal_internal__uid=f"usr{i}",
+                name=f"testuser{i}",
+                mail=f"testuser{i}@test.com",
+                field_fname=f"test{i}",
+                field_lname=f"user{i}",
+                field_research_center_or_site=[TEST_STUDY_SITE_DATA[0]],
+            )
+            for i in range(3)
+        ]
+        url_path = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/user/user/"
+        schema = UserSchema(include_data=("field_research_center_or_site",), many=True)
+        responses.get(url=url_path, body=json.dumps(schema.dump(remote_users)))
+        user_audit = audit.UserAudit(apply_changes=True)
+        user_audit.run_audit()
+        self.assertEqual(
+            set(SocialAccount.objects.filter(provider=CustomProvider.id).values_list("uid", flat=True)),
+            {"usr0", "usr2"},
+        )
+        for uid in ("usr0", "usr2"):
+            user = get_user_model().objects.get(socialaccount__uid=uid)
+            self.assertEqual(list(user.research_centers.all()), [research_center])
+        self.assertEqual(len(user_audit.verified), 2)
+        errors = [x for x in user_audit.errors if isinstance(x, audit.UserChangeNotWritten)]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("testuser1", errors[0].note)
+        self.assertIn("IntegrityError", errors[0].note)
+
+    @responses.activate
+    def test_user_audit_incremental(self):
+        """Only users changed since a given time are audited, but removed users are still found."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        changed_since = timezone.now() - timedelta(days=1)
+        unchanged_user = get_user_model().objects.create(username="unchanged", email="unchanged@test.com")
+        SocialAccount.objects.create(user=unchanged_user, uid="usr_unchanged", provider=CustomProvider.id)
+        removed_user = get_user_model().objects.create(username="removed", email="removed@test.com")
+        SocialAccount.objects.create(user=removed_user, uid="usr_removed", provider=CustomProvider.id)
+        url_path = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/user/user"
+        # Listing of all uids.
+        uid_listing = UserSchema(only=("id", "drupal_internal__uid"), many=True).dump(
+            [
+                UserMockObject(**{**TEST_USER_DATA[0].__dict__, "drupal_internal__uid": "usr_unchanged"}),
+                TEST_USER_DATA[0],
+            ]
+        )
+        responses.get(
+            url=url_path,
+            match=[responses.matchers.query_param_matcher({"fields[user--user]": "drupal_internal__uid"})],
+            body=json.dumps(uid_listing),
+        )
+        # Changed users.
+        responses.get(
+            url=url_path,
+            match=[
+                responses.matchers.query_param_matcher(
+                    {
+                        "filter[changed][condition][path]": "changed",
+                        "filter[changed][condition][operator]": ">",
+                        "filter[changed][condition][value]": str(int(changed_since.timestamp())),
+                    }
+                )
+            ],
+            body=json.dumps(UserSchema(many=True).dump([TEST_USER_DATA[0]])),
+        )
+        user_audit = audit.UserAudit(apply_changes=False, changed_since=changed_since)
+        user_audit.run_audit()
+        self.assertEqual(len(user_audit.verified), 0)
+        self.assertEqual(len(user_audit.needs_action), 1)
+        self.assertIsInstance(user_audit.needs_action[0], audit.NewUser)
+        self.assertEqual(len(user_audit.errors), 1)
+        self.assertIsInstance(user_audit.errors[0], audit.RemoveUser)
+        self.assertEqual(user_audit.errors[0].local_user.uid, "usr_removed")
+
     @responses.activate
     def test_user_audit_remove_site_inform(self):
         self.add_fake_token_response()
@@ -681,6 +890,111 @@ class TestUserDataAudit(TestCase):
             out.getvalue(),
         )
 
+    @responses.activate
+    def test_sync_drupal_data_command_incremental_without_watermark(self):
+        """An incremental sync runs a full sync if there has not been a successful sync yet."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        self.add_fake_partner_groups_response()
+        self.add_fake_users_response()
+        out = StringIO()
+        call_command("sync-drupal-data", "--incremental", "--update", stdout=out)
+        self.assertNotIn("Incremental sync", out.getvalue())
+        self.assertEqual(DrupalSyncWatermark.objects.count(), 1)
+        self.assertTrue(SocialAccount.objects.filter(uid=TEST_USER_DATA[0].drupal_internal__uid).exists())
+
+    @responses.activate
+    def test_sync_drupal_data_command_no_update_does_not_set_watermark(self):
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        self.add_fake_partner_groups_response()
+        self.add_fake_users_response()
+        call_command("sync-drupal-data", stdout=StringIO())
+        self.assertEqual(DrupalSyncWatermark.objects.count(), 0)
+
+    @responses.activate
+    def test_sync_drupal_data_command_unwritten_changes_do_not_set_watermark(self):
+        """The watermark is not advanced if some user changes could not be written."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        self.add_fake_partner_groups_response()
+        self.add_fake_users_response()
+        # A local user that is not linked to drupal, with the same username as the new remote user.
+        get_user_model().objects.create(username=TEST_USER_DATA[0].name, email="other@test.com")
+        out = StringIO()
+        call_command("sync-drupal-data", "--incremental", "--update", stdout=out)
+        self.assertIn("1 user changes could not be written", out.getvalue())
+        self.assertEqual(DrupalSyncWatermark.objects.count(), 0)
+
+    @responses.activate
+    def test_sync_drupal_data_command_number_of_remote_calls(self):
+        """The token and each remote collection are only fetched once per run."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        self.add_fake_partner_groups_response()
+        self.add_fake_users_response()
+        call_command("sync-drupal-data", stdout=StringIO())
+        api_root = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}"
+        self.assertEqual(
+            [call.request.url for call in responses.calls],
+            [
+                f"{settings.DRUPAL_SITE_URL}/oauth/token",
+                f"{api_root}/node/research_center/",
+                f"{api_root}/node/partner_group/",
+                f"{api_root}/user/user/",
+            ],
+        )
+
+    @responses.activate
+    def test_drupal_sync_session_refreshes_expired_token(self):
+        """A new token is fetched once the current token is about to expire."""
+        self.token["expires_in"] = 30
+        self.token["expires_at"] = time.time() + 30
+        self.add_fake_token_response()
+        drupal_session = audit.DrupalSyncSession()
+        drupal_session.get_json_api()
+        drupal_session.get_json_api()
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_drupal_sync_session_reuses_token(self):
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        drupal_session = audit.DrupalSyncSession()
+        drupal_session.get_json_api()
+        study_sites = drupal_session.get_study_sites()
+        self.assertIs(drupal_session.get_study_sites(), study_sites)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_drupal_sync_session_checks_token_before_each_request(self):
+        """A token that is about to expire is replaced before a request made with an existing Api."""
+        self.add_fake_token_response()
+        self.add_fake_study_sites_response()
+        drupal_session = audit.DrupalSyncSession()
+        json_api = drupal_session.get_json_api()
+        drupal_session._token["expires_at"] = time.time() + 30
+        audit.get_study_sites(json_api)
+        token_url = f"{settings.DRUPAL_SITE_URL}/oauth/token"
+        url = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/node/research_center/"
+        self.assertEqual([call.request.url for call in responses.calls], [token_url, token_url, url])
+
+    @responses.activate
+    def test_drupal_sync_session_refreshes_rejected_token(self):
+        """A request rejected with 401 Unauthorized is sent once more with a new token."""
+        self.add_fake_token_response()
+        self.token["access_token"] = "newtoken"  # gitleaks:allow
+        self.add_fake_token_response()
+        url = f"{settings.DRUPAL_SITE_URL}/{settings.DRUPAL_API_REL_PATH}/node/research_center/"
+        responses.get(url=url, status=401)
+        self.add_fake_study_sites_response()
+        drupal_session = audit.DrupalSyncSession()
+        study_sites = drupal_session.get_study_sites()
+        self.assertEqual(len(study_sites), len(TEST_STUDY_SITE_DATA))
+        token_url = f"{settings.DRUPAL_SITE_URL}/oauth/token"
+        self.assertEqual([call.request.url for call in responses.calls], [token_url, url, token_url, url])
+        self.assertEqual(responses.calls[3].request.headers["Authorization"], "Bearer newtoken")
+
     @responses.activate
     def test_sync_drupal_data_command_with_issues(self):
         ResearchCenter.objects.create(
@@ -705,6 +1019,7 @@ class TestUserDataAudit(TestCase):
         self.add_fake_users_response()
         out = StringIO()
         call_command("sync-drupal-data", email="test@example.com", error_email="test2@example.com", stdout=out)
+        email_outbox.send_queued_emails()
         self.assertIn("SiteAudit summary: status ok: False", out.getvalue())
         self.assertIn("UserAudit summary: status ok: False", out.getvalue())
         self.assertIn("PartnerGroupAudit summary: status ok: False", out.getvalue())
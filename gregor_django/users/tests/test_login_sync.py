@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from gregor_django.gregor_anvil.tests.factories import ResearchCenterFactory
+from gregor_django.users import login_sync
+from gregor_django.users.models import LoginSyncTask
+
+from .factories import UserFactory
+
+
+class LoginSyncTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.research_center = ResearchCenterFactory.create(short_name="rc1")
+        self.extra_data = {
+            "preferred_username": self.user.username,
+            "email": self.user.email,
+            "research_center_or_site": ["rc1"],
+        }
+
+    def test_enqueue_does_not_sync(self):
+        """Enqueuing a task does not update the user."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(task.status, LoginSyncTask.StatusTypes.PENDING)
+        self.assertEqual(self.user.research_centers.count(), 0)
+
+    def test_process_pending_tasks(self):
+        task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        processed = login_sync.process_pending_tasks()
+        self.assertEqual(processed, [task])
+        task.refresh_from_db()
+        self.assertEqual(task.status, LoginSyncTask.StatusTypes.DONE)
+        self.assertEqual(task.attempts, 1)
+        self.assertEqual(list(self.user.research_centers.all()), [self.research_center])
+        # Nothing is left to process.
+        self.assertEqual(login_sync.process_pending_tasks(), [])
+
+    def test_process_task_sends_admin_mail(self):
+        """Notifications for missing research centers are sent by the worker."""
+        self.extra_data["research_center_or_site"] = ["rc1", "UNKNOWN"]
+        task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        self.assertEqual(len(mail.outbox), 0)
+        login_sync.process_task(task.pk)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(self.user.research_centers.count(), 1)
+
+    def test_failed_task_is_retried(self):
+        task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        with patch(
+            "gregor_django.users.adapters.SocialAccountAdapter.update_user_research_centers",
+            side_effect=ValueError("x"),
+        ):
+            login_sync.process_task(task.pk)
+        task.refresh_from_db()
+        self.assertEqual(task.status, LoginSyncTask.StatusTypes.PENDING)
+        self.assertEqual(task.attempts, 1)
+        self.assertEqual(task.last_error, "ValueError: x")
+        self.assertGreater(task.available_at, timezone.now())
+        # The task is not processed again until it is due.
+        self.assertIsNone(login_sync.process_task(task.pk))
+        task.available_at = timezone.now() - timedelta(seconds=1)
+        task.save()
+        login_sync.process_task(task.pk)
+        task.refresh_from_db()
+        self.assertEqual(task.status, LoginSyncTask.StatusTypes.DONE)
+        self.assertEqual(task.attempts, 2)
+        self.assertEqual(task.last_error, "")
+
+    def test_failed_task_gives_up(self):
+        task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        task.attempts = login_sync.MAX_ATTEMPTS - 1
+        task.save()
+        with patch(
+            "gregor_django.users.adapters.SocialAccountAdapter.update_user_research_centers",
+            side_effect=ValueError("x"),
+        ):
+            login_sync.process_task(task.pk)
+        task.refresh_from_db()
+        self.assertEqual(task.status, LoginSyncTask.StatusTypes.FAILED)
+        self.assertEqual(task.attempts, login_sync.MAX_ATTEMPTS)
+
+    def test_failed_task_rolls_back_changes(self):
+        """Changes made before a failure are not kept."""
+        task = login_sync.enqueue_login_sync(self.user, self.extra_data)
+        with patch(
+            "gregor_django.users.adapters.SocialAccountAdapter.update_user_partner_groups",
+            side_effect=ValueError("x"),
+        ):
+            login_sync.process_task(task.pk)
+        self.assertEqual(self.user.research_centers.count(), 0)
+
+    def test_command(self):
+        login_sync.enqueue_login_sync(self.user, self.extra_data)
+        out = StringIO()
+        call_command("process-login-sync-tasks", stdout=out)
+        self.assertIn("Processed 1 login sync tasks: 1 done, 0 to retry, 0 failed.", out.getvalue())
+        self.assertEqual(list(self.user.research_centers.all()), [self.research_center])